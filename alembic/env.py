@@ -23,12 +23,19 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+def include_name(name, type_, parent_names) -> bool:
+    # Partisi bulanan trs_transaction dikelola TransactionPartitionJob, bukan autogenerate
+    if type_ == "table":
+        return not name.startswith("trs_transaction_") or name in target_metadata.tables
+    return True
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -37,7 +44,7 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata, include_name=include_name)
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,52 @@
+"""transaksi rutin
+
+Revision ID: 3a1d6e0b7c42
+Revises: f9b72f5cde6b
+Create Date: 2026-10-19 15:40:27.118503
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a1d6e0b7c42'
+down_revision: Union[str, Sequence[str], None] = 'f9b72f5cde6b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('mst_recurring',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('owner_telegram_user_id', sa.BigInteger(), nullable=False),
+    sa.Column('wallet_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('target_wallet_id', sa.Integer(), nullable=True),
+    sa.Column('type', sa.String(length=10), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.Column('frequency', sa.String(length=10), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('next_run', sa.Date(), nullable=False),
+    sa.Column('run_count', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint("frequency IN ('daily','weekly','monthly')", name='ck_recurring_frequency'),
+    sa.CheckConstraint("type IN ('income','expense','transfer')", name='ck_recurring_type'),
+    sa.ForeignKeyConstraint(['category_id'], ['mst_category.id'], ),
+    sa.ForeignKeyConstraint(['owner_telegram_user_id'], ['sys_telegram_user.id'], ),
+    sa.ForeignKeyConstraint(['target_wallet_id'], ['mst_wallet.id'], ),
+    sa.ForeignKeyConstraint(['wallet_id'], ['mst_wallet.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_mst_recurring_owner_telegram_user_id'), 'mst_recurring', ['owner_telegram_user_id'], unique=False)
+    op.create_index('idx_recurring_due', 'mst_recurring', ['next_run'], unique=False, postgresql_where='is_active')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_recurring_due', table_name='mst_recurring', postgresql_where='is_active')
+    op.drop_index(op.f('ix_mst_recurring_owner_telegram_user_id'), table_name='mst_recurring')
+    op.drop_table('mst_recurring')
@@ -0,0 +1,38 @@
+"""checkpoint saldo bulanan
+
+Revision ID: 8c4e2f7a9d15
+Revises: 3a1d6e0b7c42
+Create Date: 2026-10-19 17:05:42.630214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e2f7a9d15'
+down_revision: Union[str, Sequence[str], None] = '3a1d6e0b7c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Checkpoint diisi oleh job background (worker.py), bukan di migrasi
+    op.create_table('trs_balance_checkpoint',
+    sa.Column('wallet_id', sa.Integer(), nullable=False),
+    sa.Column('closing_date', sa.Date(), nullable=False),
+    sa.Column('owner_telegram_user_id', sa.BigInteger(), nullable=False),
+    sa.Column('balance', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['owner_telegram_user_id'], ['sys_telegram_user.id'], ),
+    sa.ForeignKeyConstraint(['wallet_id'], ['mst_wallet.id'], ),
+    sa.PrimaryKeyConstraint('wallet_id', 'closing_date', name='pk_balance_checkpoint')
+    )
+    op.create_index('idx_checkpoint_owner_date', 'trs_balance_checkpoint', ['owner_telegram_user_id', 'closing_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_checkpoint_owner_date', table_name='trs_balance_checkpoint')
+    op.drop_table('trs_balance_checkpoint')
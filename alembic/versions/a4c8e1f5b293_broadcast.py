@@ -0,0 +1,39 @@
+"""tabel broadcast pengumuman
+
+Revision ID: a4c8e1f5b293
+Revises: e3f19b6a7c40
+Create Date: 2026-10-20 00:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e1f5b293'
+down_revision: Union[str, Sequence[str], None] = 'e3f19b6a7c40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Penerima dipaging lewat PK sys_telegram_user (id > last_user_id), tidak perlu index baru
+    op.create_table('sys_broadcast',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('parse_mode', sa.String(length=20), nullable=True),
+    sa.Column('last_user_id', sa.BigInteger(), nullable=True),
+    sa.Column('sent', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('blocked', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sys_broadcast')
@@ -0,0 +1,119 @@
+"""partisi trs_transaction per bulan
+
+Revision ID: b5d3e91c0a27
+Revises: 8c4e2f7a9d15
+Create Date: 2026-10-19 21:12:08.417730
+
+trs_transaction diubah jadi tabel partisi RANGE (trx_date), satu partisi per
+bulan + partisi DEFAULT untuk tanggal di luar rentang. Partisi bulan depan
+dibuat job worker (TransactionPartitionJob), migrasi ini hanya membuat
+partisi untuk data yang sudah ada s/d PARTITION_MONTHS_AHEAD bulan ke depan.
+
+Data lama disalin dalam satu transaksi (INSERT ... SELECT per bulan), jadi
+jalankan saat maintenance window untuk tabel besar.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d3e91c0a27'
+down_revision: Union[str, Sequence[str], None] = '8c4e2f7a9d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Samakan dengan default settings.PARTITION_MONTHS_AHEAD
+PARTITION_MONTHS_AHEAD = 3
+
+
+def _add_months(d: date, months: int) -> date:
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _columns() -> list:
+    return [
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('trs_transaction_id_seq'::regclass)"), nullable=False),
+        sa.Column('owner_telegram_user_id', sa.BigInteger(), nullable=False),
+        sa.Column('wallet_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('target_wallet_id', sa.Integer(), nullable=True),
+        sa.Column('trx_date', sa.Date(), nullable=False),
+        sa.Column('type', sa.String(length=10), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=18, scale=2), nullable=False),
+        sa.Column('description', sa.String(length=255), nullable=True),
+        sa.Column('embedding_data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.CheckConstraint("type IN ('income','expense','transfer')", name='ck_trx_type'),
+        sa.ForeignKeyConstraint(['category_id'], ['mst_category.id'], ),
+        sa.ForeignKeyConstraint(['owner_telegram_user_id'], ['sys_telegram_user.id'], ),
+        sa.ForeignKeyConstraint(['target_wallet_id'], ['mst_wallet.id'], ),
+        sa.ForeignKeyConstraint(['wallet_id'], ['mst_wallet.id'], ),
+    ]
+
+
+def _swap_table(old_name: str, **table_kw) -> None:
+    """Rename tabel lama, buat trs_transaction baru memakai sequence yang sama"""
+    op.rename_table('trs_transaction', old_name)
+    op.execute(f"ALTER INDEX idx_trx_owner_date RENAME TO {old_name}_owner_date")
+    op.execute(f"ALTER INDEX ix_trs_transaction_owner_telegram_user_id RENAME TO {old_name}_owner")
+    op.execute(f"ALTER TABLE {old_name} RENAME CONSTRAINT trs_transaction_pkey TO {old_name}_pkey")
+    op.execute("ALTER SEQUENCE trs_transaction_id_seq OWNED BY NONE")
+
+    op.create_table('trs_transaction', *_columns(), table_kw.pop('pk'), **table_kw)
+
+
+def _finish_swap(old_name: str) -> None:
+    op.execute("ALTER SEQUENCE trs_transaction_id_seq OWNED BY trs_transaction.id")
+    op.drop_table(old_name)
+    op.create_index('idx_trx_owner_date', 'trs_transaction', ['owner_telegram_user_id', 'trx_date'], unique=False)
+    op.create_index(op.f('ix_trs_transaction_owner_telegram_user_id'), 'trs_transaction', ['owner_telegram_user_id'], unique=False)
+    op.execute("ANALYZE trs_transaction")
+
+
+def upgrade() -> None:
+    # PK tabel partisi wajib memuat kolom partisi
+    _swap_table(
+        'trs_transaction_unpartitioned',
+        pk=sa.PrimaryKeyConstraint('id', 'trx_date'),
+        postgresql_partition_by='RANGE (trx_date)',
+    )
+
+    conn = op.get_bind()
+    oldest = conn.execute(sa.text("SELECT min(trx_date) FROM trs_transaction_unpartitioned")).scalar()
+    current = date.today().replace(day=1)
+    month = min(oldest.replace(day=1), current) if oldest else current
+    last = _add_months(current, PARTITION_MONTHS_AHEAD)
+
+    # Partisi dibuat sebelum data disalin, dan disalin per bulan supaya
+    # tiap INSERT hanya menulis ke satu partisi
+    while month <= last:
+        upper = _add_months(month, 1)
+        name = f"trs_transaction_y{month.year}m{month.month:02d}"
+        op.execute(
+            f"CREATE TABLE {name} PARTITION OF trs_transaction "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        op.execute(
+            f"INSERT INTO trs_transaction SELECT * FROM trs_transaction_unpartitioned "
+            f"WHERE trx_date >= '{month.isoformat()}' AND trx_date < '{upper.isoformat()}'"
+        )
+        month = upper
+    op.execute("CREATE TABLE trs_transaction_default PARTITION OF trs_transaction DEFAULT")
+    op.execute(
+        f"INSERT INTO trs_transaction SELECT * FROM trs_transaction_unpartitioned "
+        f"WHERE trx_date >= '{month.isoformat()}'"
+    )
+
+    _finish_swap('trs_transaction_unpartitioned')
+
+
+def downgrade() -> None:
+    _swap_table('trs_transaction_partitioned', pk=sa.PrimaryKeyConstraint('id'))
+    op.execute("INSERT INTO trs_transaction SELECT * FROM trs_transaction_partitioned")
+    # Drop parent ikut men-drop semua partisinya
+    _finish_swap('trs_transaction_partitioned')
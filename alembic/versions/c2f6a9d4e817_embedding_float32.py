@@ -0,0 +1,74 @@
+"""embedding transaksi sebagai float32 terpak (bytea)
+
+Revision ID: c2f6a9d4e817
+Revises: a4c8e1f5b293
+Create Date: 2026-10-20 01:05:31.904116
+
+embedding_data (JSONB list float) untuk 768 dimensi ~10 KB teks per baris dan
+harus di-parse jadi 768 objek float Python setiap dibaca. Kolom baru
+`embedding` menyimpan float32 little-endian: 3 KB, dibaca langsung dengan
+numpy.frombuffer tanpa parsing.
+
+- ADD COLUMN nullable tanpa default: hanya katalog, tidak menulis ulang partisi
+- STORAGE EXTERNAL: selalu di TOAST tanpa kompresi (float acak hampir tidak
+  bisa dikompres pglz, percobaan kompresinya cuma buang CPU). Partisi baru
+  mewarisi lewat LIKE ... INCLUDING STORAGE (ensure_transaction_partition)
+
+Data lama dipindah di luar migration: `python backfill_embeddings.py`
+(batch per id, bisa dihentikan & diulang) mengisi embedding lalu mengosongkan
+embedding_data. Kolom embedding_data sendiri baru dihapus di migration
+berikutnya setelah backfill selesai di semua environment.
+
+Downgrade mengembalikan embedding ke embedding_data (list float JSON) sebelum
+kolomnya di-drop, jadi embedding hasil backfill maupun transaksi baru tidak
+hilang. Presisi tetap float32.
+"""
+import struct
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f6a9d4e817'
+down_revision: Union[str, Sequence[str], None] = 'a4c8e1f5b293'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DOWNGRADE_BATCH = 1000
+
+
+def upgrade() -> None:
+    op.add_column('trs_transaction', sa.Column('embedding', sa.LargeBinary(), nullable=True))
+    op.execute("ALTER TABLE trs_transaction ALTER COLUMN embedding SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    trx = sa.table(
+        'trs_transaction',
+        sa.column('id', sa.Integer()),
+        sa.column('trx_date', sa.Date()),
+        sa.column('embedding', sa.LargeBinary()),
+        sa.column('embedding_data', postgresql.JSONB()),
+    )
+    select_batch = sa.select(trx.c.id, trx.c.trx_date, trx.c.embedding).where(
+        trx.c.id > sa.bindparam('after_id'),
+        trx.c.embedding.is_not(None)
+    ).order_by(trx.c.id).limit(DOWNGRADE_BATCH)
+    unpack = sa.update(trx).where(
+        trx.c.id == sa.bindparam('b_id'),
+        trx.c.trx_date == sa.bindparam('b_trx_date')
+    ).values(embedding_data=sa.bindparam('b_embedding_data'))
+
+    conn = op.get_bind()
+    after_id = 0
+    while rows := conn.execute(select_batch, {'after_id': after_id}).all():
+        conn.execute(unpack, [
+            {'b_id': id, 'b_trx_date': trx_date,
+             'b_embedding_data': list(struct.unpack(f'<{len(data) // 4}f', data))}
+            for id, trx_date, data in rows
+        ])
+        after_id = rows[-1][0]
+    op.drop_column('trs_transaction', 'embedding')
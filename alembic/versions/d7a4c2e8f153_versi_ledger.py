@@ -0,0 +1,32 @@
+"""versi ledger per user
+
+Revision ID: d7a4c2e8f153
+Revises: b5d3e91c0a27
+Create Date: 2026-10-19 22:40:51.203116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a4c2e8f153'
+down_revision: Union[str, Sequence[str], None] = 'b5d3e91c0a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Baris dibuat saat transaksi pertama; user tanpa baris = versi 0
+    op.create_table('trs_ledger_version',
+    sa.Column('owner_telegram_user_id', sa.BigInteger(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_telegram_user_id'], ['sys_telegram_user.id'], ),
+    sa.PrimaryKeyConstraint('owner_telegram_user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('trs_ledger_version')
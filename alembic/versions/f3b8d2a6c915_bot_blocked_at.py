@@ -0,0 +1,31 @@
+"""tanda user memblokir bot terpisah dari is_active
+
+Revision ID: f3b8d2a6c915
+Revises: c2f6a9d4e817
+Create Date: 2026-10-20 02:14:52.663190
+
+Broadcast menandai user yang menjawab 403 di bot_blocked_at, bukan lagi
+is_active=false, jadi akun yang sengaja dinonaktifkan tidak ikut aktif lagi
+saat user mengirim pesan. Baris yang sudah terlanjur dinonaktifkan broadcast
+sebelumnya tidak bisa dibedakan dari yang dinonaktifkan sengaja, jadi
+dibiarkan (perbaiki manual kalau perlu).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d2a6c915'
+down_revision: Union[str, Sequence[str], None] = 'c2f6a9d4e817'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('sys_telegram_user', sa.Column('bot_blocked_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('sys_telegram_user', 'bot_blocked_at')
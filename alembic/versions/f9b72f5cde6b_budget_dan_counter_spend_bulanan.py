@@ -0,0 +1,56 @@
+"""budget dan counter spend bulanan
+
+Revision ID: f9b72f5cde6b
+Revises: c69b561689a0
+Create Date: 2026-10-19 13:02:11.412087
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f9b72f5cde6b'
+down_revision: Union[str, Sequence[str], None] = 'c69b561689a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('mst_budget',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('owner_telegram_user_id', sa.BigInteger(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['mst_category.id'], ),
+    sa.ForeignKeyConstraint(['owner_telegram_user_id'], ['sys_telegram_user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('owner_telegram_user_id', 'category_id', name='uq_budget_user_category')
+    )
+    op.create_table('trs_monthly_spend',
+    sa.Column('owner_telegram_user_id', sa.BigInteger(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.Date(), nullable=False),
+    sa.Column('spent', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['mst_category.id'], ),
+    sa.ForeignKeyConstraint(['owner_telegram_user_id'], ['sys_telegram_user.id'], ),
+    sa.PrimaryKeyConstraint('owner_telegram_user_id', 'category_id', 'period', name='pk_monthly_spend')
+    )
+
+    # Isi counter dari histori expense yang sudah ada
+    op.execute("""
+        INSERT INTO trs_monthly_spend (owner_telegram_user_id, category_id, period, spent)
+        SELECT owner_telegram_user_id, category_id, date_trunc('month', trx_date)::date, sum(amount)
+        FROM trs_transaction
+        WHERE type = 'expense' AND category_id IS NOT NULL
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('trs_monthly_spend')
+    op.drop_table('mst_budget')
@@ -1,10 +1,61 @@
 from pydantic import BaseModel, Field
-from typing import Literal, Optional
+from typing import Literal, Optional, Union, get_args, get_origin
+
+MAX_TRANSACTIONS_PER_MESSAGE = 20
 
 class ExtractedTransaction(BaseModel):
-    amount: float
-    category: str
-    wallet_name: str = Field(default="BCA")
-    target_wallet_name: Optional[str] = None
-    description: str
+    amount: float = Field(description="Rupiah, e.g. 15rb=15000, 1,5jt=1500000")
+    category: str = Field(description="Short English name, e.g. Food, Transport, Salary, Transfer")
+    wallet_name: str = Field(default="BCA", description="Source wallet, BCA if not mentioned")
+    target_wallet_name: Optional[str] = Field(default=None, description="Destination wallet, TRANSFER only")
+    description: str = Field(description="Short, e.g. Makan, Topup Gopay")
     transaction_type: Literal["EXPENSE", "INCOME", "TRANSFER"] = "EXPENSE"
+
+class ExtractedTransactions(BaseModel):
+    transactions: list[ExtractedTransaction] = Field(min_length=1, max_length=MAX_TRANSACTIONS_PER_MESSAGE)
+
+    @classmethod
+    def from_llm(cls, raw: dict) -> "ExtractedTransactions":
+        # Format lama (satu objek transaksi) tetap diterima
+        if "transactions" not in raw:
+            raw = {"transactions": [raw]}
+        return cls(**raw)
+
+
+_SCHEMA_TYPES = {float: "number", int: "integer", str: "string", bool: "boolean"}
+
+def _field_schema(annotation, description: Optional[str]) -> dict:
+    args = get_args(annotation)
+    if get_origin(annotation) is Union and type(None) in args:
+        inner = next(a for a in args if a is not type(None))
+        return {**_field_schema(inner, description), "nullable": True}
+
+    if get_origin(annotation) is Literal:
+        schema = {"type": "string", "enum": list(args)}
+    else:
+        schema = {"type": _SCHEMA_TYPES[annotation]}
+    if description:
+        schema["description"] = description
+    return schema
+
+def llm_response_schema() -> dict:
+    """
+    Schema output LLM (subset OpenAPI yang diterima Gemini), diturunkan dari
+    ExtractedTransaction supaya DTO dan schema tidak bisa beda.
+    """
+    properties = {
+        name: _field_schema(field.annotation, field.description)
+        for name, field in ExtractedTransaction.model_fields.items()
+    }
+    item = {
+        "type": "object",
+        "properties": properties,
+        "required": [name for name, schema in properties.items() if not schema.get("nullable")],
+    }
+    return {
+        "type": "object",
+        "properties": {
+            "transactions": {"type": "array", "items": item, "max_items": MAX_TRANSACTIONS_PER_MESSAGE},
+        },
+        "required": ["transactions"],
+    }
@@ -0,0 +1,48 @@
+import asyncio
+import logging
+from datetime import date
+from typing import AsyncContextManager, Callable
+
+from app.domain.finance import rules
+from app.domain.finance.ports import FinanceRepoPort
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class BalanceCheckpointJob:
+    """
+    Tulis checkpoint saldo akhir bulan untuk semua wallet, per rentang id wallet.
+    Incremental: wallet yang checkpoint-nya sudah sampai bulan lalu dilewati,
+    sisanya dilanjutkan dari checkpoint terakhir (bukan dari awal histori).
+    """
+
+    def __init__(
+        self,
+        repo_scope: Callable[[], AsyncContextManager[FinanceRepoPort]],
+        batch_wallets: int | None = None
+    ):
+        self.repo_scope = repo_scope
+        self.batch_wallets = batch_wallets or settings.CHECKPOINT_BATCH_WALLETS
+
+    async def run_once(self, today: date | None = None) -> int:
+        last_closing = rules.last_closing_date(today or date.today())
+        async with self.repo_scope() as repo:
+            max_id = await repo.get_max_wallet_id()
+
+        written = 0
+        for lo in range(0, max_id, self.batch_wallets):
+            # Session baru per batch supaya lock & transaksi DB tetap pendek
+            async with self.repo_scope() as repo:
+                written += await repo.refresh_balance_checkpoints(lo, lo + self.batch_wallets, last_closing)
+
+        if written:
+            logger.info("Checkpoint saldo s/d %s: %d baris ditulis", last_closing, written)
+        return written
+
+    async def run_forever(self, interval: float) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Job checkpoint saldo gagal, dicoba lagi di tick berikutnya")
+            await asyncio.sleep(interval)
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import AsyncContextManager, Callable
+
+from app.domain.telegram.entities import Broadcast
+from app.domain.telegram.ports import BroadcastRepo, BroadcastSender
+from app.core import metrics
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MIN_RATE_PER_S = 1.0
+_SLOWDOWN = 0.8  # rate dikali ini setiap kena 429
+
+
+class SendPacer:
+    """
+    Jarak minimum antar sendMessage untuk semua pengirim (1/rate). 429 dari
+    Telegram menahan semua pengirim selama retry_after dan menurunkan rate,
+    supaya tidak langsung kena limit lagi setelah jeda.
+    """
+
+    def __init__(self, rate: float, clock=time.monotonic):
+        self.rate = rate
+        self.clock = clock
+        self._next = 0.0
+        self._paused_until = 0.0
+
+    async def wait(self) -> None:
+        while True:
+            now = self.clock()
+            slot = max(now, self._next)
+            self._next = slot + 1 / self.rate
+            if slot > now:
+                await asyncio.sleep(slot - now)
+            if self.clock() >= self._paused_until:
+                return
+            # retry_after datang saat menunggu: antre ulang setelah jeda
+
+    def pause(self, seconds: float) -> bool:
+        """Return True kalau ini jeda baru (bukan 429 susulan di jeda yang sama)"""
+        now = self.clock()
+        fresh = now >= self._paused_until
+        if fresh:
+            # 429 lain dari request yang sudah terbang tidak menurunkan rate lagi
+            self.rate = max(MIN_RATE_PER_S, self.rate * _SLOWDOWN)
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._next = max(self._next, self._paused_until)
+        return fresh
+
+
+class BroadcastJob:
+    """
+    Kirim satu pengumuman ke semua user aktif.
+
+    User dibaca per halaman (keyset id > checkpoint), dikirim paralel dengan
+    batas concurrency dan laju global, lalu checkpoint + user yang memblokir
+    bot ditulis dalam satu commit. Job yang mati dilanjutkan dari checkpoint:
+    at-least-once, paling banyak satu halaman terkirim dua kali.
+    """
+
+    def __init__(
+        self,
+        repo_scope: Callable[[], AsyncContextManager[BroadcastRepo]],
+        sender: BroadcastSender,
+        rate: float | None = None,
+        concurrency: int | None = None,
+        page_size: int | None = None,
+        max_attempts: int | None = None,
+        progress_interval: float | None = None,
+        clock=time.monotonic
+    ):
+        self.repo_scope = repo_scope
+        self.sender = sender
+        self.rate = rate or settings.BROADCAST_RATE_PER_S
+        self.concurrency = concurrency or settings.BROADCAST_CONCURRENCY
+        self.page_size = page_size or settings.BROADCAST_PAGE_SIZE
+        self.max_attempts = max_attempts or settings.BROADCAST_MAX_ATTEMPTS
+        self.progress_interval = progress_interval or settings.BROADCAST_PROGRESS_INTERVAL_S
+        self.clock = clock
+
+    async def create(self, text: str, parse_mode: str | None = None) -> Broadcast:
+        async with self.repo_scope() as repo:
+            return await repo.create(text, parse_mode)
+
+    async def run(self, broadcast_id: int) -> Broadcast:
+        async with self.repo_scope() as repo:
+            broadcast = await repo.get(broadcast_id)
+            if broadcast is None:
+                raise ValueError(f"Broadcast {broadcast_id} tidak ada")
+            if broadcast.finished_at is not None:
+                return broadcast
+            remaining = await repo.count_recipients(broadcast.last_user_id)
+
+        pacer = SendPacer(self.rate, self.clock)
+        slots = asyncio.Semaphore(self.concurrency)
+        progress = _Progress(broadcast, remaining, self.clock)
+        logger.info("Broadcast %d mulai: %d penerima tersisa", broadcast.id, remaining)
+
+        reporter = asyncio.create_task(self._report(progress))
+        try:
+            while True:
+                async with self.repo_scope() as repo:
+                    user_ids = await repo.list_recipients(broadcast.last_user_id, self.page_size)
+                if not user_ids:
+                    break
+
+                outcomes = await asyncio.gather(*(
+                    self._deliver(broadcast, user_id, pacer, slots, progress) for user_id in user_ids
+                ))
+                blocked = [uid for uid, outcome in zip(user_ids, outcomes) if outcome == "blocked"]
+                broadcast.sent += outcomes.count("sent")
+                broadcast.failed += outcomes.count("failed")
+                broadcast.blocked += len(blocked)
+                broadcast.last_user_id = user_ids[-1]
+
+                async with self.repo_scope() as repo:
+                    await repo.save_progress(broadcast, blocked)
+
+            broadcast.finished_at = datetime.now()
+            async with self.repo_scope() as repo:
+                await repo.save_progress(broadcast, [])
+        finally:
+            reporter.cancel()
+
+        logger.info("Broadcast %d selesai: %s", broadcast.id, progress.summary())
+        return broadcast
+
+    async def _deliver(self, broadcast: Broadcast, user_id: int,
+                       pacer: SendPacer, slots: asyncio.Semaphore, progress: "_Progress") -> str:
+        for attempt in range(self.max_attempts):
+            async with slots:
+                await pacer.wait()
+                result = await self.sender.deliver_message(user_id, broadcast.text, broadcast.parse_mode)
+
+            if result.ok:
+                outcome = "sent"
+            elif result.blocked:
+                outcome = "blocked"
+            elif result.retry_after is not None:
+                metrics.BROADCAST_RETRY_AFTER.inc()
+                if pacer.pause(result.retry_after):
+                    logger.warning("Broadcast kena 429, jeda %.0fs, rate turun ke %.1f/s",
+                                   result.retry_after, pacer.rate)
+                continue
+            elif result.retryable and attempt + 1 < self.max_attempts:
+                await asyncio.sleep(2 ** attempt)
+                continue
+            else:
+                logger.warning("Broadcast ke %s gagal: %s", user_id, result.error)
+                outcome = "failed"
+            break
+        else:
+            outcome = "failed"
+
+        metrics.BROADCAST_MESSAGES.labels(outcome).inc()
+        progress.done += 1
+        return outcome
+
+    async def _report(self, progress: "_Progress") -> None:
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            logger.info("Broadcast %d: %s", progress.broadcast.id, progress.summary())
+
+
+class _Progress:
+    def __init__(self, broadcast: Broadcast, total: int, clock):
+        self.broadcast = broadcast
+        self.total = total
+        self.done = 0
+        self.clock = clock
+        self.started = clock()
+
+    def rate(self) -> float:
+        elapsed = self.clock() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        rate = self.rate()
+        left = max(0, self.total - self.done)
+        eta = f"{left / rate:.0f}s" if rate else "-"
+        b = self.broadcast
+        return (f"{self.done}/{self.total} user, {rate:.1f} pesan/detik, ETA {eta} "
+                f"(terkirim {b.sent}, blokir {b.blocked}, gagal {b.failed})")
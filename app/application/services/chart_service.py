@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Awaitable, Callable, Optional
+
+from app.domain.finance import rules
+from app.domain.finance.ports import FinanceRepoPort, SpendingChartRenderer
+from app.domain.telegram.ports import TelegramNotifier
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True)
+class CachedChart:
+    version: int
+    png: bytes
+    file_id: Optional[str] = None  # diisi setelah upload pertama berhasil
+
+
+class ChartCache:
+    """
+    Grafik per (user, periode, jenis), valid untuk satu versi ledger. Versi
+    baru (ada transaksi) = cache miss, entri lama langsung tertimpa. LRU, dan
+    render yang sama tidak pernah jalan dua kali bersamaan (single-flight).
+    Semua akses terjadi di event loop yang sama, tanpa lock.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, CachedChart] = OrderedDict()
+        self._rendering: dict[tuple, asyncio.Future] = {}
+
+    def get(self, key: tuple, version: int) -> Optional[CachedChart]:
+        entry = self._entries.get(key)
+        if entry is None or entry.version != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def remember_file_id(self, key: tuple, version: int, file_id: str) -> None:
+        entry = self.get(key, version)
+        if entry is not None:
+            entry.file_id = file_id
+
+    async def render_once(self, key: tuple, version: int,
+                          render: Callable[[], Awaitable[bytes]]) -> CachedChart:
+        flight = (key, version)
+        pending = self._rendering.get(flight)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._rendering[flight] = future
+        try:
+            entry = CachedChart(version=version, png=await render())
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Exception sudah diteruskan ke pemanggil ini; jangan dilaporkan "never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._rendering.pop(flight, None)
+
+        future.set_result(entry)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+
+_MONTH_NAMES = [
+    "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+    "Juli", "Agustus", "September", "Oktober", "November", "Desember",
+]
+
+class ChartService:
+    def __init__(self, repo: FinanceRepoPort, renderer: SpendingChartRenderer,
+                 cache: ChartCache, notifier: TelegramNotifier):
+        self.repo = repo
+        self.renderer = renderer
+        self.cache = cache
+        self.notifier = notifier
+
+    async def send_spending_chart(self, chat_id: int, user_id: int, args: str = "") -> Optional[str]:
+        """
+        Kirim grafik pengeluaran bulan ini sebagai foto. Return teks balasan
+        kalau grafik tidak bisa dikirim, None kalau foto sudah terkirim.
+        """
+        kind = "bar" if args.strip().lower() in ("bar", "batang") else "pie"
+        period = rules.month_start(date.today())
+        key = (user_id, period, kind)
+        version = await self.repo.get_ledger_version(user_id)
+
+        entry = self.cache.get(key, version)
+        if entry is not None and entry.file_id:
+            # Gambar yang sama sudah ada di server Telegram: kirim ulang tanpa upload
+            if await self.notifier.send_photo(chat_id, entry.file_id):
+                metrics.CHART_REQUESTS.labels("file_id").inc()
+                return None
+
+        if entry is not None:
+            metrics.CHART_REQUESTS.labels("cached_bytes").inc()
+        else:
+            items = await self.repo.get_monthly_spending(user_id, period)
+            if not items:
+                metrics.CHART_REQUESTS.labels("empty").inc()
+                return "📭 Belum ada pengeluaran bulan ini."
+
+            total = sum(amount for _, amount in items)
+            title = f"Pengeluaran {_MONTH_NAMES[period.month - 1]} {period.year}: Rp {total:,.0f}"
+            try:
+                entry = await self.cache.render_once(
+                    key, version, lambda: self.renderer.render(kind, title, items)
+                )
+            except Exception as e:
+                logger.error("Render grafik gagal: %s", e)
+                return "⚠️ Grafik belum bisa dibuat, coba lagi nanti."
+            metrics.CHART_REQUESTS.labels("render").inc()
+
+        file_id = await self.notifier.send_photo(chat_id, entry.png)
+        if file_id is None:
+            return "⚠️ Gagal mengirim grafik, coba lagi nanti."
+        self.cache.remember_file_id(key, version, file_id)
+        return None
@@ -0,0 +1,41 @@
+import logging
+import time
+from typing import AsyncContextManager, Callable
+
+from app.domain.finance.ports import FinanceRepoPort
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingBackfillJob:
+    """
+    Pindahkan embedding_data (JSONB list float) ke kolom embedding (float32
+    terpak), per batch id transaksi. Tiap batch commit sendiri, jadi job boleh
+    dihentikan lalu dijalankan ulang: baris yang sudah dikonversi tidak lagi
+    punya embedding_data.
+    """
+
+    def __init__(
+        self,
+        repo_scope: Callable[[], AsyncContextManager[FinanceRepoPort]],
+        batch_size: int | None = None
+    ):
+        self.repo_scope = repo_scope
+        self.batch_size = batch_size or settings.EMBEDDING_BACKFILL_BATCH
+
+    async def run_once(self, after_id: int = 0) -> int:
+        converted = 0
+        started = time.monotonic()
+        while True:
+            # Session baru per batch supaya transaksi DB tetap pendek
+            async with self.repo_scope() as repo:
+                last_id, count = await repo.backfill_embeddings(after_id, self.batch_size)
+            if last_id is None:
+                break
+            after_id = last_id
+            converted += count
+            logger.info("Backfill embedding: %d baris (s/d id %d, %.0f baris/detik)",
+                        converted, after_id, converted / max(time.monotonic() - started, 1e-9))
+
+        logger.info("Backfill embedding selesai: %d baris dikonversi", converted)
+        return converted
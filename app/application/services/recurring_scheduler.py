@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date
+from typing import AsyncContextManager, Callable, Optional
+
+from app.domain.finance.entities import RecurringRun
+from app.domain.finance.ports import FinanceRepoPort
+from app.domain.telegram.ports import TelegramNotifier
+from app.core import metrics
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class RecurringScheduler:
+    """
+    Eksekusi transaksi rutin yang jatuh tempo secara batch.
+
+    Setiap batch = satu statement + commit di repo (klaim pakai SKIP LOCKED),
+    jadi beberapa proses worker boleh jalan bersamaan tanpa dobel catat.
+    Catch-up setelah downtime otomatis: semua kejadian yang terlewat ikut dibuat.
+    """
+
+    def __init__(
+        self,
+        repo_scope: Callable[[], AsyncContextManager[FinanceRepoPort]],
+        notifier: Optional[TelegramNotifier] = None,
+        batch_size: int | None = None,
+        max_catchup: int | None = None,
+        notify_concurrency: int = 20
+    ):
+        self.repo_scope = repo_scope
+        self.notifier = notifier
+        self.batch_size = batch_size or settings.RECURRING_BATCH_SIZE
+        self.max_catchup = max_catchup or settings.RECURRING_MAX_CATCHUP
+        self._notify_slots = asyncio.Semaphore(notify_concurrency)
+
+    async def run_batch(self, today: date) -> list[RecurringRun]:
+        with metrics.RECURRING_BATCH_LATENCY.time():
+            async with self.repo_scope() as repo:
+                runs = await repo.run_due_recurring(today, self.batch_size, self.max_catchup)
+        metrics.RECURRING_TRANSACTIONS.inc(sum(r.occurrences for r in runs))
+        return runs
+
+    async def run_once(self, today: date | None = None) -> int:
+        """Proses semua rule jatuh tempo sampai habis, return jumlah transaksi dibuat"""
+        today = today or date.today()
+        total = 0
+        while True:
+            runs = await self.run_batch(today)
+            if not runs:
+                break
+            total += sum(r.occurrences for r in runs)
+            # Notifikasi setelah commit, supaya user tidak dikabari transaksi yang rollback
+            if self.notifier:
+                await self._notify(runs)
+
+        if total:
+            logger.info("Scheduler rutin: %d transaksi dibuat", total)
+        return total
+
+    async def run_forever(self, interval: float) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Scheduler rutin gagal, dicoba lagi di tick berikutnya")
+            await asyncio.sleep(interval)
+
+    async def _notify(self, runs: list[RecurringRun]) -> None:
+        by_owner: dict[int, list[RecurringRun]] = defaultdict(list)
+        for run in runs:
+            by_owner[run.owner_id].append(run)
+
+        async def _send(owner_id: int, items: list[RecurringRun]) -> None:
+            lines = ["🔁 **Transaksi Rutin Tercatat:**\n"]
+            for r in items:
+                icon = "🔴" if r.type == "expense" else "🟢" if r.type == "income" else "🔄"
+                times = f" (x{r.occurrences})" if r.occurrences > 1 else ""
+                lines.append(f"{icon} {r.description or '-'}: Rp {r.amount:,.0f}{times}")
+            async with self._notify_slots:
+                await self.notifier.send_message(owner_id, "\n".join(lines))
+
+        await asyncio.gather(*(_send(owner_id, items) for owner_id, items in by_owner.items()))
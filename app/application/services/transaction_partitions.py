@@ -0,0 +1,43 @@
+import asyncio
+import logging
+from datetime import date
+from typing import AsyncContextManager, Callable
+
+from app.domain.finance import rules
+from app.domain.finance.ports import FinanceRepoPort
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class TransactionPartitionJob:
+    """
+    Siapkan partisi bulanan trs_transaction untuk bulan ini s/d N bulan ke
+    depan, supaya insert tidak pernah jatuh ke partisi DEFAULT.
+    """
+
+    def __init__(
+        self,
+        repo_scope: Callable[[], AsyncContextManager[FinanceRepoPort]],
+        months_ahead: int | None = None
+    ):
+        self.repo_scope = repo_scope
+        self.months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+
+    async def run_once(self, today: date | None = None) -> int:
+        current = rules.month_start(today or date.today())
+        created = 0
+        for offset in range(self.months_ahead + 1):
+            month = rules.add_months(current, offset)
+            async with self.repo_scope() as repo:
+                if await repo.ensure_transaction_partition(month):
+                    created += 1
+                    logger.info("Partisi transaksi %s dibuat", month.strftime("%Y-%m"))
+        return created
+
+    async def run_forever(self, interval: float) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Job partisi transaksi gagal, dicoba lagi di tick berikutnya")
+            await asyncio.sleep(interval)
@@ -1,9 +1,13 @@
+import asyncio
 import logging
+from datetime import date, timedelta
 from app.domain.llm.ports import LLMPort
+from app.domain.finance.entities import AccountDirectory, Budget
 from app.domain.finance.ports import FinanceRepoPort
 from app.domain.finance import rules
 from app.domain.finance.exceptions import FinanceError, InsufficientBalanceError
-from app.application.dtos.extraction import ExtractedTransaction
+from app.application.dtos.extraction import ExtractedTransaction, ExtractedTransactions
+from app.core import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -14,115 +18,187 @@ class TransactionService:
 
     async def process_natural_language(self, user_id: int, text: str) -> str:
         # ==========================================================
-        # 1. AI EXTRACTION & DTO VALIDATION
+        # 1. AI EXTRACTION || PREFETCH WALLET, CATEGORY & BUDGET
         # ==========================================================
+        # Direktori akun user dibaca selagi LLM berpikir; kalau prefetch gagal,
+        # call LLM ikut dibatalkan TaskGroup
+        period = rules.month_start(date.today())
         try:
-            raw_data = await self.llm.parse_transaction(text)
-
-            if "error" in raw_data:
-                return "🤖 Maaf, saya gagal paham. Coba kalimat simpel: 'Makan 20rb pake OVO' atau 'Transfer 50rb dari BCA ke Gopay'"
+            async with asyncio.TaskGroup() as tg:
+                extraction = tg.create_task(self._extract(user_id, text))
+                prefetch = tg.create_task(self.repo.get_account_directory(user_id, period))
+        except ExceptionGroup as eg:
+            logger.error(f"Prefetch Error: {eg.exceptions[0]}")
+            metrics.TRANSACTION_OUTCOMES.labels("db_error").inc()
+            return "Terjadi kesalahan sistem database."
 
-            data = ExtractedTransaction(**raw_data)
-        except Exception as e:
-            logger.error(f"LLM/DTO Error: {e}")
-            return "Terjadi kesalahan saat memproses pesan (Parsing Error)."
+        items = extraction.result()
+        if isinstance(items, str):
+            return items
+        directory = prefetch.result()
 
         try:
             # ==========================================================
             # 2. BUSINESS RULES VALIDATION
             # ==========================================================
-            rules.validate_transaction_amount(data.amount)
+            for data in items:
+                rules.validate_transaction_amount(data.amount)
 
             # ==========================================================
-            # 3. HANDLE SOURCE WALLET (Dompet Asal)
+            # 3-5. WALLET ASAL, WALLET TUJUAN & CATEGORY (di memori)
             # ==========================================================
-            clean_wallet_name = rules.normalize_wallet_name(data.wallet_name)
-            wallet = await self.repo.get_wallet_by_name(user_id, clean_wallet_name)
-
-            if not wallet:
-                wallet = await self.repo.create_wallet(user_id, clean_wallet_name)
+            resolved = await self._resolve_from_directory(user_id, items, directory)
 
             # ==========================================================
-            # 4. HANDLE TARGET WALLET (Khusus TRANSFER)
+            # 6. SIMPAN SEMUA TRANSAKSI (satu statement, satu commit)
             # ==========================================================
-            target_wallet = None
-            if data.transaction_type == "TRANSFER" and data.target_wallet_name:
-                clean_target_name = rules.normalize_wallet_name(data.target_wallet_name)
-
-                # Cek apakah wallet tujuan ada?
-                target_wallet = await self.repo.get_wallet_by_name(user_id, clean_target_name)
+            await self.repo.create_transactions(user_id, [
+                {
+                    "wallet_id": wallet.id,
+                    # Masukkan ID target wallet jika ada (utk Transfer)
+                    "target_wallet_id": target_wallet.id if target_wallet else None,
+                    "category_id": category.id if category else None,
+                    "amount": data.amount,
+                    "type": data.transaction_type.lower(),  # 'expense', 'income', 'transfer'
+                    "description": data.description,
+                }
+                for data, (wallet, target_wallet, category) in zip(items, resolved)
+            ])
 
-                # Auto-create target wallet jika belum ada
-                if not target_wallet:
-                    target_wallet = await self.repo.create_wallet(user_id, clean_target_name)
-
-            # ==========================================================
-            # 5. HANDLE CATEGORY
-            # ==========================================================
-            category = None
-            if data.category:
-                # Cari category, pastikan typenya sesuai (EXPENSE/INCOME/TRANSFER)
-                # Gunakan lowercase untuk konsistensi DB
-                cat_type = data.transaction_type.lower()
-                category = await self.repo.get_category_by_name(
-                    user_id, data.category, cat_type
-                )
-
-                # Auto-create category jika belum ada
-                if not category:
-                    category = await self.repo.create_category(
-                        user_id, data.category, cat_type
-                    )
+            metrics.TRANSACTION_OUTCOMES.labels("parsed").inc(len(items))
 
             # ==========================================================
-            # 6. SIMPAN TRANSAKSI (REPOSITORY)
+            # 6b. CEK BUDGET (budget hasil prefetch + pengeluaran pesan ini)
             # ==========================================================
-            trx = await self.repo.create_transaction(
-                user_id=user_id,
-                wallet_id=wallet.id,
-                # Masukkan ID target wallet jika ada (utk Transfer)
-                target_wallet_id=target_wallet.id if target_wallet else None,
-                category_id=category.id if category else None,
-                amount=data.amount,
-                type=data.transaction_type.lower(), # 'expense', 'income', 'transfer'
-                description=data.description
-            )
+            spent_by_category: dict[int, float] = {}
+            for data, (_, _, category) in zip(items, resolved):
+                if data.transaction_type == "EXPENSE" and category:
+                    spent_by_category[category.id] = spent_by_category.get(category.id, 0) + data.amount
+            budget_note = self._budget_alerts(directory.budgets, spent_by_category)
 
             # ==========================================================
             # 7. FORMAT RESPONSE
             # ==========================================================
-            # Tentukan Icon
-            if data.transaction_type == "EXPENSE":
-                icon = "🔴" # Merah untuk keluar
-            elif data.transaction_type == "INCOME":
-                icon = "🟢" # Hijau untuk masuk
-            else:
-                icon = "🔄" # Putar untuk transfer
-
-            # Format teks dompet
-            wallet_info = f"💳 {wallet.name}"
-            if target_wallet:
-                wallet_info += f" ➡️ {target_wallet.name}"
-
-            return (
-                f"{icon} **Transaksi Tercatat!**\n\n"
-                f"📝 {data.description}\n"
-                f"💰 Rp {data.amount:,.0f}\n"
-                f"📂 {category.name if category else '-'}\n"
-                f"{wallet_info}"
-            )
+            if len(items) == 1:
+                return self._format_single(items[0], *resolved[0]) + budget_note
+            return self._format_multiple(items, resolved) + budget_note
 
         except InsufficientBalanceError as e:
+            metrics.TRANSACTION_OUTCOMES.labels("rejected").inc()
             return f"⛔ **Gagal:** {str(e)}"
         except FinanceError as e:
+            metrics.TRANSACTION_OUTCOMES.labels("rejected").inc()
             return f"⚠️ **Error:** {str(e)}"
         except Exception as e:
             logger.error(f"System Error: {e}")
+            metrics.TRANSACTION_OUTCOMES.labels("db_error").inc()
             return "Terjadi kesalahan sistem database."
 
+    async def _extract(self, user_id: int, text: str) -> list[ExtractedTransaction] | str:
+        """Item transaksi dari LLM, atau teks balasan kalau gagal (tidak raise, lihat TaskGroup)"""
+        try:
+            with metrics.LLM_LATENCY.time():
+                raw_data = await self.llm.parse_transaction(text, user_id=user_id)
+
+            if "error" in raw_data:
+                metrics.TRANSACTION_OUTCOMES.labels("llm_error").inc()
+                return "🤖 Maaf, saya gagal paham. Coba kalimat simpel: 'Makan 20rb pake OVO' atau 'Transfer 50rb dari BCA ke Gopay'"
+
+            return ExtractedTransactions.from_llm(raw_data).transactions
+        except Exception as e:
+            logger.error(f"LLM/DTO Error: {e}")
+            metrics.TRANSACTION_OUTCOMES.labels("llm_error").inc()
+            return "Terjadi kesalahan saat memproses pesan (Parsing Error)."
+
+    async def _resolve_from_directory(self, user_id: int, items: list[ExtractedTransaction],
+                                      directory: AccountDirectory) -> list[tuple]:
+        """
+        (wallet, target_wallet, category) per item dari direktori prefetch.
+        Nama dicocokkan tanpa beda huruf besar/kecil seperti get_*_by_name;
+        yang belum ada dibuat sekaligus dalam satu upsert.
+        """
+        wallets = {w.name.lower(): w for w in directory.wallets}
+        categories = {(c.name.lower(), c.type): c for c in directory.categories}
+
+        def wallet_key(name: str) -> str:
+            return rules.normalize_wallet_name(name).lower()
+
+        def category_key(data: ExtractedTransaction) -> tuple[str, str]:
+            return data.category.lower(), data.transaction_type.lower()
+
+        missing_wallets: dict[str, str] = {}
+        missing_categories: dict[tuple[str, str], tuple[str, str]] = {}
+        for data in items:
+            names = [data.wallet_name]
+            if data.transaction_type == "TRANSFER" and data.target_wallet_name:
+                names.append(data.target_wallet_name)
+            for name in names:
+                if wallet_key(name) not in wallets:
+                    missing_wallets.setdefault(wallet_key(name), rules.normalize_wallet_name(name))
+            if data.category and category_key(data) not in categories:
+                missing_categories.setdefault(category_key(data), (data.category, data.transaction_type.lower()))
+
+        if missing_wallets or missing_categories:
+            new_wallets, new_categories = await self.repo.create_accounts(
+                user_id, list(missing_wallets.values()), list(missing_categories.values())
+            )
+            wallets.update((w.name.lower(), w) for w in new_wallets)
+            categories.update(((c.name.lower(), c.type), c) for c in new_categories)
+
+        resolved = []
+        for data in items:
+            target_wallet = None
+            if data.transaction_type == "TRANSFER" and data.target_wallet_name:
+                target_wallet = wallets[wallet_key(data.target_wallet_name)]
+            category = categories[category_key(data)] if data.category else None
+            resolved.append((wallets[wallet_key(data.wallet_name)], target_wallet, category))
+        return resolved
+
+    @staticmethod
+    def _icon(transaction_type: str) -> str:
+        if transaction_type == "EXPENSE":
+            return "🔴" # Merah untuk keluar
+        if transaction_type == "INCOME":
+            return "🟢" # Hijau untuk masuk
+        return "🔄" # Putar untuk transfer
+
+    def _format_single(self, data: ExtractedTransaction, wallet, target_wallet, category) -> str:
+        # Format teks dompet
+        wallet_info = f"💳 {wallet.name}"
+        if target_wallet:
+            wallet_info += f" ➡️ {target_wallet.name}"
+
+        return (
+            f"{self._icon(data.transaction_type)} **Transaksi Tercatat!**\n\n"
+            f"📝 {data.description}\n"
+            f"💰 Rp {data.amount:,.0f}\n"
+            f"📂 {category.name if category else '-'}\n"
+            f"{wallet_info}"
+        )
+
+    def _format_multiple(self, items: list[ExtractedTransaction], resolved: list) -> str:
+        report = f"🧾 **{len(items)} Transaksi Tercatat!**\n\n"
+        total_out = total_in = 0.0
+
+        for data, (wallet, target_wallet, category) in zip(items, resolved):
+            wallet_info = wallet.name + (f" ➡️ {target_wallet.name}" if target_wallet else "")
+            report += f"{self._icon(data.transaction_type)} **{data.description}** Rp {data.amount:,.0f}\n"
+            report += f"   {category.name if category else '-'} · {wallet_info}\n"
+
+            if data.transaction_type == "EXPENSE":
+                total_out += data.amount
+            elif data.transaction_type == "INCOME":
+                total_in += data.amount
+
+        if total_out:
+            report += f"\n💸 Total keluar: Rp {total_out:,.0f}"
+        if total_in:
+            report += f"\n💰 Total masuk: Rp {total_in:,.0f}"
+        return report
+
     async def get_balance_summary(self, user_id: int) -> str:
         """Mengambil rekap saldo semua wallet"""
-        wallets = await self.repo.get_user_wallets(user_id)
+        wallets = await self.repo.list_wallets(user_id)
 
         if not wallets:
             return "🤷‍♂️ Belum ada dompet terdaftar. Coba catat transaksi dulu."
@@ -141,7 +217,7 @@ class TransactionService:
 
     async def get_last_transactions(self, user_id: int) -> str:
         """Mengambil 5 transaksi terakhir"""
-        trxs = await self.repo.get_recent_transactions(user_id, limit=5)
+        trxs = await self.repo.list_recent_transactions(user_id, limit=5)
 
         if not trxs:
             return "📭 Belum ada riwayat transaksi."
@@ -154,13 +230,224 @@ class TransactionService:
             else: icon = "🔄"
 
             # Format tanggal (DD/MM)
-            date_str = t.trx_date.strftime("%d/%m")
+            date_str = t.date.strftime("%d/%m")
 
             # Format Deskripsi
             desc = t.description or "-"
             if len(desc) > 20: desc = desc[:17] + "..."
 
             report += f"{icon} `{date_str}` **{desc}**\n"
-            report += f"   Rp {t.amount:,.0f} ({t.wallet.name})\n"
+            report += f"   Rp {t.amount:,.0f} ({t.wallet_name})\n"
+
+        return report
+
+    async def search_transactions(self, user_id: int, text: str, page_size: int = 5) -> str:
+        """'kapan terakhir bayar listrik?' / 'cari kopi hal 2' -> transaksi yang cocok"""
+        terms, page = rules.parse_search_query(text)
+        if not terms:
+            return "🔎 Mau cari apa? Contoh: `cari listrik` atau `kapan terakhir beli kopi?`"
+
+        # Ambil satu baris lebih untuk tahu ada halaman berikutnya
+        result = await self.repo.search_transactions(
+            user_id, terms, limit=page_size + 1, offset=(page - 1) * page_size
+        )
+        trxs = result.transactions
+        keyword = " ".join(terms)
+        # Hasil dipotong di transaksi cocok terbaru: yang lebih lama hanya bisa
+        # dicari dengan kata kunci yang lebih spesifik
+        truncated_note = (f"\n\n✂️ Hasil \"{keyword}\" dibatasi transaksi terbaru. "
+                          f"Persempit kata kuncinya, mis. `cari {keyword} <kata lain>`.")
+        if not trxs:
+            if result.truncated:
+                return "📭 Tidak ada lagi hasil yang bisa ditampilkan." + truncated_note
+            if page > 1:
+                return f"📭 Tidak ada lagi hasil untuk \"{keyword}\"."
+            return f"🤷‍♂️ Tidak ada transaksi dengan kata \"{keyword}\"."
+
+        report = f"🔎 **Hasil \"{keyword}\"** (hal {page}):\n\n"
+        for t in trxs[:page_size]:
+            desc = t.description or "-"
+            if len(desc) > 30: desc = desc[:27] + "..."
+            report += f"{self._icon(t.type.upper())} `{t.date.strftime('%d/%m/%Y')}` **{desc}**\n"
+            report += f"   Rp {t.amount:,.0f} ({t.wallet_name})\n"
+
+        if len(trxs) > page_size:
+            report += f"\n➡️ Berikutnya: `cari {keyword} hal {page + 1}`"
+        elif result.truncated:
+            report += truncated_note
+        return report
+
+    @staticmethod
+    def _budget_alerts(budgets: list[Budget], spent_by_category: dict[int, float]) -> str:
+        """
+        `budgets` = hasil prefetch (spend sebelum pesan ini), `spent_by_category`
+        = total expense pesan ini per category. Pesan lain yang di-commit di
+        antaranya tidak terlihat; cukup untuk peringatan.
+        """
+        notes = ""
+        for before in budgets:
+            if before.category_id not in spent_by_category:
+                continue
+            budget = Budget(before.category_id, before.category_name, before.amount,
+                            before.spent + spent_by_category[before.category_id])
+            level = rules.budget_alert_level(budget.amount, before.spent, budget.spent)
+            if level is None:
+                continue
+
+            icon = "🚨" if level >= 100 else "⚠️"
+            notes += (
+                f"\n\n{icon} **Budget {budget.category_name} sudah {budget.usage_pct:.0f}%**\n"
+                f"Terpakai Rp {budget.spent:,.0f} dari Rp {budget.amount:,.0f} bulan ini."
+            )
+        return notes
+
+    async def set_budget(self, user_id: int, args: str) -> str:
+        """Format: 'Food 2jt' (nama kategori boleh lebih dari satu kata)"""
+        parts = args.rsplit(maxsplit=1)
+        if len(parts) != 2:
+            return "📝 Format: `budget <kategori> <nominal>`\nContoh: `budget Food 2jt`"
+
+        category_name, raw_amount = parts
+        try:
+            amount = rules.parse_amount(raw_amount)
+        except FinanceError as e:
+            return f"⚠️ **Error:** {str(e)}"
+
+        category = await self.repo.get_category_by_name(user_id, category_name, "expense")
+        if not category:
+            category = await self.repo.create_category(user_id, category_name.strip().title(), "expense")
+
+        await self.repo.set_budget(user_id, category.id, amount)
+        return f"✅ Budget **{category.name}** diset Rp {amount:,.0f}/bulan."
+
+    async def get_budget_summary(self, user_id: int) -> str:
+        """Rekap budget bulan ini dari counter spend"""
+        budgets = await self.repo.get_budgets(user_id, rules.month_start(date.today()))
+
+        if not budgets:
+            return "📭 Belum ada budget. Coba: `budget Food 2jt`"
+
+        report = "🎯 **Budget Bulan Ini:**\n\n"
+        for b in budgets:
+            if b.usage_pct >= 100: icon = "🚨"
+            elif b.usage_pct >= 80: icon = "⚠️"
+            else: icon = "✅"
+
+            report += f"{icon} **{b.category_name}:** Rp {b.spent:,.0f} / Rp {b.amount:,.0f} ({b.usage_pct:.0f}%)\n"
+
+        return report
+
+    async def add_recurring(self, user_id: int, args: str) -> str:
+        """Format: 'bulanan Gaji 10jt ke BCA' (frekuensi + kalimat transaksi biasa)"""
+        parts = args.split(maxsplit=1)
+        if len(parts) != 2:
+            return "📝 Format: `rutin <harian|mingguan|bulanan> <transaksi>`\nContoh: `rutin bulanan Netflix 54rb pake BCA`"
+
+        try:
+            frequency = rules.parse_frequency(parts[0])
+
+            with metrics.LLM_LATENCY.time():
+                raw_data = await self.llm.parse_transaction(parts[1], user_id=user_id)
+            if "error" in raw_data:
+                return "🤖 Maaf, saya gagal paham transaksinya. Contoh: `rutin bulanan Kos 1,5jt pake BCA`"
+            items = ExtractedTransactions.from_llm(raw_data).transactions
+            if len(items) > 1:
+                return "📝 Satu transaksi rutin per pesan ya. Contoh: `rutin bulanan Kos 1,5jt pake BCA`"
+            data = items[0]
+            rules.validate_transaction_amount(data.amount)
+
+            # Resolusi akun sama dengan pesan transaksi biasa; akun baru ikut commit create_recurring
+            directory = await self.repo.get_account_directory(user_id, rules.month_start(date.today()))
+            [(wallet, target_wallet, category)] = await self._resolve_from_directory(user_id, [data], directory)
+            # Kejadian pertama hari ini, dicatat oleh scheduler
+            rule = await self.repo.create_recurring(
+                user_id=user_id,
+                wallet_id=wallet.id,
+                target_wallet_id=target_wallet.id if target_wallet else None,
+                category_id=category.id if category else None,
+                amount=data.amount,
+                type=data.transaction_type.lower(),
+                frequency=frequency,
+                start_date=date.today(),
+                description=data.description
+            )
+        except FinanceError as e:
+            return f"⚠️ **Error:** {str(e)}"
+        except Exception as e:
+            logger.error(f"Recurring Error: {e}")
+            return "Terjadi kesalahan saat menyimpan transaksi rutin."
+
+        return (
+            f"🔁 **Transaksi Rutin #{rule.id} Disimpan!**\n\n"
+            f"📝 {data.description}\n"
+            f"💰 Rp {data.amount:,.0f} ({parts[0].lower()})\n"
+            f"💳 {wallet.name}"
+        )
+
+    async def get_recurring_summary(self, user_id: int) -> str:
+        items = await self.repo.get_recurring(user_id)
+
+        if not items:
+            return "📭 Belum ada transaksi rutin. Coba: `rutin bulanan Netflix 54rb pake BCA`"
+
+        labels = {"daily": "harian", "weekly": "mingguan", "monthly": "bulanan"}
+        report = "🔁 **Transaksi Rutin:**\n\n"
+        for r in items:
+            report += f"#{r.id} **{r.description or '-'}** Rp {r.amount:,.0f} ({labels[r.frequency]}, {r.wallet.name})\n"
+            report += f"   Berikutnya: {r.next_run.strftime('%d/%m/%Y')}\n"
+
+        report += "\nHapus dengan `rutin hapus <id>`"
+        return report
+
+    async def stop_recurring(self, user_id: int, raw_id: str) -> str:
+        rule_id = raw_id.lstrip("#")
+        if not rule_id.isdigit():
+            return "📝 Format: `rutin hapus <id>`"
+
+        if not await self.repo.deactivate_recurring(user_id, int(rule_id)):
+            return f"🤷‍♂️ Transaksi rutin #{rule_id} tidak ditemukan."
+        return f"🗑️ Transaksi rutin #{rule_id} dihentikan."
+
+    async def get_historical_balance(self, user_id: int, text: str) -> str:
+        """'saldo BCA per 31 Desember' -> saldo wallet tsb (atau semua wallet) per tanggal itu"""
+        head, _, raw_date = text.lower().rpartition(" per ")
+        try:
+            as_of = rules.parse_as_of_date(raw_date, date.today())
+        except FinanceError as e:
+            return f"⚠️ **Error:** {str(e)}"
+
+        wallets = await self.repo.list_wallets(user_id)
+        if not wallets:
+            return "🤷‍♂️ Belum ada dompet terdaftar. Coba catat transaksi dulu."
+
+        # Wallet yang namanya disebut; kalau tidak ada yang disebut = semua wallet
+        words = set(head.replace("/", " ").split())
+        selected = [w for w in wallets if w.name.lower() in words] or wallets
+
+        report = f"📅 **Saldo per {as_of.strftime('%d/%m/%Y')}:**\n\n"
+        total = 0.0
+        for w in selected:
+            balance = await self.repo.get_balance_as_of(w.id, user_id, as_of)
+            total += balance
+            report += f"💳 **{w.name}:** Rp {balance:,.0f}\n"
+
+        if len(selected) > 1:
+            report += f"\n💰 **Total:** Rp {total:,.0f}"
+        return report
+
+    async def get_net_worth_series(self, user_id: int, months: int = 6) -> str:
+        """Total aset per akhir bulan, dari checkpoint saldo"""
+        since = rules.month_start(date.today())
+        for _ in range(months):
+            since = rules.month_start(since.replace(day=1) - timedelta(days=1))
+        series = await self.repo.get_net_worth_series(user_id, since)
+
+        if not series:
+            return "📭 Belum ada data akhir bulan. Checkpoint saldo dibuat setelah bulan berganti."
 
+        peak = max(abs(v) for _, v in series) or 1
+        report = "📈 **Total Aset Akhir Bulan:**\n\n"
+        for closing_date, value in series:
+            bar = "█" * max(1, round(abs(value) / peak * 10))
+            report += f"`{closing_date.strftime('%m/%Y')}` {bar} Rp {value:,.0f}\n"
         return report
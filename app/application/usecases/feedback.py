@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from app.domain.telegram.ports import TelegramNotifier
+from app.core import metrics
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_TEXT = "⏳ Sedang dicatat..."
+FAILED_TEXT = "⚠️ Gagal memproses pesanmu, coba lagi ya."
+
+
+class ReplyFeedback:
+    """
+    Umpan balik selama proses lambat (LLM + tulis DB). Dipakai sebagai
+    `async with`, balasan akhir dikirim lewat `reply()`:
+
+    - default: sendChatAction "typing" langsung, di-refresh tiap
+      REPLY_TYPING_REFRESH_S sampai balasan final terkirim
+    - REPLY_PLACEHOLDER: pesan "sedang dicatat" yang nanti di-edit jadi balasan
+
+    Feedback jalan di task sendiri, jadi proses utama tidak menunggu round trip
+    ke Telegram. Waktu feedback pertama & balasan final dicatat terpisah
+    (fm_reply_feedback_seconds), dihitung dari webhook diterima.
+    """
+
+    def __init__(self, notifier: TelegramNotifier, chat_id: int, received_at: float,
+                 placeholder: bool | None = None, refresh_interval: float | None = None):
+        self.notifier = notifier
+        self.chat_id = chat_id
+        self.received_at = received_at
+        self.placeholder = settings.REPLY_PLACEHOLDER if placeholder is None else placeholder
+        self.refresh_interval = refresh_interval or settings.REPLY_TYPING_REFRESH_S
+        self._task: Optional[asyncio.Task] = None
+        self._replied = False
+        self._typing_done = asyncio.Event()
+
+    async def __aenter__(self) -> "ReplyFeedback":
+        self._task = asyncio.create_task(self._placeholder() if self.placeholder else self._typing())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if not self._replied and self.placeholder and exc_type is not None:
+            # Jangan tinggalkan "sedang dicatat" selamanya kalau proses gagal
+            await self.reply(FAILED_TEXT, final=False)
+        self._stop()
+
+    async def reply(self, text: str, final: bool = True) -> None:
+        self._replied = True
+        message_id = None
+        if self.placeholder:
+            message_id = await asyncio.shield(self._task)
+        else:
+            # Tunggu sendChatAction yang sedang jalan: kalau sampai setelah
+            # balasan, typing muncul lagi ~5 detik
+            self._typing_done.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+        if message_id is None or not await self.notifier.edit_message_text(self.chat_id, message_id, text):
+            await self.notifier.send_message(self.chat_id, text)
+        if final:
+            metrics.REPLY_FEEDBACK_LATENCY.labels("final").observe(time.perf_counter() - self.received_at)
+
+    def _stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def _first_feedback(self) -> None:
+        metrics.REPLY_FEEDBACK_LATENCY.labels("first").observe(time.perf_counter() - self.received_at)
+
+    async def _typing(self) -> None:
+        first = True
+        while not self._typing_done.is_set():
+            if await self.notifier.send_chat_action(self.chat_id) and first:
+                self._first_feedback()
+                first = False
+            try:
+                await asyncio.wait_for(self._typing_done.wait(), self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _placeholder(self) -> Optional[int]:
+        message_id = await self.notifier.send_tracked_message(self.chat_id, PLACEHOLDER_TEXT)
+        if message_id is not None:
+            self._first_feedback()
+        return message_id
@@ -1,15 +1,34 @@
 import logging
+import time
+from typing import Optional
 from app.application.services.transaction_service import TransactionService
+from app.application.services.chart_service import ChartService
+from app.application.usecases.feedback import ReplyFeedback
 from app.presentation.schemas.telegram import Update, Message
 from app.domain.telegram.entities import TelegramUser
 from app.domain.telegram.rules import ensure_active, reset_to_idle
 from app.domain.telegram.ports import TelegramUserRepo, TelegramNotifier
+from app.core import metrics
+from app.core.admission import ReplyCache
 
 logger = logging.getLogger(__name__)
 
 def _detect_intent(text: str) -> str:
     text_lower = text.lower()
 
+    if text_lower == "budget" or text_lower.startswith("budget "):
+        return "budget"
+
+    if text_lower == "rutin" or text_lower.startswith("rutin "):
+        return "recurring"
+
+    if text_lower == "grafik" or text_lower.startswith("grafik "):
+        return "chart"
+
+    # Sebelum cek saldo/transaksi: "kapan terakhir bayar listrik" bukan transaksi baru
+    if text_lower == "cari" or text_lower.startswith("cari ") or "kapan terakhir" in text_lower:
+        return "search"
+
     balance_keywords = [
         "saldo", "balance", "duit", "uang", "total aset", "total asset",
         "punya berapa", "sisa berapa", "kekayaan", "dana"
@@ -27,31 +46,78 @@ def _detect_intent(text: str) -> str:
 
     return "transaction"
 
+# Command legacy -> intent (nama sama dengan label metrik INTENTS)
+_COMMAND_INTENTS = {
+    "/start": "start",
+    "/saldo": "balance",
+    "/budget": "budget",
+    "/rutin": "recurring",
+    "/networth": "net_worth",
+    "/riwayat": "history",
+    "/grafik": "chart",
+    "/cari": "search",
+}
+
+def classify_intent(text: str) -> str:
+    """Intent dari teks saja (tanpa DB), dipakai rate limit sebelum update diproses"""
+    text = text.strip()
+    command = text.split(maxsplit=1)[0] if text else ""
+    if command in _COMMAND_INTENTS:
+        return _COMMAND_INTENTS[command]
+    return _detect_intent(text)
+
+def admission_intent(text: str, intent: Optional[str] = None) -> str:
+    """
+    Intent untuk admission control. `rutin` tanpa argumen hanya menampilkan
+    daftar (read), jadi tidak ikut antrian tunda seperti tambah/hapus rule
+    """
+    intent = intent or classify_intent(text)
+    if intent == "recurring" and len(text.split()) == 1:
+        return "recurring_list"
+    return intent
+
+def cacheable_intent(text: str, intent: Optional[str] = None) -> Optional[str]:
+    """Intent read yang balasannya boleh dijawab dari cache saat overload"""
+    intent = intent or classify_intent(text)
+    if intent == "history" or (intent == "balance" and " per " not in text.lower()):
+        return intent
+    return None
+
 
 class HandleTelegramUpdate:
     def __init__(
         self,
         user_repo: TelegramUserRepo,
         notifier: TelegramNotifier,
-        trans_service: TransactionService
+        trans_service: TransactionService,
+        reply_cache: Optional[ReplyCache] = None,
+        chart_service: Optional[ChartService] = None
     ):
         self.user_repo = user_repo
         self.notifier = notifier
         self.trans_service = trans_service
+        self.reply_cache = reply_cache
+        self.chart_service = chart_service
 
-    async def execute(self, update: Update) -> None:
-        logger.info(f"Update diterima: {update.model_dump()}")
+    async def execute(self, update: Update, raw: bytes | None = None,
+                      received_at: float | None = None) -> None:
+        # received_at: perf_counter saat webhook diterima, untuk metrik feedback
+        received_at = received_at or time.perf_counter()
+        if raw is not None:
+            logger.debug("Raw update %s: %s", update.update_id, raw)
         if not update.message:
+            logger.debug("Update %s tanpa message, diabaikan", update.update_id)
             return
 
         msg: Message = update.message
         chat_id = msg.chat.id
         text = (msg.text or "").strip()
+        logger.info("Update diterima", extra={"update_id": update.update_id, "chat_id": chat_id})
 
         user = await self.user_repo.get(chat_id)
 
         if not user:
-            logger.info(f"User baru: {chat_id}")
+            logger.info("User baru: %s", chat_id)
             user = TelegramUser(
                 id=chat_id,
                 first_name=msg.chat.first_name,
@@ -80,33 +146,131 @@ class HandleTelegramUpdate:
         # HYBRID INTENT DETECTION
         # ============================================================
         # Command legacy (backward compatibility)
-        if text == "/saldo":
-            msg = await self.trans_service.get_balance_summary(chat_id)
+        if text == "/saldo" or text.startswith("/saldo "):
+            metrics.INTENTS.labels("balance").inc()
+            if " per " in text.lower():
+                msg = await self.trans_service.get_historical_balance(chat_id, text)
+            else:
+                msg = await self.trans_service.get_balance_summary(chat_id)
+                self._remember(chat_id, "balance", msg)
+            await self.notifier.send_message(chat_id, msg)
+            return
+
+        if text == "/budget" or text.startswith("/budget "):
+            metrics.INTENTS.labels("budget").inc()
+            args = text[len("/budget"):].strip()
+            if args:
+                msg = await self.trans_service.set_budget(chat_id, args)
+            else:
+                msg = await self.trans_service.get_budget_summary(chat_id)
+            await self.notifier.send_message(chat_id, msg)
+            return
+
+        if text == "/rutin" or text.startswith("/rutin "):
+            metrics.INTENTS.labels("recurring").inc()
+            await self._handle_recurring(chat_id, text[len("/rutin"):].strip())
+            return
+
+        if text == "/networth":
+            metrics.INTENTS.labels("net_worth").inc()
+            msg = await self.trans_service.get_net_worth_series(chat_id)
+            await self.notifier.send_message(chat_id, msg)
+            return
+
+        if text == "/grafik" or text.startswith("/grafik "):
+            metrics.INTENTS.labels("chart").inc()
+            await self._handle_chart(chat_id, text[len("/grafik"):])
+            return
+
+        if text == "/cari" or text.startswith("/cari "):
+            metrics.INTENTS.labels("search").inc()
+            msg = await self.trans_service.search_transactions(chat_id, text[len("/cari"):])
             await self.notifier.send_message(chat_id, msg)
             return
 
         if text == "/riwayat":
+            metrics.INTENTS.labels("history").inc()
             msg = await self.trans_service.get_last_transactions(chat_id)
+            self._remember(chat_id, "history", msg)
             await self.notifier.send_message(chat_id, msg)
             return
 
         if user.current_state == "IDLE":
             intent = _detect_intent(text)
+            metrics.INTENTS.labels(intent).inc()
 
             if intent == "balance":
-                logger.info(f"Intent detected: CHECK_BALANCE untuk user {chat_id}")
-                msg = await self.trans_service.get_balance_summary(chat_id)
+                logger.info("Intent detected: CHECK_BALANCE untuk user %s", chat_id)
+                if " per " in text.lower():
+                    msg = await self.trans_service.get_historical_balance(chat_id, text)
+                else:
+                    msg = await self.trans_service.get_balance_summary(chat_id)
+                    self._remember(chat_id, "balance", msg)
+                await self.notifier.send_message(chat_id, msg)
+                return
+
+            elif intent == "budget":
+                logger.info("Intent detected: BUDGET untuk user %s", chat_id)
+                args = text[len("budget"):].strip()
+                if args:
+                    msg = await self.trans_service.set_budget(chat_id, args)
+                else:
+                    msg = await self.trans_service.get_budget_summary(chat_id)
+                await self.notifier.send_message(chat_id, msg)
+                return
+
+            elif intent == "recurring":
+                logger.info("Intent detected: RECURRING untuk user %s", chat_id)
+                await self._handle_recurring(chat_id, text[len("rutin"):].strip())
+                return
+
+            elif intent == "chart":
+                await self._handle_chart(chat_id, text[len("grafik"):])
+                return
+
+            elif intent == "search":
+                logger.info("Intent detected: SEARCH untuk user %s", chat_id)
+                msg = await self.trans_service.search_transactions(chat_id, text)
                 await self.notifier.send_message(chat_id, msg)
                 return
 
             elif intent == "history":
-                logger.info(f"Intent detected: CHECK_HISTORY untuk user {chat_id}")
+                logger.info("Intent detected: CHECK_HISTORY untuk user %s", chat_id)
                 msg = await self.trans_service.get_last_transactions(chat_id)
+                self._remember(chat_id, "history", msg)
                 await self.notifier.send_message(chat_id, msg)
                 return
 
-            logger.info(f"Intent detected: TRANSACTION untuk user {chat_id}, processing via LLM")
-            response_text = await self.trans_service.process_natural_language(chat_id, text)
+            logger.info("Intent detected: TRANSACTION untuk user %s, processing via LLM", chat_id)
+            # LLM + tulis DB butuh beberapa detik: typing/placeholder dikirim duluan
+            async with ReplyFeedback(self.notifier, chat_id, received_at) as feedback:
+                response_text = await self.trans_service.process_natural_language(chat_id, text)
+                if self.reply_cache:
+                    self.reply_cache.invalidate(chat_id)
 
-            await self.notifier.send_message(chat_id, response_text)
+                await feedback.reply(response_text)
             return
+
+    def _remember(self, chat_id: int, intent: str, msg: str) -> None:
+        # Disimpan untuk dijawab ulang saat overload (lihat app.core.admission)
+        if self.reply_cache:
+            self.reply_cache.put(chat_id, intent, msg)
+
+    async def _handle_chart(self, chat_id: int, args: str) -> None:
+        # grafik -> pie, grafik bar -> batang; foto dikirim langsung oleh service
+        if not self.chart_service:
+            await self.notifier.send_message(chat_id, "⚠️ Grafik belum tersedia.")
+            return
+        msg = await self.chart_service.send_spending_chart(chat_id, chat_id, args)
+        if msg:
+            await self.notifier.send_message(chat_id, msg)
+
+    async def _handle_recurring(self, chat_id: int, args: str) -> None:
+        # rutin -> daftar, rutin hapus <id> -> stop, selain itu -> rule baru
+        if not args:
+            msg = await self.trans_service.get_recurring_summary(chat_id)
+        elif args.lower().startswith("hapus"):
+            msg = await self.trans_service.stop_recurring(chat_id, args[len("hapus"):].strip())
+        else:
+            msg = await self.trans_service.add_recurring(chat_id, args)
+        await self.notifier.send_message(chat_id, msg)
@@ -0,0 +1,178 @@
+"""
+Admission control global untuk /webhook.
+
+Controller menghitung update yang sedang diproses (in-flight) dan rata-rata
+durasi proses terakhir (EWMA). Dari situ ada tiga level:
+
+- NORMAL: semua update diproses langsung.
+- DEGRADED (in-flight >= soft limit atau latency di atas ambang): saldo &
+  riwayat dijawab dari cache balasan terakhir, transaksi via LLM dan
+  tambah/hapus rule rutin masuk antrian yang diproses dengan concurrency kecil
+  (user dapat balasan "diproses sebentar lagi"), intent lain (termasuk daftar
+  rutin) tetap diproses. Worker antrian hanya jalan
+  selama in-flight di bawah soft limit, jadi selalu ada ruang untuk read.
+- OVERLOADED (in-flight >= hard limit): sama seperti DEGRADED, tapi yang tidak
+  bisa dijawab dari cache atau antrian ditolak dengan balasan "sibuk".
+
+Semua akses terjadi di event loop yang sama, tanpa lock.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from enum import Enum, IntEnum
+from typing import Awaitable, Callable, Optional
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+# Intent yang menulis (transaksi via LLM, tambah/hapus rule rutin): mahal dan
+# boleh ditunda. Daftar rutin = read biasa ("recurring_list", lihat
+# admission_intent)
+DEFERRABLE_INTENTS = frozenset({"transaction", "recurring"})
+
+
+class Level(IntEnum):
+    NORMAL = 0
+    DEGRADED = 1
+    OVERLOADED = 2
+
+
+class Decision(Enum):
+    ADMIT = "admit"
+    CACHED = "cached"
+    DEFER = "defer"
+    REJECT = "reject"
+
+
+class ReplyCache:
+    """Balasan read (saldo, riwayat) terakhir per chat, LRU + TTL"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[int, str], tuple[float, str]] = OrderedDict()
+
+    def get(self, chat_id: int, intent: str) -> Optional[str]:
+        entry = self._entries.get((chat_id, intent))
+        if entry is None:
+            return None
+        expires_at, text = entry
+        if expires_at < time.monotonic():
+            del self._entries[(chat_id, intent)]
+            return None
+        return text
+
+    def put(self, chat_id: int, intent: str, text: str) -> None:
+        key = (chat_id, intent)
+        self._entries[key] = (time.monotonic() + self.ttl, text)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, chat_id: int) -> None:
+        # Saldo & riwayat berubah setelah transaksi baru
+        for intent in ("balance", "history"):
+            self._entries.pop((chat_id, intent), None)
+
+
+class AdmissionController:
+    def __init__(self, soft_in_flight: int, max_in_flight: int, latency_threshold: float,
+                 latency_window: float, queue_size: int, defer_concurrency: int):
+        self.soft_in_flight = soft_in_flight
+        self.max_in_flight = max_in_flight
+        self.latency_threshold = latency_threshold
+        self.latency_window = latency_window
+        self.defer_concurrency = defer_concurrency
+
+        self.in_flight = 0
+        self._latency = 0.0
+        self._latency_at = -math.inf
+        self._queue: asyncio.Queue[Callable[[], Awaitable[None]]] = asyncio.Queue(maxsize=queue_size)
+        self._workers: list[asyncio.Task] = []
+        self._has_room = asyncio.Event()
+
+        metrics.ADMISSION_IN_FLIGHT.set_function(lambda: self.in_flight)
+        metrics.ADMISSION_LEVEL.set_function(lambda: int(self.level()))
+        metrics.ADMISSION_QUEUE_DEPTH.set_function(lambda: self._queue.qsize())
+
+    def recent_latency(self) -> float:
+        # Sampel lama tidak dihitung: kalau sepi, level kembali normal sendiri
+        if time.monotonic() - self._latency_at > self.latency_window:
+            return 0.0
+        return self._latency
+
+    def level(self) -> Level:
+        if self.in_flight >= self.max_in_flight:
+            return Level.OVERLOADED
+        if self.in_flight >= self.soft_in_flight or self.recent_latency() > self.latency_threshold:
+            return Level.DEGRADED
+        return Level.NORMAL
+
+    def admit(self, intent: str, cached: bool = False) -> Decision:
+        """
+        Putuskan nasib satu update. ADMIT langsung dihitung in-flight, jadi
+        pemanggil wajib memanggil release() setelah update selesai.
+        """
+        level = self.level()
+        if level is Level.NORMAL:
+            decision = Decision.ADMIT
+        elif intent in DEFERRABLE_INTENTS:
+            decision = Decision.REJECT if self._queue.full() else Decision.DEFER
+        elif cached:
+            decision = Decision.CACHED
+        else:
+            decision = Decision.ADMIT if level is Level.DEGRADED else Decision.REJECT
+
+        if decision is Decision.ADMIT:
+            self.in_flight += 1
+        metrics.ADMISSION_DECISIONS.labels(decision.value).inc()
+        return decision
+
+    def release(self, duration: float) -> None:
+        self.in_flight -= 1
+        if self.in_flight < self.soft_in_flight:
+            self._has_room.set()
+        now = time.monotonic()
+        if now - self._latency_at > self.latency_window:
+            self._latency = duration
+        else:
+            self._latency = 0.8 * self._latency + 0.2 * duration
+        self._latency_at = now
+
+    def defer(self, job: Callable[[], Awaitable[None]]) -> None:
+        """Masukkan job ke antrian (admit() sudah memastikan masih muat)"""
+        self._queue.put_nowait(job)
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker()) for _ in range(self.defer_concurrency)
+            ]
+
+    async def _worker(self) -> None:
+        while True:
+            while self.in_flight >= self.soft_in_flight:
+                self._has_room.clear()
+                await self._has_room.wait()
+            job = await self._queue.get()
+            self.in_flight += 1
+            started = time.perf_counter()
+            try:
+                await job()
+            except Exception:
+                logger.exception("Update tertunda gagal diproses")
+            finally:
+                self.release(time.perf_counter() - started)
+                self._queue.task_done()
+
+    async def aclose(self, timeout: float = 10.0) -> None:
+        """Habiskan antrian (dengan batas waktu) sebelum pool DB ditutup"""
+        if self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Shutdown: %s update tertunda dibuang", self._queue.qsize())
+        for task in self._workers:
+            task.cancel()
+        self._workers = []
@@ -1,19 +1,34 @@
+import asyncio
+from contextlib import asynccontextmanager
 from functools import lru_cache
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.infrastructure.db.base import get_db
+from app.core.admission import AdmissionController, ReplyCache
+from app.core.rate_limit import RateLimiter
+from app.core.settings import settings
+from app.infrastructure.db.base import get_db, get_read_db, engine, read_engine, warm_up_pool, AsyncSessionLocal
+from app.infrastructure.db.routing import ReplicaRouter
 
 # --- REPOSITORIES ---
 from app.infrastructure.db.repositories.telegram import SqlTelegramUserRepo
 from app.infrastructure.db.repositories.finance import FinanceRepo  # <-- Repository Baru
+from app.infrastructure.db.repositories.broadcast import SqlBroadcastRepo
 
 # --- CLIENTS & INFRA ---
+from app.infrastructure.state.store import create_state_store
 from app.infrastructure.telegram.client import TelegramClient
-from app.infrastructure.llm.client import GeminiLLM  # <-- LLM Baru
+from app.infrastructure.charts.renderer import ProcessChartRenderer
+from app.infrastructure.llm.client import GeminiLLM  # <-- LLM Baru (google.generativeai di-import lazy)
 
 # --- SERVICES & USECASES ---
 from app.application.services.transaction_service import TransactionService # <-- Service Baru
+from app.application.services.chart_service import ChartCache, ChartService
+from app.application.services.recurring_scheduler import RecurringScheduler
+from app.application.services.balance_checkpoints import BalanceCheckpointJob
+from app.application.services.transaction_partitions import TransactionPartitionJob
+from app.application.services.broadcast import BroadcastJob
+from app.application.services.embedding_backfill import EmbeddingBackfillJob
 from app.application.usecases.telegram import HandleTelegramUpdate
 
 # =========================================================
@@ -23,6 +38,56 @@ from app.application.usecases.telegram import HandleTelegramUpdate
 def get_telegram_client():
     return TelegramClient()
 
+@lru_cache()
+def get_state_store():
+    # Cache baris user, tulisan yang ditunda di-flush write-behind ke sys_telegram_user
+    return create_state_store(AsyncSessionLocal)
+
+@lru_cache()
+def get_rate_limiter():
+    return RateLimiter(
+        limits=settings.RATE_LIMITS,
+        max_chats=settings.RATE_LIMIT_MAX_CHATS,
+        notice_interval=settings.RATE_LIMIT_NOTICE_INTERVAL_S,
+    )
+
+@lru_cache()
+def get_admission():
+    return AdmissionController(
+        soft_in_flight=settings.ADMISSION_SOFT_IN_FLIGHT,
+        max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+        latency_threshold=settings.ADMISSION_LATENCY_S,
+        latency_window=settings.ADMISSION_LATENCY_WINDOW_S,
+        queue_size=settings.ADMISSION_QUEUE_SIZE,
+        defer_concurrency=settings.ADMISSION_DEFER_CONCURRENCY,
+    )
+
+@lru_cache()
+def get_reply_cache():
+    # Balasan saldo/riwayat terakhir, dipakai admission control saat overload
+    return ReplyCache(ttl=settings.ADMISSION_CACHE_TTL_S, max_entries=settings.ADMISSION_CACHE_SIZE)
+
+@lru_cache()
+def get_replica_router():
+    # None kalau DATABASE_REPLICA_URL kosong: semua query ke primary
+    if read_engine is None:
+        return None
+    return ReplicaRouter(
+        read_engine,
+        max_lag=settings.REPLICA_MAX_LAG_S,
+        read_your_writes=settings.REPLICA_READ_YOUR_WRITES_S,
+        lag_check_interval=settings.REPLICA_LAG_CHECK_S,
+    )
+
+@lru_cache()
+def get_chart_renderer():
+    # Process pool dibuat saat grafik pertama diminta
+    return ProcessChartRenderer()
+
+@lru_cache()
+def get_chart_cache():
+    return ChartCache(max_entries=settings.CHART_CACHE_SIZE)
+
 @lru_cache()
 def get_llm_client():
     # Inisialisasi Gemini LLM (Singleton)
@@ -32,11 +97,14 @@ def get_llm_client():
 # 2. REPOSITORIES (Scoped per Request)
 # =========================================================
 async def get_user_repo(session: AsyncSession = Depends(get_db)):
-    return SqlTelegramUserRepo(session)
+    return SqlTelegramUserRepo(session, state_store=get_state_store())
 
-async def get_finance_repo(session: AsyncSession = Depends(get_db)):
-    # Inject session ke FinanceRepo
-    return FinanceRepo(session)
+async def get_finance_repo(
+    session: AsyncSession = Depends(get_db),
+    read_session: AsyncSession | None = Depends(get_read_db),
+):
+    # Inject session ke FinanceRepo (+ session replica untuk query laporan)
+    return FinanceRepo(session, read_session=read_session, replica=get_replica_router())
 
 # =========================================================
 # 3. APPLICATION SERVICES (Logic Layer)
@@ -48,16 +116,93 @@ async def get_transaction_service(
     # Rakit Service: Butuh Otak AI (LLM) & Otot Database (FinanceRepo)
     return TransactionService(llm=llm, repo=finance_repo)
 
+async def get_chart_service(finance_repo: FinanceRepo = Depends(get_finance_repo)):
+    return ChartService(
+        repo=finance_repo,
+        renderer=get_chart_renderer(),
+        cache=get_chart_cache(),
+        notifier=get_telegram_client(),
+    )
+
 # =========================================================
 # 4. USECASES (Main Entry Point)
 # =========================================================
 async def get_handle_update(
     user_repo: SqlTelegramUserRepo = Depends(get_user_repo),
     telegram_client: TelegramClient = Depends(get_telegram_client),
-    trans_service: TransactionService = Depends(get_transaction_service) # <-- Inject Service Transaksi
+    trans_service: TransactionService = Depends(get_transaction_service), # <-- Inject Service Transaksi
+    chart_service: ChartService = Depends(get_chart_service)
 ):
     return HandleTelegramUpdate(
         user_repo=user_repo,
         notifier=telegram_client,
-        trans_service=trans_service  # Masukkan service ke UseCase Telegram
+        trans_service=trans_service,  # Masukkan service ke UseCase Telegram
+        reply_cache=get_reply_cache(),
+        chart_service=chart_service
     )
+
+# =========================================================
+# 5. BACKGROUND JOBS (di luar request)
+# =========================================================
+@asynccontextmanager
+async def finance_repo_scope():
+    # Session sendiri per batch, tidak ikut dependency request
+    async with AsyncSessionLocal() as session:
+        yield FinanceRepo(session)
+
+@asynccontextmanager
+async def broadcast_repo_scope():
+    async with AsyncSessionLocal() as session:
+        yield SqlBroadcastRepo(session)
+
+@lru_cache()
+def get_recurring_scheduler():
+    return RecurringScheduler(repo_scope=finance_repo_scope, notifier=get_telegram_client())
+
+@lru_cache()
+def get_checkpoint_job():
+    return BalanceCheckpointJob(repo_scope=finance_repo_scope)
+
+@lru_cache()
+def get_partition_job():
+    return TransactionPartitionJob(repo_scope=finance_repo_scope)
+
+@lru_cache()
+def get_broadcast_job():
+    return BroadcastJob(repo_scope=broadcast_repo_scope, sender=get_telegram_client())
+
+@lru_cache()
+def get_embedding_backfill_job():
+    return EmbeddingBackfillJob(repo_scope=finance_repo_scope)
+
+# =========================================================
+# 6. LIFECYCLE (Startup & Shutdown)
+# =========================================================
+async def warm_up(overrides: dict | None = None):
+    """
+    Bangun adapter berat secara paralel sebelum app menerima request:
+    LLM client (import google.generativeai), koneksi Telegram, pool DB, dan
+    loop flush store user.
+    `overrides` = app.dependency_overrides, supaya fake adapter ikut dipakai.
+    """
+    overrides = overrides or {}
+    llm_factory = overrides.get(get_llm_client, get_llm_client)
+    telegram_client = overrides.get(get_telegram_client, get_telegram_client)()
+
+    await asyncio.gather(
+        asyncio.to_thread(llm_factory),
+        telegram_client.start(),
+        warm_up_pool(),
+        get_state_store().start(),
+    )
+
+async def shutdown():
+    # Transaksi tertunda masih butuh LLM, Telegram, dan DB
+    await get_admission().aclose()
+    await get_telegram_client().aclose()
+    get_chart_renderer().shutdown()
+    # Flush terakhir sebelum pool ditutup
+    await get_state_store().aclose()
+    await engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
@@ -1,7 +1,156 @@
+import atexit
+import copy
+import itertools
+import json
 import logging
+import logging.handlers
+import queue
+import re
+from datetime import datetime, timezone
 
-def setup_logging(level: int = logging.INFO):
-    logging.basicConfig(
-        level=level,
-        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
-    )
+from app.core import metrics
+from app.core.settings import settings
+
+REDACTED = "[REDACTED]"
+REDACT_KEYS = {"text", "message_text", "caption"}
+
+# Atribut bawaan LogRecord, sisanya dianggap field `extra=` dan ikut ke JSON
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+_TEXT_PATTERN = re.compile(r"""(['"](?:text|message_text|caption)['"]\s*:\s*)(['"])(?:\\.|(?!\2).)*\2""")
+
+_listener: logging.handlers.QueueListener | None = None
+_exc_formatter = logging.Formatter()
+
+
+def _redact(value):
+    if isinstance(value, dict):
+        return {k: REDACTED if k in REDACT_KEYS else _redact(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_redact(v) for v in value)
+    return value
+
+
+def _redact_raw(value):
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", "replace")
+    if isinstance(value, str) and "text" in value:
+        return _TEXT_PATTERN.sub(rf"\g<1>\g<2>{REDACTED}\g<2>", value)
+    return value
+
+
+class JsonFormatter(logging.Formatter):
+    """Satu baris JSON per record; field `extra=` ikut sebagai key top-level"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class RedactFilter(logging.Filter):
+    """Sembunyikan isi pesan user (key `text` dsb) di args, extra, maupun pesan jadi"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.args:
+            record.args = _redact(record.args)
+            # Payload mentah (bytes/str JSON) juga bisa memuat isi pesan
+            if isinstance(record.args, tuple) and any(isinstance(a, (bytes, str)) for a in record.args):
+                record.args = tuple(_redact_raw(a) for a in record.args)
+        for key in REDACT_KEYS & record.__dict__.keys():
+            setattr(record, key, REDACTED)
+        if isinstance(record.msg, str) and "text" in record.msg:
+            record.msg = _TEXT_PATTERN.sub(rf"\g<1>\g<2>{REDACTED}\g<2>", record.msg)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Loloskan 1 dari N record per logger untuk level di bawah WARNING.
+    WARNING ke atas selalu lolos.
+    """
+
+    def __init__(self, rates: dict[str, int]):
+        super().__init__()
+        self.rates = {name: rate for name, rate in rates.items() if rate > 1}
+        self._counters = {name: itertools.count() for name in self.rates}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.name)
+        if rate is None:
+            return True
+        return next(self._counters[record.name]) % rate == 0
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Pesan (msg % args) dan traceback dirender di thread pemanggil, seperti
+    QueueHandler bawaan: args bisa objek mutable yang keburu diubah event loop
+    sebelum thread writer menulisnya, dan exc_info menahan frame selama di
+    queue. Yang ditunda ke thread writer hanya format baris/JSON dan write.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # Queue penuh (sink macet): buang record daripada memblok event loop
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.LOGS_DROPPED.inc()
+
+
+def setup_logging(level: int | str | None = None, stream=None):
+    global _listener
+    level = level or settings.LOG_LEVEL
+
+    stream_handler = logging.StreamHandler(stream)
+    if settings.LOG_JSON:
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    queue_handler = LazyQueueHandler(log_queue)
+    # Filter murah jalan di thread pemanggil, supaya record yang dibuang tidak masuk queue
+    queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES))
+    queue_handler.addFilter(RedactFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    if _listener is not None:
+        _listener.stop()
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush sisa record di queue (dipanggil saat shutdown / exit)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,401 @@
+"""
+Registry metrik ringan dengan format exposition Prometheus.
+
+Semua update metrik terjadi di event loop yang sama (satu thread), jadi
+operasi `+=` biasa sudah aman tanpa lock. Ini sengaja tidak memakai
+`prometheus_client` karena setiap child di sana mengambil mutex per update.
+"""
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Optional
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+_REGISTRY: list["_Metric"] = []
+
+
+def _format_labels(labelnames: tuple, labelvalues: tuple, extra: str = "") -> str:
+    pairs = [f'{k}="{v}"' for k, v in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple, object] = {}
+        if not self.labelnames:
+            self._default()
+        _REGISTRY.append(self)
+
+    def labels(self, *labelvalues):
+        child = self._children.get(labelvalues)
+        if child is None:
+            if len(labelvalues) != len(self.labelnames):
+                raise ValueError(f"{self.name} butuh label {self.labelnames}")
+            child = self._children[labelvalues] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        ...
+
+    def _default(self):
+        # Metrik tanpa label langsung dipakai sebagai child tunggal
+        return self.labels()
+
+    def collect(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for labelvalues, child in list(self._children.items()):
+            lines.extend(self._samples(labelvalues, child))
+        return lines
+
+    @abstractmethod
+    def _samples(self, labelvalues: tuple, child) -> list[str]:
+        ...
+
+
+# =========================================================
+# COUNTER
+# =========================================================
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def _samples(self, labelvalues, child):
+        labels = _format_labels(self.labelnames, labelvalues)
+        return [f"{self.name}_total{labels} {_format_value(child.value)}"]
+
+
+# =========================================================
+# GAUGE
+# =========================================================
+class _GaugeChild:
+    __slots__ = ("value", "func")
+
+    def __init__(self):
+        self.value = 0.0
+        self.func: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def set_function(self, func: Callable[[], float]) -> None:
+        """Nilai dihitung saat scrape, bukan di hot path"""
+        self.func = func
+
+    def get(self) -> float:
+        return self.func() if self.func else self.value
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def set_function(self, func: Callable[[], float]) -> None:
+        self._default().set_function(func)
+
+    def _samples(self, labelvalues, child):
+        labels = _format_labels(self.labelnames, labelvalues)
+        return [f"{self.name}{labels} {_format_value(child.get())}"]
+
+
+# =========================================================
+# HISTOGRAM
+# =========================================================
+class _Timer:
+    __slots__ = ("child", "start")
+
+    def __init__(self, child: "_HistogramChild"):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum", "count")
+
+    def __init__(self, upper_bounds: tuple):
+        self.upper_bounds = upper_bounds
+        # Bucket disimpan non-kumulatif, dijumlahkan saat render
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (),
+                 buckets: tuple = DEFAULT_BUCKETS):
+        self.upper_bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self) -> _Timer:
+        return self._default().time()
+
+    def _samples(self, labelvalues, child):
+        lines = []
+        cumulative = 0
+        bounds = self.upper_bounds + (float("inf"),)
+        for bound, count in zip(bounds, list(child.counts)):
+            cumulative += count
+            labels = _format_labels(self.labelnames, labelvalues, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, labelvalues)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+def track(histogram: Histogram):
+    """
+    Decorator untuk coroutine: catat durasi ke histogram dengan label
+    nama fungsi (misal method repository).
+    """
+    def decorator(func):
+        child = histogram.labels(func.__name__)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+
+        return wrapper
+    return decorator
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# =========================================================
+# DEFINISI METRIK APLIKASI
+# =========================================================
+UPDATE_LATENCY = Histogram(
+    "fm_update_duration_seconds",
+    "Durasi dari webhook diterima sampai balasan terkirim",
+)
+REPLY_FEEDBACK_LATENCY = Histogram(
+    "fm_reply_feedback_seconds",
+    "Transaksi LLM: dari webhook diterima sampai feedback pertama (typing/placeholder) dan balasan final",
+    labelnames=("stage",),
+)
+LLM_LATENCY = Histogram(
+    "fm_llm_extraction_duration_seconds",
+    "Durasi ekstraksi transaksi oleh LLM",
+)
+REPO_LATENCY = Histogram(
+    "fm_repo_query_duration_seconds",
+    "Durasi method repository",
+    labelnames=("method",),
+)
+TELEGRAM_LATENCY = Histogram(
+    "fm_telegram_request_duration_seconds",
+    "Durasi request ke Telegram Bot API",
+    labelnames=("method",),
+)
+INTENTS = Counter(
+    "fm_intent",
+    "Jumlah pesan per intent yang terdeteksi",
+    labelnames=("intent",),
+)
+TRANSACTION_OUTCOMES = Counter(
+    "fm_transaction_outcome",
+    "Hasil pemrosesan pesan transaksi",
+    labelnames=("outcome",),
+)
+UPDATES_IN_FLIGHT = Gauge(
+    "fm_updates_in_flight",
+    "Jumlah background task update yang sedang berjalan",
+)
+DB_CONNECTIONS_IN_USE = Gauge(
+    "fm_db_connections_in_use",
+    "Jumlah koneksi DB yang sedang di-checkout dari pool",
+)
+QUERIES_PER_UPDATE = Histogram(
+    "fm_update_queries",
+    "Jumlah statement SQL per update",
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+DB_TIME_PER_UPDATE = Histogram(
+    "fm_update_db_duration_seconds",
+    "Total waktu eksekusi SQL per update",
+)
+SLOW_QUERIES = Counter(
+    "fm_slow_queries",
+    "Jumlah statement SQL yang melewati ambang SLOW_QUERY_MS",
+)
+LOGS_DROPPED = Counter(
+    "fm_logs_dropped",
+    "Jumlah log record yang dibuang karena queue logging penuh",
+)
+RECURRING_BATCH_LATENCY = Histogram(
+    "fm_recurring_batch_duration_seconds",
+    "Durasi satu batch scheduler transaksi rutin (klaim + insert + commit)",
+)
+RECURRING_TRANSACTIONS = Counter(
+    "fm_recurring_transactions",
+    "Jumlah transaksi yang dibuat scheduler transaksi rutin",
+)
+STATE_PENDING_WRITES = Gauge(
+    "fm_state_pending_writes",
+    "Jumlah perubahan state percakapan yang belum di-flush ke Postgres",
+)
+STATE_FLUSHED_WRITES = Counter(
+    "fm_state_flushed_writes",
+    "Jumlah baris state percakapan yang ditulis oleh flush write-behind",
+)
+STATE_FLUSH_LATENCY = Histogram(
+    "fm_state_flush_duration_seconds",
+    "Durasi satu flush batch store user (state + hapus bot_blocked_at)",
+)
+LLM_CALLS = Counter(
+    "fm_llm_calls",
+    "Jumlah call LLM per hasil (ok, empty, invalid, error)",
+    labelnames=("outcome",),
+)
+LLM_CALL_LATENCY = Histogram(
+    "fm_llm_call_duration_seconds",
+    "Durasi satu request ke LLM (per percobaan)",
+)
+LLM_TOKENS = Counter(
+    "fm_llm_tokens",
+    "Jumlah token LLM per jenis (prompt/completion) dan versi prompt",
+    labelnames=("kind", "prompt_version"),
+)
+RATE_LIMITED = Counter(
+    "fm_rate_limited_updates",
+    "Jumlah update yang ditolak rate limit per chat, per intent",
+    labelnames=("intent",),
+)
+RATE_LIMIT_NOTICES = Counter(
+    "fm_rate_limit_notices",
+    "Jumlah balasan 'pelan-pelan' yang dikirim ke chat yang kena rate limit",
+)
+RATE_LIMIT_CHATS = Gauge(
+    "fm_rate_limit_chats",
+    "Jumlah chat di tabel state rate limit (dibatasi LRU)",
+)
+ADMISSION_DECISIONS = Counter(
+    "fm_admission_decisions",
+    "Keputusan admission control per update (admit, cached, defer, reject)",
+    labelnames=("decision",),
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "fm_admission_in_flight",
+    "Jumlah update yang sedang diproses menurut admission control",
+)
+ADMISSION_LEVEL = Gauge(
+    "fm_admission_level",
+    "Level beban: 0 normal, 1 degraded, 2 overloaded",
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "fm_admission_queue_depth",
+    "Jumlah transaksi yang menunggu di antrian tertunda",
+)
+DB_READ_ROUTES = Counter(
+    "fm_db_read_routes",
+    "Tujuan query read-only saat replica dikonfigurasi (replica, primary_own_write, primary_lag)",
+    labelnames=("target",),
+)
+REPLICA_LAG = Gauge(
+    "fm_replica_lag_seconds",
+    "Lag replica terakhir yang terukur (+Inf kalau replica tidak bisa dihubungi)",
+)
+CHART_REQUESTS = Counter(
+    "fm_chart_requests",
+    "Permintaan grafik per sumber balasan (file_id, cached_bytes, render, empty)",
+    labelnames=("source",),
+)
+CHART_RENDER_LATENCY = Histogram(
+    "fm_chart_render_duration_seconds",
+    "Durasi render satu grafik di process pool (termasuk antri)",
+)
+BROADCAST_MESSAGES = Counter(
+    "fm_broadcast_messages",
+    "Pesan broadcast per hasil (sent, blocked, failed)",
+    labelnames=("outcome",),
+)
+BROADCAST_RETRY_AFTER = Counter(
+    "fm_broadcast_retry_after",
+    "Jumlah balasan 429 (retry_after) dari Telegram selama broadcast",
+)
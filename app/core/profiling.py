@@ -0,0 +1,144 @@
+"""
+Akuntansi query dan profiling per update.
+
+`current_update` dibawa lewat contextvar sehingga event hook SQLAlchemy
+(yang jalan di greenlet dengan context yang sama) bisa mencatat jumlah
+dan durasi statement ke update yang sedang diproses.
+"""
+import asyncio
+import cProfile
+import itertools
+import json
+import logging
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.core import metrics
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_RECORDED_STATEMENTS = 200
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])\d+(?:\.\d+)?\b")
+
+
+def redact_statement(statement: str) -> str:
+    """Rapikan whitespace dan ganti literal dengan '?' supaya aman di-log"""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def redact_parameters(parameters) -> str:
+    """Yang di-log hanya tipe parameter, bukan nilainya"""
+    if parameters is None:
+        return "[]"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: <{type(v).__name__}>" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return f"<{len(parameters)} rows>"
+        return "[" + ", ".join(f"<{type(v).__name__}>" for v in parameters) + "]"
+    return f"<{type(parameters).__name__}>"
+
+
+@dataclass
+class UpdateStats:
+    update_id: int
+    started_at: float = field(default_factory=time.perf_counter)
+    query_count: int = 0
+    query_time: float = 0.0
+    statements: list = field(default_factory=list)
+
+    def record_query(self, statement: str, duration: float) -> None:
+        self.query_count += 1
+        self.query_time += duration
+        if len(self.statements) < MAX_RECORDED_STATEMENTS:
+            # Redaksi ditunda sampai benar-benar di-dump
+            self.statements.append((statement, duration))
+
+
+current_update: ContextVar[Optional[UpdateStats]] = ContextVar("current_update", default=None)
+
+_sample_counter = itertools.count(1)
+_profiler_busy = False
+
+
+def _start_sampled_profiler() -> Optional[cProfile.Profile]:
+    global _profiler_busy
+    rate = settings.PROFILE_SAMPLE_RATE
+    if rate <= 0 or next(_sample_counter) % rate != 0 or _profiler_busy:
+        return None
+
+    # Hanya satu profiler aktif dalam satu waktu (cProfile global per thread).
+    # Catatan: hasilnya ikut memuat coroutine lain yang jalan bersamaan.
+    _profiler_busy = True
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _stop_sampled_profiler(profiler: cProfile.Profile) -> None:
+    global _profiler_busy
+    profiler.disable()
+    _profiler_busy = False
+
+
+def _write_profile(profiler: cProfile.Profile, path: str) -> None:
+    os.makedirs(settings.PROFILE_DIR or ".", exist_ok=True)
+    profiler.dump_stats(path)
+
+
+def _write_report(stats: UpdateStats, elapsed: float, path: str) -> None:
+    os.makedirs(settings.PROFILE_DIR or ".", exist_ok=True)
+    report = {
+        "update_id": stats.update_id,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "query_count": stats.query_count,
+        "query_time_ms": round(stats.query_time * 1000, 2),
+        "statements": [
+            {"sql": redact_statement(sql), "ms": round(duration * 1000, 2)}
+            for sql, duration in stats.statements
+        ],
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+@asynccontextmanager
+async def profile_update(update_id: int):
+    stats = UpdateStats(update_id=update_id)
+    token = current_update.set(stats)
+    profiler = _start_sampled_profiler()
+    try:
+        yield stats
+    finally:
+        elapsed = time.perf_counter() - stats.started_at
+        current_update.reset(token)
+
+        metrics.QUERIES_PER_UPDATE.observe(stats.query_count)
+        metrics.DB_TIME_PER_UPDATE.observe(stats.query_time)
+
+        if stats.query_count > settings.QUERY_BUDGET_PER_UPDATE:
+            logger.warning(
+                f"Update {update_id} menjalankan {stats.query_count} query "
+                f"(budget {settings.QUERY_BUDGET_PER_UPDATE}), kemungkinan N+1"
+            )
+
+        base_path = os.path.join(settings.PROFILE_DIR, f"update_{update_id}")
+        if profiler is not None:
+            _stop_sampled_profiler(profiler)
+            await asyncio.to_thread(_write_profile, profiler, f"{base_path}.prof")
+
+        threshold_ms = settings.PROFILE_SLOW_UPDATE_MS
+        if threshold_ms > 0 and elapsed * 1000 >= threshold_ms:
+            logger.warning(f"Update {update_id} lambat: {elapsed:.2f}s, {stats.query_count} query")
+            await asyncio.to_thread(_write_report, stats, elapsed, f"{base_path}.json")
@@ -0,0 +1,80 @@
+"""
+Rate limit inbound per chat (token bucket), dicek di /webhook sebelum update
+dijadwalkan, jadi chat yang kebanjiran pesan tidak memakan koneksi DB atau
+call LLM.
+
+State semua chat ada di satu OrderedDict yang dibatasi LRU: chat yang lama
+tidak aktif dibuang duluan, jadi memori tetap terbatas walau chat-nya jutaan.
+Semua akses terjadi di event loop yang sama, tanpa lock.
+"""
+import time
+from collections import OrderedDict
+from enum import Enum
+
+from app.core import metrics
+
+DEFAULT_LIMIT = "default"
+
+
+class Verdict(Enum):
+    ALLOW = "allow"
+    NOTIFY = "notify"  # ditolak, kirim balasan "pelan-pelan"
+    DROP = "drop"  # ditolak, balasan sudah dikirim baru-baru ini
+
+
+class _ChatBuckets:
+    __slots__ = ("buckets", "notified_at")
+
+    def __init__(self):
+        # nama limit -> [token tersisa, waktu refill terakhir]
+        self.buckets: dict[str, list[float]] = {}
+        self.notified_at = float("-inf")
+
+
+class RateLimiter:
+    def __init__(self, limits: dict[str, tuple[float, float]], max_chats: int,
+                 notice_interval: float, clock=time.monotonic):
+        """
+        limits: intent -> (token per detik, burst). Intent yang tidak terdaftar
+        memakai bucket `default` bersama.
+        """
+        self.limits = limits
+        self.max_chats = max_chats
+        self.notice_interval = notice_interval
+        self.clock = clock
+        self._chats: OrderedDict[int, _ChatBuckets] = OrderedDict()
+        metrics.RATE_LIMIT_CHATS.set_function(lambda: len(self._chats))
+
+    def hit(self, chat_id: int, intent: str) -> Verdict:
+        name = intent if intent in self.limits else DEFAULT_LIMIT
+        limit = self.limits.get(name)
+        if limit is None:
+            return Verdict.ALLOW
+        rate, burst = limit
+        now = self.clock()
+
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = self._chats[chat_id] = _ChatBuckets()
+            if len(self._chats) > self.max_chats:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_id)
+
+        bucket = chat.buckets.get(name)
+        if bucket is None:
+            bucket = chat.buckets[name] = [burst, now]
+        else:
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return Verdict.ALLOW
+
+        metrics.RATE_LIMITED.labels(intent).inc()
+        # Balasan "pelan-pelan" juga dibatasi, supaya spam tidak dibalas spam
+        if now - chat.notified_at >= self.notice_interval:
+            chat.notified_at = now
+            return Verdict.NOTIFY
+        return Verdict.DROP
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -5,8 +7,97 @@ class Settings(BaseSettings):
     GOOGLE_API_KEY: str
     APP_PORT: int
     TELEGRAM_TOKEN: str
+    TELEGRAM_API_BASE: str = "https://api.telegram.org"
 
     DATABASE_URL: str = Field(..., alias="DATABASE_URL")
+    DB_POOL_SIZE: int = 5  # 0 = NullPool (koneksi baru per session)
+    DB_MAX_OVERFLOW: int = 10
+    WARM_UP_RETRY_MAX_S: float = 30.0  # jeda maksimum antar percobaan warm-up (backoff dari 1 detik)
+
+    # Read replica opsional (streaming replica dari DATABASE_URL)
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_MAX_LAG_S: float = 2.0  # lag di atas ini: baca dari primary
+    REPLICA_READ_YOUR_WRITES_S: float = 5.0  # setelah user menulis, bacaannya ke primary selama ini
+    REPLICA_LAG_CHECK_S: float = 1.0
+
+    # LLM
+    LLM_MODEL: str = "gemini-2.5-flash"
+    LLM_MAX_RETRIES: int = 1  # ulang call kalau output tidak lolos validasi DTO
+
+    # Rate limit inbound per chat: intent -> (token per detik, burst), {} = mati
+    RATE_LIMITS: dict[str, tuple[float, float]] = Field(
+        default_factory=lambda: {
+            "transaction": (0.2, 5),  # LLM, paling mahal
+            "recurring": (0.2, 3),
+            "default": (1.0, 20),  # saldo, riwayat, budget, dll
+        }
+    )
+    RATE_LIMIT_MAX_CHATS: int = 100_000  # batas LRU tabel state bucket
+    RATE_LIMIT_NOTICE_INTERVAL_S: float = 30.0  # balasan "pelan-pelan" maksimal sekali per interval
+
+    # Admission control (degradasi saat overload)
+    # Update memegang koneksi DB selama call LLM: jaga batas ini <= DB_POOL_SIZE + DB_MAX_OVERFLOW
+    ADMISSION_SOFT_IN_FLIGHT: int = 10  # mulai degradasi: read dari cache, transaksi LLM ditunda
+    ADMISSION_MAX_IN_FLIGHT: int = 15  # di atas ini yang tidak bisa dicache/ditunda ditolak
+    ADMISSION_LATENCY_S: float = 10.0  # degradasi juga kalau rata-rata durasi proses di atas ini
+    ADMISSION_LATENCY_WINDOW_S: float = 30.0  # sampel latency lebih tua dari ini diabaikan
+    ADMISSION_QUEUE_SIZE: int = 1000  # antrian transaksi tertunda
+    ADMISSION_DEFER_CONCURRENCY: int = 4
+    ADMISSION_CACHE_TTL_S: int = 300  # umur maksimum balasan saldo/riwayat dari cache
+    ADMISSION_CACHE_SIZE: int = 50_000
+
+    # Umpan balik selama transaksi diproses LLM
+    REPLY_TYPING_REFRESH_S: float = 4.0  # indikator typing Telegram hilang setelah ~5 detik
+    REPLY_PLACEHOLDER: bool = False  # kirim "sedang dicatat" lalu edit jadi balasan final (typing tidak dipakai)
+
+    # Observability
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    # 1-in-N sampling untuk log < WARNING per logger (line volume tinggi)
+    LOG_SAMPLE_RATES: dict[str, int] = Field(
+        default_factory=lambda: {"app.infrastructure.telegram.client": 10}
+    )
+    SLOW_QUERY_MS: int = 200
+    QUERY_BUDGET_PER_UPDATE: int = 15
+    PROFILE_SAMPLE_RATE: int = 0  # 1-in-N update di-profile, 0 = mati
+    PROFILE_SLOW_UPDATE_MS: int = 0  # dump update yang lebih lambat dari ini, 0 = mati
+    PROFILE_DIR: str = "profiles"
+
+    # Recurring scheduler
+    RECURRING_INTERVAL_S: int = 0  # 0 = tidak jalan di proses web (pakai worker.py)
+    RECURRING_BATCH_SIZE: int = 1000
+    RECURRING_MAX_CATCHUP: int = 366  # kejadian maksimum per rule per batch
+
+    # Conversation state (write-behind ke sys_telegram_user)
+    STATE_STORE: str = "memory"  # memory | redis (butuh extra `redis`)
+    STATE_REDIS_URL: str = "redis://localhost:6379/0"
+    STATE_TTL_S: int = 3600  # state yang tidak disentuh selama ini dibuang dari cache
+    STATE_FLUSH_INTERVAL_S: float = 2.0  # batas lag tulis ke Postgres
+    STATE_FLUSH_MAX_PENDING: int = 500  # flush lebih awal kalau antrian sebanyak ini
+
+    # Balance checkpoint (saldo akhir bulan)
+    CHECKPOINT_INTERVAL_S: int = 3600
+    CHECKPOINT_BATCH_WALLETS: int = 1000
+
+    # Grafik pengeluaran (/grafik): render di process pool, cache per versi ledger
+    CHART_WORKERS: int = 2
+    CHART_CACHE_SIZE: int = 2000
+    CHART_RENDER_TIMEOUT_S: float = 20.0
+
+    # Partisi bulanan trs_transaction, dibuat worker sebelum bulannya tiba
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_INTERVAL_S: int = 6 * 3600
+
+    # Broadcast pengumuman (broadcast.py): batas global Bot API ~30 pesan/detik
+    BROADCAST_RATE_PER_S: float = 25.0
+    BROADCAST_CONCURRENCY: int = 10  # request sendMessage yang boleh menunggu balasan bersamaan
+    BROADCAST_PAGE_SIZE: int = 200  # user per halaman = per checkpoint (maks. dikirim ulang setelah crash)
+    BROADCAST_MAX_ATTEMPTS: int = 5
+    BROADCAST_PROGRESS_INTERVAL_S: float = 10.0
+
+    # Backfill embedding JSONB -> float32 (backfill_embeddings.py): transaksi per commit
+    EMBEDDING_BACKFILL_BATCH: int = 1000
 
     @property
     def database_url(self) -> str:
@@ -14,6 +105,12 @@ class Settings(BaseSettings):
             return self.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
         return self.DATABASE_URL
 
+    @property
+    def replica_database_url(self) -> Optional[str]:
+        if self.DATABASE_REPLICA_URL and self.DATABASE_REPLICA_URL.startswith("postgresql://"):
+            return self.DATABASE_REPLICA_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+        return self.DATABASE_REPLICA_URL
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 settings = Settings()
@@ -4,14 +4,20 @@ from typing import Optional, Literal
 
 TransactionType = Literal["income", "expense", "transfer"]
 
-@dataclass
+@dataclass(slots=True)
 class Wallet:
     id: int
     name: str
     initial_balance: float
     current_balance: Optional[float] = None
 
-@dataclass
+@dataclass(slots=True)
+class Category:
+    id: int
+    name: str
+    type: TransactionType
+
+@dataclass(slots=True)
 class Transaction:
     id: int
     amount: float
@@ -20,3 +26,41 @@ class Transaction:
     date: date
     wallet_name: str
     category_name: Optional[str] = None
+
+@dataclass(slots=True)
+class SearchPage:
+    """
+    Satu halaman hasil pencarian. truncated = masih ada transaksi cocok yang
+    lebih lama di luar batas kandidat, tidak terjangkau lewat halaman berikutnya
+    """
+    transactions: list[Transaction]
+    truncated: bool = False
+
+@dataclass(slots=True)
+class Budget:
+    category_id: int
+    category_name: str
+    amount: float
+    spent: float = 0.0
+
+    @property
+    def usage_pct(self) -> float:
+        return (self.spent / self.amount * 100) if self.amount else 0.0
+
+@dataclass(slots=True)
+class RecurringRun:
+    """Hasil satu rule yang dieksekusi scheduler (bisa lebih dari 1 kejadian saat catch-up)"""
+    rule_id: int
+    owner_id: int
+    type: TransactionType
+    amount: float
+    description: Optional[str]
+    occurrences: int
+    next_run: date
+
+@dataclass(slots=True)
+class AccountDirectory:
+    """Wallet & category aktif user + budget bulan berjalan, dibaca sekali per pesan transaksi"""
+    wallets: list[Wallet]
+    categories: list[Category]
+    budgets: list[Budget]
@@ -1,15 +1,22 @@
-from typing import Protocol, Optional
+from typing import Protocol, Optional, Sequence
 from datetime import date
-from app.infrastructure.db.models import MstWallet, MstCategory, TrsTransaction
+from app.infrastructure.db.models import MstWallet, MstCategory, TrsTransaction, MstRecurring
+from app.domain.finance.entities import AccountDirectory, Budget, Category, RecurringRun, SearchPage, Transaction, Wallet
 
 class FinanceRepoPort(Protocol):
     async def get_wallet_by_name(self, user_id: int, name: str) -> Optional[MstWallet]: ...
     async def create_wallet(self, user_id: int, name: str, initial_balance: float = 0) -> MstWallet: ...
+    async def list_wallets(self, user_id: int) -> list[Wallet]: ...
     async def get_wallet_balance(self, wallet_id: int, user_id: int) -> float: ...
 
     async def get_category_by_name(self, user_id: int, name: str, type: str) -> Optional[MstCategory]: ...
     async def create_category(self, user_id: int, name: str, type: str) -> MstCategory: ...
 
+    async def get_account_directory(self, user_id: int, period: date) -> AccountDirectory: ...
+    # Tanpa commit: ikut commit create_transactions
+    async def create_accounts(self, user_id: int, wallet_names: list[str],
+                              categories: list[tuple[str, str]]) -> tuple[list[Wallet], list[Category]]: ...
+
     async def create_transaction(
         self,
         user_id: int,
@@ -19,5 +26,45 @@ class FinanceRepoPort(Protocol):
         category_id: Optional[int] = None,
         description: str = None,
         trx_date: date = None,
-        embedding_data: list[float] = None
+        embedding: Optional[Sequence[float]] = None
     ) -> TrsTransaction: ...
+
+    async def create_transactions(self, user_id: int, items: list[dict], trx_date: date = None) -> int: ...
+    async def list_recent_transactions(self, user_id: int, limit: int = 5) -> list[Transaction]: ...
+    async def search_transactions(self, user_id: int, terms: list[str],
+                                  limit: int = 5, offset: int = 0) -> SearchPage: ...
+    # id transaksi -> vektor float32 (numpy)
+    async def get_transaction_embeddings(self, user_id: int, since: date = None) -> dict: ...
+    async def backfill_embeddings(self, after_id: int, limit: int) -> tuple[Optional[int], int]: ...
+
+    async def get_ledger_version(self, user_id: int) -> int: ...
+    async def get_monthly_spending(self, user_id: int, period: date) -> list[tuple[str, float]]: ...
+
+    async def get_budgets(self, user_id: int, period: date) -> list[Budget]: ...
+    async def set_budget(self, user_id: int, category_id: int, amount: float) -> None: ...
+
+    async def create_recurring(
+        self,
+        user_id: int,
+        wallet_id: int,
+        amount: float,
+        type: str,
+        frequency: str,
+        start_date: date,
+        category_id: Optional[int] = None,
+        target_wallet_id: Optional[int] = None,
+        description: str = None
+    ) -> MstRecurring: ...
+    async def get_recurring(self, user_id: int) -> list[MstRecurring]: ...
+    async def deactivate_recurring(self, user_id: int, rule_id: int) -> bool: ...
+    async def run_due_recurring(self, today: date, batch_size: int, max_catchup: int) -> list[RecurringRun]: ...
+
+    async def get_max_wallet_id(self) -> int: ...
+    async def refresh_balance_checkpoints(self, lo_id: int, hi_id: int, last_closing: date) -> int: ...
+    async def ensure_transaction_partition(self, month: date) -> bool: ...
+    async def get_balance_as_of(self, wallet_id: int, user_id: int, as_of: date) -> float: ...
+    async def get_net_worth_series(self, user_id: int, since: date) -> list[tuple[date, float]]: ...
+
+class SpendingChartRenderer(Protocol):
+    # items = [(nama kategori, jumlah)], return PNG
+    async def render(self, kind: str, title: str, items: list[tuple[str, float]]) -> bytes: ...
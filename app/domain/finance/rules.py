@@ -1,5 +1,26 @@
+import re
+from datetime import date, timedelta
+from typing import Optional
 from app.domain.finance.exceptions import InsufficientBalanceError, InvalidTransactionError
 
+BUDGET_ALERT_THRESHOLDS = (100, 80)  # persen, urut dari yang tertinggi
+
+RECURRING_FREQUENCIES = {
+    "harian": "daily", "daily": "daily",
+    "mingguan": "weekly", "weekly": "weekly",
+    "bulanan": "monthly", "monthly": "monthly",
+}
+
+_AMOUNT_PATTERN = re.compile(r"^(\d+(?:[.,]\d+)*)\s*(rb|ribu|k|jt|juta)?$")
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "mei": 5, "may": 5, "jun": 6, "jul": 7,
+    "agu": 8, "agt": 8, "ags": 8, "aug": 8, "sep": 9, "okt": 10, "oct": 10,
+    "nov": 11, "des": 12, "dec": 12,
+}
+_NAMED_DATE = re.compile(r"^(\d{1,2})\s+([a-z]+)(?:\s+(\d{4}))?$")
+_NUMERIC_DATE = re.compile(r"^(\d{1,2})[/-](\d{1,2})(?:[/-](\d{4}))?$")
+
 def validate_transaction_amount(amount: float):
     if amount <= 0:
         raise InvalidTransactionError("Nominal transaksi harus lebih dari 0!")
@@ -20,3 +41,112 @@ def normalize_wallet_name(raw_name: str) -> str:
     if not raw_name:
         return "Cash"
     return raw_name.strip().title()
+
+def parse_amount(raw: str) -> float:
+    """
+    Parse nominal gaya Indonesia: '2jt', '1,5 juta', '500rb', '50k', '2.000.000'.
+    """
+    match = _AMOUNT_PATTERN.match(raw.strip().lower())
+    if not match:
+        raise InvalidTransactionError(f"Nominal '{raw}' tidak dikenali. Contoh: 2jt, 500rb, 150000")
+
+    number, unit = match.groups()
+    if unit:
+        # Dengan satuan, koma/titik dianggap desimal (1,5jt / 1.5jt)
+        value = float(number.replace(",", "."))
+    else:
+        # Tanpa satuan, titik/koma dianggap pemisah ribuan (2.000.000)
+        value = float(number.replace(".", "").replace(",", ""))
+
+    multiplier = {"rb": 1_000, "ribu": 1_000, "k": 1_000, "jt": 1_000_000, "juta": 1_000_000}
+    value *= multiplier.get(unit, 1)
+    validate_transaction_amount(value)
+    return value
+
+def month_start(d: date) -> date:
+    """Periode budget = tanggal 1 di bulan transaksi"""
+    return d.replace(day=1)
+
+def budget_alert_level(limit: float, spent_before: float, spent_after: float) -> Optional[int]:
+    """
+    Return threshold (persen) yang baru saja dilewati oleh transaksi ini,
+    atau None. Alert hanya muncul sekali saat melewati batas, bukan tiap transaksi.
+    """
+    if limit <= 0:
+        return None
+    for pct in BUDGET_ALERT_THRESHOLDS:
+        boundary = limit * pct / 100
+        if spent_before < boundary <= spent_after:
+            return pct
+    return None
+
+def parse_frequency(raw: str) -> str:
+    frequency = RECURRING_FREQUENCIES.get(raw.strip().lower())
+    if not frequency:
+        raise InvalidTransactionError(f"Frekuensi '{raw}' tidak dikenali. Pilih: harian, mingguan, bulanan")
+    return frequency
+
+def month_end(d: date) -> date:
+    return (d.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+def add_months(d: date, months: int) -> date:
+    """Tanggal 1 pada bulan `d` + `months` (boleh negatif)"""
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def last_closing_date(today: date) -> date:
+    """
+    Akhir bulan terakhir yang sudah boleh di-checkpoint. Diberi jeda 1 hari
+    supaya transaksi yang masuk tepat saat pergantian bulan tidak terlewat.
+    """
+    return month_start(today - timedelta(days=1)) - timedelta(days=1)
+
+def parse_as_of_date(raw: str, today: date) -> date:
+    """
+    Parse tanggal: '31 Desember', '31 des 2025', '31/12/2025', '31-12'.
+    Tanpa tahun = kejadian terakhir yang sudah lewat.
+    """
+    text = raw.strip().lower()
+    match = _NAMED_DATE.match(text)
+    if match:
+        day, month_name, year = match.groups()
+        month = _MONTHS.get(month_name[:3])
+    else:
+        match = _NUMERIC_DATE.match(text)
+        day, month, year = match.groups() if match else (None, None, None)
+    if not match or not month:
+        raise InvalidTransactionError(f"Tanggal '{raw}' tidak dikenali. Contoh: 31 Desember, 31/12/2025")
+
+    try:
+        if year:
+            return date(int(year), int(month), int(day))
+        candidate = date(today.year, int(month), int(day))
+        return candidate if candidate <= today else candidate.replace(year=today.year - 1)
+    except ValueError:
+        raise InvalidTransactionError(f"Tanggal '{raw}' tidak valid")
+
+# Kata tanya/pengisi & kata kerja umum yang tidak ikut dicari di deskripsi
+_SEARCH_STOPWORDS = {
+    "cari", "kapan", "terakhir", "transaksi", "pernah", "berapa", "kali", "aku", "saya",
+    "gue", "gw", "yang", "untuk", "buat", "di", "ke", "dan", "beli", "bayar", "sih", "ya",
+}
+_SEARCH_WORD = re.compile(r"[a-z0-9]{2,}|[0-9]")  # huruf tunggal ('s) tidak dicari
+_SEARCH_PAGE = re.compile(r"\s+(?:hal|halaman|page)\s*(\d+)\s*$")
+
+def parse_search_query(raw: str) -> tuple[list[str], int]:
+    """
+    'kapan terakhir bayar listrik? hal 2' -> (['listrik'], 2). Kata yang dipakai
+    hanya huruf/angka, jadi aman disusun jadi tsquery. Kalau semua kata termasuk
+    stopword (misal 'cari bayar'), kata-kata itu tetap dipakai.
+    """
+    text = raw.strip().lower()
+    page = 1
+    match = _SEARCH_PAGE.search(text)
+    if match:
+        page = max(1, int(match.group(1)))
+        text = text[:match.start()]
+
+    words = _SEARCH_WORD.findall(text)
+    terms = [w for w in words if w not in _SEARCH_STOPWORDS] or [w for w in words if w != "cari"]
+    # Urutan dipertahankan, duplikat dibuang
+    return list(dict.fromkeys(terms)), page
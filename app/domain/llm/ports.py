@@ -1,5 +1,5 @@
-from typing import Protocol, Any
+from typing import Protocol, Any, Optional
 
 class LLMPort(Protocol):
-    async def parse_transaction(self, text: str) -> dict:
+    async def parse_transaction(self, text: str, user_id: Optional[int] = None) -> dict:
         ...
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import datetime
 from typing import Optional, Literal
 
 StateType = Literal["IDLE", "WAITING_INPUT"]
@@ -21,3 +22,33 @@ class TelegramUser:
     def change_state(self, new_state: StateType, temp_data: Optional[dict] = None):
         self.current_state = new_state
         self.temp_data = temp_data or {}
+
+@dataclass
+class ConversationState:
+    """current_state + temp_data user (ditulis write-behind, lihat ConversationStateStore)"""
+    state: StateType = "IDLE"
+    temp_data: dict = field(default_factory=dict)
+
+@dataclass(slots=True)
+class Delivery:
+    """Hasil satu kirim pesan ke Bot API, cukup rinci untuk keputusan retry"""
+    ok: bool
+    blocked: bool = False  # user memblokir bot / akun hilang: jangan dikirimi lagi
+    retry_after: Optional[float] = None  # 429 dari Telegram: tunggu sekian detik
+    retryable: bool = False  # timeout / 5xx: boleh dicoba lagi
+    error: Optional[str] = None
+
+@dataclass(slots=True)
+class Broadcast:
+    """
+    Pengumuman ke semua user aktif. last_user_id = checkpoint keyset: semua
+    user dengan id <= ini sudah diproses (None = belum mulai).
+    """
+    id: int
+    text: str
+    parse_mode: Optional[str] = None
+    last_user_id: Optional[int] = None
+    sent: int = 0
+    failed: int = 0
+    blocked: int = 0
+    finished_at: Optional[datetime] = None
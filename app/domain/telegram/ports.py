@@ -1,5 +1,5 @@
 from typing import Protocol, Optional
-from .entities import TelegramUser
+from .entities import Broadcast, ConversationState, Delivery, TelegramUser
 
 class TelegramUserRepo(Protocol):
     async def get(self, telegram_id: int) -> Optional[TelegramUser]: ...
@@ -8,3 +8,34 @@ class TelegramUserRepo(Protocol):
 
 class TelegramNotifier(Protocol):
     async def send_message(self, chat_id: int, text: str, parse_mode: str = "Markdown") -> bool: ...
+    # photo = bytes PNG (upload) atau file_id Telegram; return file_id, None kalau gagal
+    async def send_photo(self, chat_id: int, photo: bytes | str, caption: str | None = None) -> Optional[str]: ...
+    async def send_chat_action(self, chat_id: int, action: str = "typing") -> bool: ...
+    # Return message_id supaya pesan bisa di-edit (placeholder), None kalau gagal
+    async def send_tracked_message(self, chat_id: int, text: str, parse_mode: str | None = None) -> Optional[int]: ...
+    async def edit_message_text(self, chat_id: int, message_id: int, text: str,
+                                parse_mode: str | None = None) -> bool: ...
+
+class BroadcastSender(Protocol):
+    async def deliver_message(self, chat_id: int, text: str, parse_mode: str | None = None) -> Delivery: ...
+
+class BroadcastRepo(Protocol):
+    async def create(self, text: str, parse_mode: str | None = None) -> Broadcast: ...
+    async def get(self, broadcast_id: int) -> Optional[Broadcast]: ...
+    # User aktif yang tidak memblokir bot, id > after_id, urut id (keyset pagination)
+    async def list_recipients(self, after_id: int | None, limit: int) -> list[int]: ...
+    async def count_recipients(self, after_id: int | None) -> int: ...
+    # Simpan checkpoint + tandai user yang memblokir bot (bot_blocked_at) dalam satu commit
+    async def save_progress(self, broadcast: Broadcast, blocked_user_ids: list[int]) -> None: ...
+
+class ConversationStateStore(Protocol):
+    # Cache baris user; None = baca dari DB lalu cache()
+    async def get(self, telegram_id: int) -> Optional[TelegramUser]: ...
+    async def cache(self, user: TelegramUser) -> None: ...
+    # User baru saja ditulis utuh ke DB (upsert)
+    async def saved(self, user: TelegramUser) -> None: ...
+    # User terbaca dari cache: bot_blocked_at dihapus saat flush
+    def touch(self, telegram_id: int) -> None: ...
+    # Perubahan state write-behind (TelegramUserRepo.update_state), di-flush berkala
+    async def set_state(self, telegram_id: int, state: ConversationState) -> None: ...
+    async def flush(self) -> int: ...
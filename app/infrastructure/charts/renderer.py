@@ -0,0 +1,104 @@
+"""
+Render grafik pengeluaran ke PNG di process pool.
+
+matplotlib memakan CPU puluhan ms per gambar; kalau jalan di event loop,
+semua update lain ikut tertahan. Render dilakukan di proses terpisah
+(ProcessPoolExecutor, start method spawn), event loop hanya menunggu bytes.
+matplotlib hanya di-import di proses worker, proses web tidak membayar import-nya.
+"""
+import asyncio
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app.core import metrics
+from app.core.settings import settings
+
+CHART_KINDS = ("pie", "bar")
+MAX_SLICES = 7  # kategori sisanya digabung jadi "Lainnya"
+_OTHER = "Lainnya"
+
+
+def _warm_worker() -> None:
+    # Import matplotlib sekali saat proses worker lahir, bukan di render pertama
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure  # noqa: F401
+
+
+def _top_items(items: list[tuple[str, float]]) -> list[tuple[str, float]]:
+    items = sorted(items, key=lambda item: item[1], reverse=True)
+    if len(items) <= MAX_SLICES:
+        return items
+    rest = sum(amount for _, amount in items[MAX_SLICES - 1:])
+    return items[:MAX_SLICES - 1] + [(_OTHER, rest)]
+
+
+def render_spending_chart(kind: str, title: str, items: list[tuple[str, float]]) -> bytes:
+    """Pie/bar pengeluaran per kategori -> PNG. Fungsi top-level supaya bisa di-pickle ke worker"""
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    items = _top_items(items)
+    labels = [name for name, _ in items]
+    values = [amount for _, amount in items]
+
+    # Figure langsung (tanpa pyplot): tidak ada state global antar render
+    fig = Figure(figsize=(6, 4.5), dpi=100)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    if kind == "bar":
+        positions = range(len(items))[::-1]
+        ax.barh(positions, values, color="#4C72B0")
+        ax.set_yticks(positions, labels)
+        ax.xaxis.set_major_formatter(lambda x, _: f"{x / 1000:,.0f}rb")
+        for y, value in zip(positions, values):
+            ax.text(value, y, f" {value:,.0f}", va="center", fontsize=8)
+        ax.margins(x=0.25)
+    else:
+        ax.pie(values, labels=labels, autopct="%1.0f%%", startangle=90, counterclock=False,
+               textprops={"fontsize": 9})
+        ax.axis("equal")
+    ax.set_title(title)
+    fig.tight_layout()
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
+
+
+class ProcessChartRenderer:
+    def __init__(self, workers: int | None = None, timeout: float | None = None):
+        self.workers = workers or settings.CHART_WORKERS
+        self.timeout = timeout or settings.CHART_RENDER_TIMEOUT_S
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        # Dibuat saat grafik pertama diminta: proses web tanpa /grafik tidak membayar worker
+        if self._pool is None:
+            # spawn, bukan fork: proses web sudah punya thread (threadpool, logging)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+        return self._pool
+
+    async def render(self, kind: str, title: str, items: list[tuple[str, float]]) -> bytes:
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._executor(), render_spending_chart, kind, title, items),
+                self.timeout,
+            )
+        finally:
+            metrics.CHART_RENDER_LATENCY.observe(time.perf_counter() - started)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -1,13 +1,30 @@
+import asyncio
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.pool import NullPool
 from app.core.settings import settings
+from app.infrastructure.db.instrumentation import instrument_engine
 
-engine = create_async_engine(
-    settings.database_url,
-    poolclass=NullPool,
-    echo=False
-)
+# Engine dibangun saat import sengaja: create_async_engine belum membuka koneksi
+# (~1.5ms, Settings() ~3ms). Yang mahal adalah import SQLAlchemy/asyncpg, dan
+# itu tetap dibutuhkan model & router. Koneksi pertama dibuka warm_up_pool.
+if settings.DB_POOL_SIZE > 0:
+    engine = create_async_engine(
+        settings.database_url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=1800,
+        echo=False
+    )
+else:
+    engine = create_async_engine(
+        settings.database_url,
+        poolclass=NullPool,
+        echo=False
+    )
+
+instrument_engine(engine)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -17,6 +34,28 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False
 )
 
+# Replica read-only opsional: query laporan (saldo, riwayat, dst) dialihkan ke
+# sini oleh FinanceRepo lewat ReplicaRouter
+read_engine = None
+ReadSessionLocal = None
+if settings.DATABASE_REPLICA_URL:
+    read_engine = create_async_engine(
+        settings.replica_database_url,
+        pool_size=max(1, settings.DB_POOL_SIZE),
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=1800,
+        echo=False
+    )
+    instrument_engine(read_engine)
+
+    ReadSessionLocal = async_sessionmaker(
+        bind=read_engine,
+        class_=AsyncSession,
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
 class Base(DeclarativeBase):
     pass
 
@@ -26,3 +65,25 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+async def get_read_db():
+    # None kalau replica tidak dikonfigurasi; session tidak connect sebelum dipakai
+    if ReadSessionLocal is None:
+        yield None
+        return
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+async def warm_up_pool() -> None:
+    """Buka koneksi sebanyak pool_size sekaligus supaya request pertama tidak connect"""
+    async def _ping(target):
+        async with target.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    engines = [engine] + ([read_engine] if read_engine is not None else [])
+    await asyncio.gather(*(
+        _ping(target) for target in engines for _ in range(max(1, settings.DB_POOL_SIZE))
+    ))
@@ -0,0 +1,45 @@
+import logging
+import time
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core import metrics
+from app.core.profiling import current_update, redact_statement, redact_parameters
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Pasang event hook untuk metrik pool, akuntansi query per update, dan slow-query log"""
+    sync_engine = engine.sync_engine
+
+    # Hitung koneksi aktif lewat event pool (berlaku juga untuk NullPool)
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_conn, conn_record, conn_proxy):
+        metrics.DB_CONNECTIONS_IN_USE.inc()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_conn, conn_record):
+        metrics.DB_CONNECTIONS_IN_USE.dec()
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_start_time"].pop()
+
+        stats = current_update.get()
+        if stats is not None:
+            stats.record_query(statement, duration)
+
+        if duration * 1000 >= settings.SLOW_QUERY_MS:
+            metrics.SLOW_QUERIES.inc()
+            logger.warning(
+                "Slow query %.1fms (update=%s): %s params=%s",
+                duration * 1000,
+                stats.update_id if stats else "-",
+                redact_statement(statement),
+                redact_parameters(parameters),
+            )
@@ -1,8 +1,8 @@
 from sqlalchemy import (
-    BigInteger, Boolean, CheckConstraint, Date, DateTime, ForeignKey,
-    Integer, Numeric, String, Text, UniqueConstraint, func, Index
+    BigInteger, Boolean, CheckConstraint, Computed, Date, DateTime, ForeignKey,
+    Integer, LargeBinary, Numeric, PrimaryKeyConstraint, String, Text, UniqueConstraint, func, Index
 )
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import Optional, List
 from datetime import datetime, date
@@ -19,6 +19,9 @@ class SysTelegramUser(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    # Diisi broadcast saat Telegram menjawab 403 (bot diblokir), dikosongkan
+    # saat user mengirim pesan lagi. Terpisah dari is_active (status akun)
+    bot_blocked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     current_state: Mapped[str] = mapped_column(String(50), default="IDLE")
     temp_data: Mapped[Optional[dict]] = mapped_column(JSONB, default={})
 
@@ -30,6 +33,27 @@ class SysTelegramUser(Base):
         return f"<User {self.id} - {self.first_name}>"
 
 
+class SysBroadcast(Base):
+    """
+    Pengumuman ke semua user (lihat broadcast.py). Checkpoint last_user_id +
+    counter ditulis per halaman, jadi job yang crash bisa dilanjutkan.
+    """
+    __tablename__ = "sys_broadcast"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    parse_mode: Mapped[Optional[str]] = mapped_column(String(20))
+
+    last_user_id: Mapped[Optional[int]] = mapped_column(BigInteger)
+    sent: Mapped[int] = mapped_column(Integer, default=0)
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+    blocked: Mapped[int] = mapped_column(Integer, default=0)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+
 class MstWallet(Base):
     __tablename__ = "mst_wallet"
     __table_args__ = (
@@ -75,7 +99,11 @@ class TrsTransaction(Base):
     __tablename__ = "trs_transaction"
     __table_args__ = (
         CheckConstraint("type IN ('income','expense','transfer')", name="ck_trx_type"),
-        Index("idx_trx_owner_date", "owner_telegram_user_id", "trx_date"),
+        # INCLUDE: pencarian deskripsi per user cukup index-only scan (lihat search_transactions)
+        Index("idx_trx_owner_date", "owner_telegram_user_id", "trx_date",
+              postgresql_include=["id", "search_vector"]),
+        # Partisi per bulan (lihat TransactionPartitionJob); PK wajib memuat trx_date
+        {"postgresql_partition_by": "RANGE (trx_date)"},
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -86,12 +114,22 @@ class TrsTransaction(Base):
 
     target_wallet_id: Mapped[Optional[int]] = mapped_column(ForeignKey("mst_wallet.id"), nullable=True)
 
-    trx_date: Mapped[date] = mapped_column(Date, default=func.current_date())
+    trx_date: Mapped[date] = mapped_column(Date, primary_key=True, default=func.current_date())
     type: Mapped[str] = mapped_column(String(10)) # income, expense, transfer
     amount: Mapped[Numeric] = mapped_column(Numeric(18, 2), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String(255))
+    # Dihitung Postgres saat insert/update; deferred: hanya dibaca query pencarian
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('indonesian'::regconfig, coalesce(description, ''))", persisted=True),
+        deferred=True,
+    )
 
-    embedding_data: Mapped[Optional[list[float]]] = mapped_column(JSONB, nullable=True)
+    # float32 little-endian dipak (4 byte per dimensi, lihat pack_embedding di FinanceRepo).
+    # Deferred: query riwayat tidak ikut membaca/men-detoast vektor
+    embedding: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True, deferred=True)
+    # Format lama (list float JSON), dikosongkan backfill_embeddings.py
+    embedding_data: Mapped[Optional[list[float]]] = mapped_column(JSONB, nullable=True, deferred=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
@@ -99,3 +137,102 @@ class TrsTransaction(Base):
     wallet: Mapped["MstWallet"] = relationship(foreign_keys=[wallet_id], back_populates="transactions")
     target_wallet: Mapped["MstWallet"] = relationship(foreign_keys=[target_wallet_id])
     category: Mapped["MstCategory"] = relationship()
+
+
+class MstBudget(Base):
+    __tablename__ = "mst_budget"
+    __table_args__ = (
+        UniqueConstraint("owner_telegram_user_id", "category_id", name="uq_budget_user_category"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    owner_telegram_user_id: Mapped[int] = mapped_column(ForeignKey("sys_telegram_user.id"))
+    category_id: Mapped[int] = mapped_column(ForeignKey("mst_category.id"), nullable=False)
+
+    # Limit per bulan
+    amount: Mapped[Numeric] = mapped_column(Numeric(18, 2), nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    category: Mapped["MstCategory"] = relationship()
+
+
+class TrsMonthlySpend(Base):
+    """
+    Counter pengeluaran per (user, kategori, bulan). Di-update atomik di
+    create_transaction, supaya cek budget tidak perlu scan trs_transaction.
+    """
+    __tablename__ = "trs_monthly_spend"
+    __table_args__ = (
+        PrimaryKeyConstraint("owner_telegram_user_id", "category_id", "period", name="pk_monthly_spend"),
+    )
+
+    owner_telegram_user_id: Mapped[int] = mapped_column(ForeignKey("sys_telegram_user.id"))
+    category_id: Mapped[int] = mapped_column(ForeignKey("mst_category.id"))
+    period: Mapped[date] = mapped_column(Date)  # tanggal 1 di bulan tersebut
+    spent: Mapped[Numeric] = mapped_column(Numeric(18, 2), nullable=False, default=0)
+
+
+class TrsLedgerVersion(Base):
+    """
+    Versi ledger per user, naik di setiap commit yang menulis transaksi.
+    Dipakai sebagai kunci cache hasil turunan (grafik), bukan sumber data.
+    """
+    __tablename__ = "trs_ledger_version"
+
+    owner_telegram_user_id: Mapped[int] = mapped_column(ForeignKey("sys_telegram_user.id"), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=1)
+
+
+class MstRecurring(Base):
+    """
+    Aturan transaksi rutin (gaji, langganan, kos). Kejadian ke-k jatuh di
+    start_date + k * frequency; next_run selalu = kejadian ke-run_count.
+    """
+    __tablename__ = "mst_recurring"
+    __table_args__ = (
+        CheckConstraint("type IN ('income','expense','transfer')", name="ck_recurring_type"),
+        CheckConstraint("frequency IN ('daily','weekly','monthly')", name="ck_recurring_frequency"),
+        # Scheduler hanya mencari rule aktif yang sudah jatuh tempo
+        Index("idx_recurring_due", "next_run", postgresql_where="is_active"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    owner_telegram_user_id: Mapped[int] = mapped_column(ForeignKey("sys_telegram_user.id"), index=True)
+
+    wallet_id: Mapped[int] = mapped_column(ForeignKey("mst_wallet.id"), nullable=False)
+    category_id: Mapped[Optional[int]] = mapped_column(ForeignKey("mst_category.id"), nullable=True)
+    target_wallet_id: Mapped[Optional[int]] = mapped_column(ForeignKey("mst_wallet.id"), nullable=True)
+
+    type: Mapped[str] = mapped_column(String(10))
+    amount: Mapped[Numeric] = mapped_column(Numeric(18, 2), nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(String(255))
+
+    frequency: Mapped[str] = mapped_column(String(10))  # daily, weekly, monthly
+    start_date: Mapped[date] = mapped_column(Date, nullable=False)
+    next_run: Mapped[date] = mapped_column(Date, nullable=False)
+    run_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    wallet: Mapped["MstWallet"] = relationship(foreign_keys=[wallet_id])
+    category: Mapped["MstCategory"] = relationship()
+
+
+class TrsBalanceCheckpoint(Base):
+    """
+    Saldo penutupan wallet per akhir bulan (termasuk initial_balance), ditulis
+    job background. Saldo per tanggal X = checkpoint terakhir <= X + delta sesudahnya.
+    """
+    __tablename__ = "trs_balance_checkpoint"
+    __table_args__ = (
+        PrimaryKeyConstraint("wallet_id", "closing_date", name="pk_balance_checkpoint"),
+        Index("idx_checkpoint_owner_date", "owner_telegram_user_id", "closing_date"),
+    )
+
+    wallet_id: Mapped[int] = mapped_column(ForeignKey("mst_wallet.id"))
+    closing_date: Mapped[date] = mapped_column(Date)  # tanggal terakhir di bulan tersebut
+    owner_telegram_user_id: Mapped[int] = mapped_column(ForeignKey("sys_telegram_user.id"))
+    balance: Mapped[Numeric] = mapped_column(Numeric(18, 2), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
@@ -0,0 +1,70 @@
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.telegram.entities import Broadcast
+from app.domain.telegram.ports import BroadcastRepo
+from app.infrastructure.db.models import SysBroadcast, SysTelegramUser
+
+_user = SysTelegramUser.__table__
+_broadcast = SysBroadcast.__table__
+
+
+def _entity(row) -> Broadcast:
+    return Broadcast(
+        id=row.id, text=row.text, parse_mode=row.parse_mode, last_user_id=row.last_user_id,
+        sent=row.sent, failed=row.failed, blocked=row.blocked, finished_at=row.finished_at,
+    )
+
+
+# Penerima: akun aktif yang tidak memblokir bot
+_RECIPIENT = _user.c.is_active & _user.c.bot_blocked_at.is_(None)
+
+
+def _after(stmt, after_id: int | None):
+    # Keyset: lanjut dari id terakhir lewat PK, tanpa OFFSET
+    return stmt if after_id is None else stmt.where(_user.c.id > after_id)
+
+
+class SqlBroadcastRepo(BroadcastRepo):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(self, text: str, parse_mode: str | None = None) -> Broadcast:
+        stmt = insert(_broadcast).values(
+            text=text, parse_mode=parse_mode, sent=0, failed=0, blocked=0
+        ).returning(*_broadcast.c)
+        row = (await self.session.execute(stmt)).one()
+        await self.session.commit()
+        return _entity(row)
+
+    async def get(self, broadcast_id: int) -> Broadcast | None:
+        row = (await self.session.execute(
+            select(_broadcast).where(_broadcast.c.id == broadcast_id)
+        )).one_or_none()
+        return _entity(row) if row else None
+
+    async def list_recipients(self, after_id: int | None, limit: int) -> list[int]:
+        stmt = _after(select(_user.c.id).where(_RECIPIENT), after_id)
+        result = await self.session.execute(stmt.order_by(_user.c.id).limit(limit))
+        return list(result.scalars())
+
+    async def count_recipients(self, after_id: int | None) -> int:
+        stmt = _after(select(func.count()).select_from(_user).where(_RECIPIENT), after_id)
+        return (await self.session.execute(stmt)).scalar_one()
+
+    async def save_progress(self, broadcast: Broadcast, blocked_user_ids: list[int]) -> None:
+        if blocked_user_ids:
+            await self.session.execute(
+                update(_user).where(_user.c.id.in_(blocked_user_ids)).values(bot_blocked_at=func.now())
+            )
+        await self.session.execute(
+            update(_broadcast).where(_broadcast.c.id == broadcast.id).values(
+                last_user_id=broadcast.last_user_id,
+                sent=broadcast.sent,
+                failed=broadcast.failed,
+                blocked=broadcast.blocked,
+                finished_at=broadcast.finished_at,
+                updated_at=func.now(),
+            )
+        )
+        await self.session.commit()
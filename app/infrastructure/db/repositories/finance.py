@@ -1,14 +1,336 @@
+import struct
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc, or_
-from app.infrastructure.db.models import MstWallet, MstCategory, TrsTransaction, SysTelegramUser
-from typing import List, Optional
+from sqlalchemy import select, func, desc, or_, text, update, case, literal_column, bindparam, null
+from sqlalchemy.dialects.postgresql import insert
+from app.infrastructure.db.models import (
+    MstWallet, MstCategory, TrsTransaction, SysTelegramUser, MstBudget, TrsMonthlySpend, MstRecurring,
+    TrsBalanceCheckpoint, TrsLedgerVersion
+)
+from app.domain.finance.entities import (
+    AccountDirectory, Budget, Category, RecurringRun, SearchPage, Transaction, Wallet
+)
+from app.domain.finance.rules import add_months, month_start
+from typing import TYPE_CHECKING, List, Optional, Sequence
 from datetime import date
+from app.core.metrics import track, REPO_LATENCY
+from app.infrastructure.db.routing import ReplicaRouter
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Advisory lock checkpoint saldo: job refresh ambil exclusive, penulis transaksi
+# back-dated ambil shared. Jadi checkpoint tidak pernah dihitung dari snapshot
+# yang belum melihat transaksi back-dated yang sedang di-commit.
+CHECKPOINT_LOCK_KEY = 7310036
+
+# Advisory lock pembuatan partisi trs_transaction (beberapa worker boleh jalan)
+PARTITION_LOCK_KEY = 7310042
+
+# Riwayat terbaru dicari dulu di partisi N bulan terakhir saja
+RECENT_TRANSACTIONS_MONTHS = 3
+
+# Pencarian deskripsi: config harus sama dengan kolom TrsTransaction.search_vector
+# (stemming 'pembayaran' -> 'bayar'). Hanya N transaksi cocok terbaru yang
+# diranking & dipaginasi; halaman yang mencapai batas itu melaporkan truncated.
+_SEARCH_CONFIG = literal_column("'indonesian'::regconfig")
+SEARCH_CANDIDATES = 100
+
+# Fast path baca (list_*): statement Core dibangun sekali di sini, parameter
+# lewat bindparam. Cache compile SQLAlchemy selalu hit tanpa membangun select()
+# baru, SQL-nya identik jadi prepared statement asyncpg per koneksi dipakai
+# ulang, dan baris langsung jadi entity slotted tanpa identity map ORM.
+_trx = TrsTransaction.__table__
+_wallet = MstWallet.__table__
+_category = MstCategory.__table__
+_budget = MstBudget.__table__
+_spend = TrsMonthlySpend.__table__
+
+_WALLETS_STMT = select(
+    _wallet.c.id, _wallet.c.name, _wallet.c.initial_balance
+).where(
+    _wallet.c.owner_telegram_user_id == bindparam("user_id"),
+    _wallet.c.is_active == True
+).order_by(_wallet.c.name)
+
+# Kolom urut field entity Transaction
+_TRANSACTION_ROW = select(
+    _trx.c.id, _trx.c.amount, _trx.c.type, _trx.c.description, _trx.c.trx_date,
+    _wallet.c.name, _category.c.name
+).select_from(
+    _trx.join(_wallet, _wallet.c.id == _trx.c.wallet_id)
+    .outerjoin(_category, _category.c.id == _trx.c.category_id)
+)
+_RECENT_TRANSACTIONS_STMT = _TRANSACTION_ROW.where(
+    _trx.c.owner_telegram_user_id == bindparam("user_id")
+).order_by(
+    desc(_trx.c.trx_date), desc(_trx.c.created_at), desc(_trx.c.id)
+).limit(bindparam("limit"))
+_RECENT_TRANSACTIONS_SINCE_STMT = _RECENT_TRANSACTIONS_STMT.where(_trx.c.trx_date >= bindparam("since"))
+# Partisi dipangkas dengan daftar tanggal, baris diambil lewat PK (id, trx_date)
+_TRANSACTIONS_BY_KEY_STMT = _TRANSACTION_ROW.where(
+    _trx.c.owner_telegram_user_id == bindparam("user_id"),
+    _trx.c.id.in_(bindparam("ids", expanding=True)),
+    _trx.c.trx_date.in_(bindparam("dates", expanding=True))
+)
+
+# Hanya kolom di idx_trx_owner_date (key + INCLUDE): index-only scan per
+# partisi tanpa parsing deskripsi. Baris halaman lalu diambil terpisah lewat
+# _TRANSACTIONS_BY_KEY_STMT; kalau di-join di sini planner memilih hash join
+# atas semua transaksi user.
+_search_query = func.to_tsquery(_SEARCH_CONFIG, bindparam("query"))
+_search_candidates = select(
+    _trx.c.id, _trx.c.trx_date, func.ts_rank_cd(_trx.c.search_vector, _search_query).label("rank")
+).where(
+    _trx.c.owner_telegram_user_id == bindparam("user_id"),
+    _trx.c.search_vector.op("@@")(_search_query)
+).order_by(
+    desc(_trx.c.trx_date), desc(_trx.c.id)
+).limit(bindparam("candidates")).subquery()
+_SEARCH_PAGE_STMT = select(_search_candidates.c.id, _search_candidates.c.trx_date).order_by(
+    desc(_search_candidates.c.rank), desc(_search_candidates.c.trx_date), desc(_search_candidates.c.id)
+).limit(bindparam("limit")).offset(bindparam("offset"))
+# Ada transaksi cocok sesudah kandidat terakhir? Hanya dicek kalau halaman
+# mencapai batas kandidat
+_SEARCH_BEYOND_STMT = select(_trx.c.id).where(
+    _trx.c.owner_telegram_user_id == bindparam("user_id"),
+    _trx.c.search_vector.op("@@")(_search_query)
+).order_by(desc(_trx.c.trx_date), desc(_trx.c.id)).offset(bindparam("candidates")).limit(1)
+
+_BUDGETS_STMT = select(
+    _budget.c.category_id, _category.c.name, _budget.c.amount, func.coalesce(_spend.c.spent, 0)
+).select_from(
+    _budget.join(_category, _category.c.id == _budget.c.category_id).outerjoin(
+        _spend,
+        (_spend.c.owner_telegram_user_id == _budget.c.owner_telegram_user_id)
+        & (_spend.c.category_id == _budget.c.category_id)
+        & (_spend.c.period == bindparam("period"))
+    )
+).where(
+    _budget.c.owner_telegram_user_id == bindparam("user_id"),
+    _budget.c.is_active == True
+)
+_BUDGETS_ORDERED_STMT = _BUDGETS_STMT.order_by(_category.c.name)
+
+# Embedding per transaksi (float32 terpak), hanya dibaca kalau diminta
+_EMBEDDINGS_STMT = select(_trx.c.id, _trx.c.embedding).where(
+    _trx.c.owner_telegram_user_id == bindparam("user_id"),
+    _trx.c.embedding.is_not(None)
+)
+_EMBEDDINGS_SINCE_STMT = _EMBEDDINGS_STMT.where(_trx.c.trx_date >= bindparam("since"))
+
+# Backfill embedding_data (JSONB) -> embedding: keyset id, baris yang sudah
+# dikonversi embedding_data-nya jadi NULL
+_LEGACY_EMBEDDINGS_STMT = select(_trx.c.id, _trx.c.trx_date, _trx.c.embedding_data).where(
+    _trx.c.id > bindparam("after_id"),
+    _trx.c.embedding_data.is_not(None)
+).order_by(_trx.c.id).limit(bindparam("limit"))
+_PACK_EMBEDDING_STMT = update(_trx).where(
+    _trx.c.id == bindparam("b_id"),
+    _trx.c.trx_date == bindparam("b_trx_date")
+).values(embedding=bindparam("b_embedding"), embedding_data=null())
+
+# Prefetch pesan transaksi (get_account_directory), jalan selagi LLM berpikir
+_CATEGORIES_STMT = select(_category.c.id, _category.c.name, _category.c.type).where(
+    _category.c.owner_telegram_user_id == bindparam("user_id"),
+    _category.c.is_active == True
+)
+
+
+def _transaction(row) -> Transaction:
+    return Transaction(row[0], float(row[1]), row[2], row[3], row[4], row[5], row[6])
+
+
+def _budget_entity(row) -> Budget:
+    return Budget(row[0], row[1], float(row[2]), float(row[3]))
+
+
+def pack_embedding(values: Sequence[float]) -> bytes:
+    """Vektor -> float32 little-endian (format kolom TrsTransaction.embedding)"""
+    if hasattr(values, "astype"):  # numpy array: tanpa lewat float Python
+        return values.astype("<f4", copy=False).tobytes()
+    return struct.pack(f"<{len(values)}f", *values)
+
+
+def unpack_embedding(data: bytes) -> "np.ndarray":
+    """Array numpy float32 read-only di atas buffer `data` langsung (tanpa salin/parsing)"""
+    # Import di sini: hanya jalur embedding yang butuh numpy, startup web tidak membayarnya
+    import numpy as np
+    return np.frombuffer(data, dtype="<f4")
+
+_RECURRING_STEP = """
+CASE r.frequency WHEN 'daily' THEN interval '1 day'
+                 WHEN 'weekly' THEN interval '7 days'
+                 ELSE interval '1 month' END
+"""
+
+# Satu statement per batch: klaim rule jatuh tempo (SKIP LOCKED, aman untuk
+# banyak worker), bentuk semua kejadian yang terlewat sampai :today,
+# bulk insert transaksi + counter budget + versi ledger, lalu majukan next_run.
+_RUN_DUE_RECURRING_SQL = f"""
+WITH due AS (
+    SELECT id FROM mst_recurring
+    WHERE is_active AND next_run <= CAST(:today AS date)
+    ORDER BY next_run
+    LIMIT :batch_size
+    FOR UPDATE SKIP LOCKED
+),
+occ AS (
+    SELECT r.id, r.owner_telegram_user_id, r.wallet_id, r.category_id, r.target_wallet_id,
+           r.type, r.amount, r.description,
+           (r.start_date + k * {_RECURRING_STEP})::date AS trx_date
+    FROM mst_recurring r
+    JOIN due ON due.id = r.id
+    CROSS JOIN LATERAL generate_series(
+        r.run_count,
+        LEAST(
+            r.run_count + :max_catchup - 1,
+            CASE r.frequency
+                WHEN 'daily' THEN CAST(:today AS date) - r.start_date
+                WHEN 'weekly' THEN (CAST(:today AS date) - r.start_date) / 7
+                ELSE (extract(year FROM CAST(:today AS date)) - extract(year FROM r.start_date))::int * 12
+                     + (extract(month FROM CAST(:today AS date)) - extract(month FROM r.start_date))::int
+            END
+        )
+    ) k
+    WHERE (r.start_date + k * {_RECURRING_STEP})::date <= CAST(:today AS date)
+),
+ins AS (
+    INSERT INTO trs_transaction (
+        owner_telegram_user_id, wallet_id, category_id, target_wallet_id,
+        trx_date, type, amount, description
+    )
+    SELECT owner_telegram_user_id, wallet_id, category_id, target_wallet_id,
+           trx_date, type, amount, description
+    FROM occ
+),
+spend AS (
+    INSERT INTO trs_monthly_spend (owner_telegram_user_id, category_id, period, spent)
+    SELECT owner_telegram_user_id, category_id, date_trunc('month', trx_date)::date, sum(amount)
+    FROM occ
+    WHERE type = 'expense' AND category_id IS NOT NULL
+    GROUP BY 1, 2, 3
+    ORDER BY 1, 2, 3  -- urutan lock tetap, supaya worker paralel tidak deadlock
+    ON CONFLICT ON CONSTRAINT pk_monthly_spend
+    DO UPDATE SET spent = trs_monthly_spend.spent + excluded.spent
+),
+legs AS (
+    SELECT wallet_id, trx_date, CASE WHEN type = 'income' THEN amount ELSE -amount END AS delta
+    FROM occ
+    UNION ALL
+    SELECT target_wallet_id, trx_date, amount
+    FROM occ
+    WHERE type = 'transfer' AND target_wallet_id IS NOT NULL
+),
+ledger AS (
+    INSERT INTO trs_ledger_version (owner_telegram_user_id, version)
+    SELECT DISTINCT owner_telegram_user_id, 1 FROM occ
+    ORDER BY 1
+    ON CONFLICT (owner_telegram_user_id)
+    DO UPDATE SET version = trs_ledger_version.version + 1
+),
+shift AS (
+    -- Kejadian catch-up di bulan yang sudah di-checkpoint: geser checkpoint sesudahnya
+    UPDATE trs_balance_checkpoint c
+    SET balance = c.balance + d.delta
+    FROM (
+        SELECT c2.wallet_id, c2.closing_date, sum(l.delta) AS delta
+        FROM legs l
+        JOIN trs_balance_checkpoint c2 ON c2.wallet_id = l.wallet_id AND c2.closing_date >= l.trx_date
+        GROUP BY 1, 2
+    ) d
+    WHERE c.wallet_id = d.wallet_id AND c.closing_date = d.closing_date
+),
+runs AS (
+    SELECT id, count(*) AS n FROM occ GROUP BY id
+)
+UPDATE mst_recurring r
+SET run_count = r.run_count + runs.n,
+    next_run = (r.start_date + (r.run_count + runs.n) * {_RECURRING_STEP})::date
+FROM runs
+WHERE r.id = runs.id
+RETURNING r.id, r.owner_telegram_user_id, r.type, r.amount, r.description, runs.n, r.next_run
+"""
+
+# Checkpoint akhir bulan untuk wallet dengan id di (lo, hi]: lanjut dari
+# checkpoint terakhir (atau initial_balance) sampai :last_closing, delta per
+# bulan dari trs_transaction lewat idx_trx_owner_date, lalu running sum.
+_REFRESH_CHECKPOINTS_SQL = """
+WITH todo AS (
+    SELECT w.id, w.owner_telegram_user_id AS owner,
+           coalesce(cp.balance, w.initial_balance) AS base, cp.closing_date AS since
+    FROM mst_wallet w
+    LEFT JOIN LATERAL (
+        SELECT closing_date, balance FROM trs_balance_checkpoint c
+        WHERE c.wallet_id = w.id
+        ORDER BY closing_date DESC
+        LIMIT 1
+    ) cp ON true
+    WHERE w.id > :lo AND w.id <= :hi
+      AND (cp.closing_date IS NULL OR cp.closing_date < CAST(:last_closing AS date))
+),
+legs AS (
+    SELECT todo.id AS wallet_id, t.trx_date,
+           CASE WHEN t.type = 'income' THEN t.amount
+                -- transfer ke wallet yang sama: keluar + masuk = 0 (sama dengan _balance_legs)
+                WHEN t.type = 'transfer' AND t.wallet_id = t.target_wallet_id THEN 0
+                WHEN t.type = 'transfer' AND t.target_wallet_id = todo.id THEN t.amount
+                ELSE -t.amount END AS delta
+    FROM todo
+    JOIN trs_transaction t
+      ON t.owner_telegram_user_id = todo.owner
+     AND t.trx_date <= CAST(:last_closing AS date)
+     AND (todo.since IS NULL OR t.trx_date > todo.since)
+     AND (t.wallet_id = todo.id OR t.target_wallet_id = todo.id)
+),
+monthly AS (
+    SELECT wallet_id, date_trunc('month', trx_date)::date AS period, sum(delta) AS delta
+    FROM legs
+    GROUP BY 1, 2
+),
+months AS (
+    SELECT todo.id AS wallet_id, todo.owner, todo.base, m::date AS period
+    FROM todo
+    CROSS JOIN LATERAL generate_series(
+        coalesce(
+            todo.since + 1,
+            (SELECT min(period) FROM monthly WHERE monthly.wallet_id = todo.id),
+            date_trunc('month', CAST(:last_closing AS date))::date
+        ),
+        date_trunc('month', CAST(:last_closing AS date))::date,
+        interval '1 month'
+    ) m
+)
+INSERT INTO trs_balance_checkpoint (wallet_id, owner_telegram_user_id, closing_date, balance)
+SELECT months.wallet_id, months.owner, (months.period + interval '1 month - 1 day')::date,
+       months.base + sum(coalesce(monthly.delta, 0)) OVER (
+           PARTITION BY months.wallet_id ORDER BY months.period
+       )
+FROM months
+LEFT JOIN monthly ON monthly.wallet_id = months.wallet_id AND monthly.period = months.period
+ON CONFLICT ON CONSTRAINT pk_balance_checkpoint DO UPDATE SET balance = excluded.balance
+"""
 
 class FinanceRepo:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, read_session: Optional[AsyncSession] = None,
+                 replica: Optional[ReplicaRouter] = None):
         self.session = session
+        # Query laporan read-only boleh ke replica (lihat _reader)
+        self.read_session = read_session
+        self.replica = replica
+
+    async def _reader(self, user_id: int) -> AsyncSession:
+        """Session untuk query read-only: replica kalau aman untuk user ini, selain itu primary"""
+        if self.read_session is not None and self.replica and await self.replica.use_replica(user_id):
+            return self.read_session
+        return self.session
+
+    def _wrote(self, user_id: int) -> None:
+        # Read-your-writes: bacaan user ini ke primary selama beberapa detik
+        if self.replica:
+            self.replica.mark_write(user_id)
 
     # Wallet
+    @track(REPO_LATENCY)
     async def get_wallet_by_name(self, user_id: int, name: str) -> Optional[MstWallet]:
         stmt = select(MstWallet).where(
             MstWallet.owner_telegram_user_id == user_id,
@@ -18,14 +340,14 @@ class FinanceRepo:
         result = await self.session.execute(stmt)
         return result.scalars().first()
 
-    async def get_user_wallets(self, user_id: int) -> List[MstWallet]:
-        stmt = select(MstWallet).where(
-            MstWallet.owner_telegram_user_id == user_id,
-            MstWallet.is_active == True
-        ).order_by(MstWallet.name)
-        result = await self.session.execute(stmt)
-        return list(result.scalars().all())
+    @track(REPO_LATENCY)
+    async def list_wallets(self, user_id: int) -> List[Wallet]:
+        """Wallet aktif urut nama, entity ringan (fast path, tanpa ORM)"""
+        conn = await (await self._reader(user_id)).connection()
+        result = await conn.execute(_WALLETS_STMT, {"user_id": user_id})
+        return [Wallet(row[0], row[1], float(row[2])) for row in result]
 
+    @track(REPO_LATENCY)
     async def create_wallet(self, user_id: int, name: str, initial_balance: float = 0) -> MstWallet:
         wallet = MstWallet(
             owner_telegram_user_id=user_id,
@@ -34,10 +356,12 @@ class FinanceRepo:
         )
         self.session.add(wallet)
         await self.session.commit()
+        self._wrote(user_id)
         await self.session.refresh(wallet)
         return wallet
 
    # Category
+    @track(REPO_LATENCY)
     async def get_category_by_name(self, user_id: int, name: str, type: str) -> Optional[MstCategory]:
         stmt = select(MstCategory).where(
             MstCategory.owner_telegram_user_id == user_id,
@@ -48,6 +372,7 @@ class FinanceRepo:
         result = await self.session.execute(stmt)
         return result.scalars().first()
 
+    @track(REPO_LATENCY)
     async def create_category(self, user_id: int, name: str, type: str) -> MstCategory:
         category = MstCategory(
             owner_telegram_user_id=user_id,
@@ -56,10 +381,58 @@ class FinanceRepo:
         )
         self.session.add(category)
         await self.session.commit()
+        self._wrote(user_id)
         await self.session.refresh(category)
         return category
 
+    @track(REPO_LATENCY)
+    async def get_account_directory(self, user_id: int, period: date) -> AccountDirectory:
+        """Wallet & category aktif + budget bulan `period`, untuk resolusi nama di memori"""
+        # Primary, bukan replica: hasilnya menentukan wallet/category mana yang dibuat
+        conn = await self.session.connection()
+        wallets = await conn.execute(_WALLETS_STMT, {"user_id": user_id})
+        categories = await conn.execute(_CATEGORIES_STMT, {"user_id": user_id})
+        budgets = await conn.execute(_BUDGETS_STMT, {"user_id": user_id, "period": period})
+        return AccountDirectory(
+            wallets=[Wallet(row[0], row[1], float(row[2])) for row in wallets],
+            categories=[Category(row[0], row[1], row[2]) for row in categories],
+            budgets=[_budget_entity(row) for row in budgets],
+        )
+
+    @track(REPO_LATENCY)
+    async def create_accounts(self, user_id: int, wallet_names: List[str],
+                              categories: List[tuple[str, str]]) -> tuple[List[Wallet], List[Category]]:
+        """
+        Buat wallet & category (nama, type) yang belum ada, tanpa commit: ikut
+        commit create_transactions berikutnya. Nama yang ternyata sudah ada
+        (pesan lain dari user yang sama) atau nonaktif dipakai/diaktifkan lagi.
+        """
+        wallets: List[Wallet] = []
+        if wallet_names:
+            stmt = insert(_wallet).values([
+                {"owner_telegram_user_id": user_id, "name": name} for name in wallet_names
+            ])
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_wallet_user_name", set_={"is_active": True}
+            ).returning(_wallet.c.id, _wallet.c.name, _wallet.c.initial_balance)
+            wallets = [Wallet(row[0], row[1], float(row[2])) for row in await self.session.execute(stmt)]
+
+        created: List[Category] = []
+        if categories:
+            stmt = insert(_category).values([
+                {"owner_telegram_user_id": user_id, "name": name, "type": type} for name, type in categories
+            ])
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_cat_user_name_type", set_={"is_active": True}
+            ).returning(_category.c.id, _category.c.name, _category.c.type)
+            created = [Category(row[0], row[1], row[2]) for row in await self.session.execute(stmt)]
+
+        if wallets or created:
+            self._wrote(user_id)
+        return wallets, created
+
     # Transaction
+    @track(REPO_LATENCY)
     async def create_transaction(
         self,
         user_id: int,
@@ -70,11 +443,10 @@ class FinanceRepo:
         target_wallet_id: Optional[int] = None,
         description: str = None,
         trx_date: date = None,
-        embedding_data: list[float] = None
+        embedding: Optional[Sequence[float]] = None
     ) -> TrsTransaction:
 
         if not trx_date:
-            from datetime import date
             trx_date = date.today()
 
         trx = TrsTransaction(
@@ -86,74 +458,454 @@ class FinanceRepo:
             amount=amount,
             description=description,
             trx_date=trx_date,
-            embedding_data=embedding_data
+            embedding=pack_embedding(embedding) if embedding is not None else None
         )
         self.session.add(trx)
+
+        # Counter budget ikut di commit yang sama dengan insert transaksi
+        if type == "expense" and category_id:
+            await self._add_monthly_spend(user_id, trx_date, {category_id: amount})
+        await self._bump_ledger_version(user_id)
+
+        if trx_date < month_start(date.today()):
+            await self.session.flush()
+            await self._shift_checkpoints(trx_date, self._balance_legs([{
+                "wallet_id": wallet_id, "target_wallet_id": target_wallet_id, "type": type, "amount": amount
+            }]))
+
         await self.session.commit()
+        self._wrote(user_id)
         await self.session.refresh(trx)
         return trx
 
-    async def get_recent_transactions(self, user_id: int, limit: int = 5) -> List[TrsTransaction]:
-        from sqlalchemy.orm import joinedload
+    @track(REPO_LATENCY)
+    async def create_transactions(self, user_id: int, items: List[dict], trx_date: date = None) -> int:
+        """
+        Simpan banyak transaksi sekaligus dalam satu statement + commit:
+        multi-row INSERT, upsert counter budget, dan versi ledger sebagai CTE
+        data-modifying. `items` berisi kolom seperti create_transaction
+        (wallet_id, amount, type, category_id, ...).
+        """
+        trx_date = trx_date or date.today()
+        rows = [
+            {
+                "owner_telegram_user_id": user_id,
+                "wallet_id": item["wallet_id"],
+                "category_id": item.get("category_id"),
+                "target_wallet_id": item.get("target_wallet_id"),
+                "type": item["type"],
+                "amount": item["amount"],
+                "description": item.get("description"),
+                "trx_date": trx_date,
+            }
+            for item in items
+        ]
+        ctes = [insert(TrsTransaction).values(rows).returning(TrsTransaction.id).cte("new_trx")]
 
-        stmt = select(TrsTransaction).options(
-            joinedload(TrsTransaction.wallet),
-            joinedload(TrsTransaction.category),
-            joinedload(TrsTransaction.target_wallet)
-        ).where(
-            TrsTransaction.owner_telegram_user_id == user_id
-        ).order_by(desc(TrsTransaction.created_at)).limit(limit)
+        # Satu baris counter per kategori (ON CONFLICT tidak boleh kena baris yang sama 2x)
+        spent: dict[int, float] = {}
+        for row in rows:
+            if row["type"] == "expense" and row["category_id"]:
+                spent[row["category_id"]] = spent.get(row["category_id"], 0) + row["amount"]
+        if spent:
+            spend = self._monthly_spend_stmt(user_id, trx_date, spent)
+            ctes.append(spend.returning(TrsMonthlySpend.category_id).cte("new_spend"))
+        # CTE data-modifying selalu dieksekusi walau tidak direferensikan
+        await self.session.execute(self._ledger_version_stmt(user_id).add_cte(*ctes))
 
-        result = await self.session.execute(stmt)
-        return list(result.scalars().all())
+        if trx_date < month_start(date.today()):
+            await self._shift_checkpoints(trx_date, self._balance_legs(rows))
+
+        await self.session.commit()
+        self._wrote(user_id)
+        return len(rows)
+
+    @track(REPO_LATENCY)
+    async def list_recent_transactions(self, user_id: int, limit: int = 5) -> List[Transaction]:
+        """
+        Transaksi terbaru, entity ringan. Urut trx_date: kalau jendela beberapa
+        bulan terakhir sudah berisi `limit` baris, hasilnya pasti sama dengan
+        tanpa jendela, dan hanya partisi bulan-bulan itu yang dibaca. Kalau
+        kurang, ulangi tanpa jendela.
+        """
+        conn = await (await self._reader(user_id)).connection()
+        params = {"user_id": user_id, "limit": limit,
+                  "since": add_months(date.today(), -RECENT_TRANSACTIONS_MONTHS + 1)}
+        trxs = [_transaction(row) for row in await conn.execute(_RECENT_TRANSACTIONS_SINCE_STMT, params)]
+        if len(trxs) < limit:
+            trxs = [_transaction(row) for row in await conn.execute(_RECENT_TRANSACTIONS_STMT, params)]
+        return trxs
+
+    @track(REPO_LATENCY)
+    async def search_transactions(self, user_id: int, terms: List[str],
+                                  limit: int = 5, offset: int = 0) -> SearchPage:
+        """
+        Transaksi yang deskripsinya memuat semua `terms` (prefix: 'list' cocok
+        dengan 'listrik'). Kandidat = SEARCH_CANDIDATES transaksi cocok terbaru,
+        diurut relevansi lalu tanggal. `terms` harus sudah bersih
+        (rules.parse_search_query), karena disusun langsung jadi tsquery.
+        """
+        if not terms:
+            return SearchPage([])
+        conn = await (await self._reader(user_id)).connection()
+        params = {
+            "user_id": user_id, "query": " & ".join(f"{term}:*" for term in terms),
+            "candidates": SEARCH_CANDIDATES, "limit": limit, "offset": offset,
+        }
+        page = (await conn.execute(_SEARCH_PAGE_STMT, params)).all()
+        truncated = False
+        if offset + limit > SEARCH_CANDIDATES:
+            truncated = (await conn.execute(_SEARCH_BEYOND_STMT, params)).first() is not None
+        if not page:
+            return SearchPage([], truncated)
+
+        result = await conn.execute(_TRANSACTIONS_BY_KEY_STMT, {
+            "user_id": user_id, "ids": [row[0] for row in page], "dates": list({row[1] for row in page}),
+        })
+        by_key = {(row[0], row[4]): row for row in result}
+        return SearchPage(
+            [_transaction(by_key[key]) for key in ((row[0], row[1]) for row in page) if key in by_key],
+            truncated
+        )
 
     # Reporting
+    @track(REPO_LATENCY)
+    async def get_transaction_embeddings(self, user_id: int, since: date = None) -> dict[int, "np.ndarray"]:
+        """id transaksi -> embedding (numpy float32, view read-only atas bytes hasil query)"""
+        conn = await (await self._reader(user_id)).connection()
+        if since:
+            rows = await conn.execute(_EMBEDDINGS_SINCE_STMT, {"user_id": user_id, "since": since})
+        else:
+            rows = await conn.execute(_EMBEDDINGS_STMT, {"user_id": user_id})
+        return {row[0]: unpack_embedding(row[1]) for row in rows}
+
+    @track(REPO_LATENCY)
+    async def backfill_embeddings(self, after_id: int, limit: int) -> tuple[Optional[int], int]:
+        """
+        Konversi satu batch embedding_data (JSONB) ke embedding (float32) untuk
+        transaksi id > after_id. Return (id terakhir batch, jumlah baris);
+        id None berarti sudah habis.
+        """
+        rows = (await self.session.execute(
+            _LEGACY_EMBEDDINGS_STMT, {"after_id": after_id, "limit": limit}
+        )).all()
+        if not rows:
+            return None, 0
+        # JSON null ('null'::jsonb) ikut dibersihkan, embedding-nya NULL
+        await self.session.execute(_PACK_EMBEDDING_STMT, [
+            {"b_id": id, "b_trx_date": trx_date,
+             "b_embedding": pack_embedding(values) if values else None}
+            for id, trx_date, values in rows
+        ])
+        await self.session.commit()
+        return rows[-1][0], len(rows)
+
+    @track(REPO_LATENCY)
     async def get_wallet_balance(self, wallet_id: int, user_id: int) -> float:
         """
-        Hitung saldo real-time berdasarkan history transaksi
-        Rumus: Initial + Income - Expense - Transfer Keluar + Transfer Masuk
+        Hitung saldo real-time: checkpoint akhir bulan terakhir (atau initial
+        balance) + transaksi sesudahnya. Transaksi dibatasi trx_date, jadi
+        hanya partisi sejak checkpoint yang dibaca, bukan seluruh histori.
         """
-        # ✅ Validasi wallet ownership dulu
-        w_stmt = select(MstWallet.initial_balance).where(
-            MstWallet.id == wallet_id,
-            MstWallet.owner_telegram_user_id == user_id  # ← Tambahkan ini
+        session = await self._reader(user_id)
+        return await self._balance_from_checkpoint(session, wallet_id, user_id, as_of=None)
+
+    # Versi ledger
+    @staticmethod
+    def _ledger_version_stmt(user_id: int):
+        stmt = insert(TrsLedgerVersion).values(owner_telegram_user_id=user_id, version=1)
+        return stmt.on_conflict_do_update(
+            index_elements=[TrsLedgerVersion.owner_telegram_user_id],
+            set_={"version": TrsLedgerVersion.version + 1}
         )
-        w_res = await self.session.execute(w_stmt)
-        initial = w_res.scalar()
 
-        if initial is None:
-            raise ValueError(f"Wallet {wallet_id} tidak ditemukan atau bukan milik user {user_id}")
+    async def _bump_ledger_version(self, user_id: int) -> None:
+        # Ikut commit transaksi: versi naik tepat saat data berubah
+        await self.session.execute(self._ledger_version_stmt(user_id))
+
+    @track(REPO_LATENCY)
+    async def get_ledger_version(self, user_id: int) -> int:
+        stmt = select(TrsLedgerVersion.version).where(TrsLedgerVersion.owner_telegram_user_id == user_id)
+        return (await self.session.execute(stmt)).scalar() or 0
+
+    @track(REPO_LATENCY)
+    async def get_monthly_spending(self, user_id: int, period: date) -> List[tuple[str, float]]:
+        """Pengeluaran per kategori di bulan `period`, dari counter (tanpa scan transaksi)"""
+        stmt = select(MstCategory.name, TrsMonthlySpend.spent).join(
+            MstCategory, MstCategory.id == TrsMonthlySpend.category_id
+        ).where(
+            TrsMonthlySpend.owner_telegram_user_id == user_id,
+            TrsMonthlySpend.period == period,
+            TrsMonthlySpend.spent > 0
+        ).order_by(desc(TrsMonthlySpend.spent))
+        rows = (await self.session.execute(stmt)).all()
+        return [(r[0], float(r[1])) for r in rows]
 
-        # Hitung Income (tambahkan filter user_id)
-        inc_stmt = select(func.sum(TrsTransaction.amount)).where(
-            TrsTransaction.wallet_id == wallet_id,
-            TrsTransaction.owner_telegram_user_id == user_id,  # ← Tambahkan ini
-            TrsTransaction.type == 'income'
+    # Budget
+    @staticmethod
+    def _monthly_spend_stmt(user_id: int, trx_date: date, spent: dict[int, float]):
+        stmt = insert(TrsMonthlySpend).values([
+            {
+                "owner_telegram_user_id": user_id,
+                "category_id": category_id,
+                "period": month_start(trx_date),
+                "spent": amount,
+            }
+            for category_id, amount in sorted(spent.items())
+        ])
+        return stmt.on_conflict_do_update(
+            constraint="pk_monthly_spend",
+            set_={"spent": TrsMonthlySpend.spent + stmt.excluded.spent}
         )
-        inc = (await self.session.execute(inc_stmt)).scalar() or 0
 
-        # Hitung Expense
-        exp_stmt = select(func.sum(TrsTransaction.amount)).where(
-            TrsTransaction.wallet_id == wallet_id,
-            TrsTransaction.owner_telegram_user_id == user_id,
-            TrsTransaction.type == 'expense'
+    async def _add_monthly_spend(self, user_id: int, trx_date: date, spent: dict[int, float]) -> None:
+        await self.session.execute(self._monthly_spend_stmt(user_id, trx_date, spent))
+
+    @track(REPO_LATENCY)
+    async def get_budgets(self, user_id: int, period: date) -> List[Budget]:
+        conn = await (await self._reader(user_id)).connection()
+        result = await conn.execute(_BUDGETS_ORDERED_STMT, {"user_id": user_id, "period": period})
+        return [_budget_entity(row) for row in result]
+
+    @track(REPO_LATENCY)
+    async def set_budget(self, user_id: int, category_id: int, amount: float) -> None:
+        stmt = insert(MstBudget).values(
+            owner_telegram_user_id=user_id,
+            category_id=category_id,
+            amount=amount,
+            is_active=True
         )
-        exp = (await self.session.execute(exp_stmt)).scalar() or 0
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_budget_user_category",
+            set_={"amount": stmt.excluded.amount, "is_active": True}
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+        self._wrote(user_id)
 
-        # Hitung Transfer Keluar (Dari wallet ini ke orang lain)
-        trf_out_stmt = select(func.sum(TrsTransaction.amount)).where(
-            TrsTransaction.wallet_id == wallet_id,
-            TrsTransaction.owner_telegram_user_id == user_id,
-            TrsTransaction.type == 'transfer'
+    # Recurring
+    @track(REPO_LATENCY)
+    async def create_recurring(
+        self,
+        user_id: int,
+        wallet_id: int,
+        amount: float,
+        type: str,
+        frequency: str,  # 'daily', 'weekly', 'monthly'
+        start_date: date,
+        category_id: Optional[int] = None,
+        target_wallet_id: Optional[int] = None,
+        description: str = None
+    ) -> MstRecurring:
+        rule = MstRecurring(
+            owner_telegram_user_id=user_id,
+            wallet_id=wallet_id,
+            category_id=category_id,
+            target_wallet_id=target_wallet_id,
+            type=type,
+            amount=amount,
+            description=description,
+            frequency=frequency,
+            start_date=start_date,
+            next_run=start_date,
+            run_count=0
+        )
+        self.session.add(rule)
+        await self.session.commit()
+        self._wrote(user_id)
+        await self.session.refresh(rule)
+        return rule
+
+    @track(REPO_LATENCY)
+    async def get_recurring(self, user_id: int) -> List[MstRecurring]:
+        session = await self._reader(user_id)
+        from sqlalchemy.orm import joinedload
+
+        stmt = select(MstRecurring).options(
+            joinedload(MstRecurring.wallet)
+        ).where(
+            MstRecurring.owner_telegram_user_id == user_id,
+            MstRecurring.is_active == True
+        ).order_by(MstRecurring.next_run, MstRecurring.id)
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+    @track(REPO_LATENCY)
+    async def deactivate_recurring(self, user_id: int, rule_id: int) -> bool:
+        stmt = update(MstRecurring).where(
+            MstRecurring.id == rule_id,
+            MstRecurring.owner_telegram_user_id == user_id,
+            MstRecurring.is_active == True
+        ).values(is_active=False)
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        self._wrote(user_id)
+        return result.rowcount > 0
+
+    @track(REPO_LATENCY)
+    async def run_due_recurring(self, today: date, batch_size: int, max_catchup: int) -> List[RecurringRun]:
+        """
+        Eksekusi satu batch rule jatuh tempo dan commit.
+        Rule yang masih tertinggal > max_catchup kejadian akan terambil lagi di batch berikutnya.
+        """
+        # Kejadian catch-up bisa back-dated (lihat CHECKPOINT_LOCK_KEY)
+        await self.session.execute(text("SELECT pg_advisory_xact_lock_shared(:key)"), {"key": CHECKPOINT_LOCK_KEY})
+        result = await self.session.execute(
+            text(_RUN_DUE_RECURRING_SQL),
+            {"today": today, "batch_size": batch_size, "max_catchup": max_catchup}
+        )
+        rows = result.all()
+        await self.session.commit()
+        return [
+            RecurringRun(
+                rule_id=r[0], owner_id=r[1], type=r[2], amount=float(r[3]),
+                description=r[4], occurrences=r[5], next_run=r[6]
+            )
+            for r in rows
+        ]
+
+    # Balance checkpoint
+    @staticmethod
+    def _balance_legs(rows: List[dict]) -> dict[int, float]:
+        """Efek tiap transaksi ke saldo per wallet (transfer = 2 kaki)"""
+        legs: dict[int, float] = {}
+        for row in rows:
+            amount = float(row["amount"])
+            sign = 1 if row["type"] == "income" else -1
+            legs[row["wallet_id"]] = legs.get(row["wallet_id"], 0) + sign * amount
+            if row["type"] == "transfer" and row.get("target_wallet_id"):
+                legs[row["target_wallet_id"]] = legs.get(row["target_wallet_id"], 0) + amount
+        return legs
+
+    async def _shift_checkpoints(self, trx_date: date, legs: dict[int, float]) -> None:
+        """Transaksi back-dated: geser checkpoint di/sesudah bulan transaksi, tanpa hitung ulang"""
+        await self.session.execute(text("SELECT pg_advisory_xact_lock_shared(:key)"), {"key": CHECKPOINT_LOCK_KEY})
+        for wallet_id, delta in legs.items():
+            await self.session.execute(
+                update(TrsBalanceCheckpoint).where(
+                    TrsBalanceCheckpoint.wallet_id == wallet_id,
+                    TrsBalanceCheckpoint.closing_date >= trx_date
+                ).values(balance=TrsBalanceCheckpoint.balance + delta)
+            )
+
+    @track(REPO_LATENCY)
+    async def get_max_wallet_id(self) -> int:
+        return (await self.session.execute(select(func.max(MstWallet.id)))).scalar() or 0
+
+    @track(REPO_LATENCY)
+    async def refresh_balance_checkpoints(self, lo_id: int, hi_id: int, last_closing: date) -> int:
+        """Tulis checkpoint yang belum ada untuk wallet id (lo_id, hi_id], return jumlah baris"""
+        await self.session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CHECKPOINT_LOCK_KEY})
+        result = await self.session.execute(
+            text(_REFRESH_CHECKPOINTS_SQL),
+            {"lo": lo_id, "hi": hi_id, "last_closing": last_closing}
         )
-        trf_out = (await self.session.execute(trf_out_stmt)).scalar() or 0
+        await self.session.commit()
+        return result.rowcount
+
+    # Partisi transaksi
+    @track(REPO_LATENCY)
+    async def ensure_transaction_partition(self, month: date) -> bool:
+        """
+        Buat partisi trs_transaction untuk bulan `month` kalau belum ada.
+        Baris bulan itu yang sudah terlanjur masuk partisi DEFAULT dipindah dulu,
+        lalu tabelnya di-ATTACH. Return True kalau partisi baru dibuat.
+        """
+        lower = month_start(month)
+        upper = add_months(lower, 1)
+        name = f"trs_transaction_y{lower.year}m{lower.month:02d}"
+
+        await self.session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+        exists = (await self.session.execute(text("SELECT to_regclass(:name)"), {"name": name})).scalar()
+        if exists:
+            await self.session.rollback()
+            return False
+
+        # DDL tidak menerima bind parameter; nama & batas berasal dari objek date
+        bounds = {"lo": lower, "hi": upper}
+        await self.session.execute(text("LOCK TABLE trs_transaction_default IN ACCESS EXCLUSIVE MODE"))
+        await self.session.execute(text(
+            f"CREATE TABLE {name} (LIKE trs_transaction "
+            f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED INCLUDING STORAGE)"
+        ))
+        # Kolom generated (search_vector) tidak boleh diisi, dihitung ulang saat insert
+        columns = ", ".join(c.name for c in TrsTransaction.__table__.columns if c.computed is None)
+        await self.session.execute(text(
+            f"WITH moved AS (DELETE FROM trs_transaction_default "
+            f"WHERE trx_date >= :lo AND trx_date < :hi RETURNING *) "
+            f"INSERT INTO {name} ({columns}) SELECT {columns} FROM moved"
+        ), bounds)
+        await self.session.execute(text(
+            f"ALTER TABLE trs_transaction ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        ))
+        await self.session.commit()
+        return True
+
+    @track(REPO_LATENCY)
+    async def get_balance_as_of(self, wallet_id: int, user_id: int, as_of: date) -> float:
+        """
+        Saldo wallet per akhir hari `as_of`: checkpoint terakhir <= as_of, ditambah
+        delta transaksi sesudahnya (maksimal ~1 bulan baris, lewat idx_trx_owner_date).
+        """
+        session = await self._reader(user_id)
+        return await self._balance_from_checkpoint(session, wallet_id, user_id, as_of)
+
+    async def _balance_from_checkpoint(self, session: AsyncSession, wallet_id: int, user_id: int,
+                                       as_of: Optional[date]) -> float:
+        """as_of=None = saldo sekarang (termasuk transaksi bertanggal ke depan)"""
+        cp_join = TrsBalanceCheckpoint.wallet_id == MstWallet.id
+        if as_of is not None:
+            cp_join &= TrsBalanceCheckpoint.closing_date <= as_of
+        cp_stmt = select(
+            MstWallet.initial_balance, TrsBalanceCheckpoint.closing_date, TrsBalanceCheckpoint.balance
+        ).outerjoin(
+            TrsBalanceCheckpoint, cp_join
+        ).where(
+            MstWallet.id == wallet_id,
+            MstWallet.owner_telegram_user_id == user_id
+        ).order_by(desc(TrsBalanceCheckpoint.closing_date)).limit(1)
+        row = (await session.execute(cp_stmt)).first()
+
+        if row is None:
+            raise ValueError(f"Wallet {wallet_id} tidak ditemukan atau bukan milik user {user_id}")
+        initial, since, checkpoint = row
 
-        # Hitung Transfer Masuk (Dari orang lain ke wallet ini)
-        trf_in_stmt = select(func.sum(TrsTransaction.amount)).where(
-            TrsTransaction.target_wallet_id == wallet_id,
+        signed = case(
+            (TrsTransaction.type == "income", TrsTransaction.amount),
+            # Transfer ke wallet yang sama: keluar + masuk = 0 (sama dengan _balance_legs)
+            ((TrsTransaction.type == "transfer") & (TrsTransaction.wallet_id == TrsTransaction.target_wallet_id), 0),
+            (
+                (TrsTransaction.type == "transfer") & (TrsTransaction.target_wallet_id == wallet_id),
+                TrsTransaction.amount
+            ),
+            else_=-TrsTransaction.amount
+        )
+        delta_stmt = select(func.sum(signed)).where(
             TrsTransaction.owner_telegram_user_id == user_id,
-            TrsTransaction.type == 'transfer'
+            or_(TrsTransaction.wallet_id == wallet_id, TrsTransaction.target_wallet_id == wallet_id)
         )
-        trf_in = (await self.session.execute(trf_in_stmt)).scalar() or 0
+        if as_of is not None:
+            delta_stmt = delta_stmt.where(TrsTransaction.trx_date <= as_of)
+        if since is not None:
+            delta_stmt = delta_stmt.where(TrsTransaction.trx_date > since)
+        delta = (await session.execute(delta_stmt)).scalar() or 0
+
+        base = checkpoint if since is not None else initial
+        return float(base) + float(delta)
 
-        return float(initial) + float(inc) - float(exp) - float(trf_out) + float(trf_in)
+    @track(REPO_LATENCY)
+    async def get_net_worth_series(self, user_id: int, since: date) -> List[tuple[date, float]]:
+        """Total saldo semua wallet per akhir bulan, dari checkpoint saja"""
+        session = await self._reader(user_id)
+        stmt = select(
+            TrsBalanceCheckpoint.closing_date, func.sum(TrsBalanceCheckpoint.balance)
+        ).join(
+            MstWallet, MstWallet.id == TrsBalanceCheckpoint.wallet_id
+        ).where(
+            TrsBalanceCheckpoint.owner_telegram_user_id == user_id,
+            TrsBalanceCheckpoint.closing_date >= since,
+            MstWallet.is_active == True
+        ).group_by(TrsBalanceCheckpoint.closing_date).order_by(TrsBalanceCheckpoint.closing_date)
+        rows = (await session.execute(stmt)).all()
+        return [(r[0], float(r[1])) for r in rows]
@@ -1,21 +1,37 @@
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.domain.telegram.entities import TelegramUser
-from app.domain.telegram.ports import TelegramUserRepo
+from app.domain.telegram.entities import TelegramUser, ConversationState
+from app.domain.telegram.ports import TelegramUserRepo, ConversationStateStore
 from app.infrastructure.db.models import SysTelegramUser
 
 class SqlTelegramUserRepo(TelegramUserRepo):
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, state_store: ConversationStateStore | None = None):
         self.session = session
+        # Kalau ada, user dibaca dari cache store; update_state dan hapus tanda
+        # bot_blocked_at ditulis lewat store (write-behind)
+        self.state_store = state_store
 
     async def get(self, telegram_id: int) -> TelegramUser | None:
+        if self.state_store:
+            # Hit: tanpa query. Tanda bot_blocked_at dari broadcast tetap
+            # dihapus, di flush berikutnya
+            cached = await self.state_store.get(telegram_id)
+            if cached is not None:
+                self.state_store.touch(telegram_id)
+                return cached
+
         # GANTI: self.s.get -> await self.session.get
         orm = await self.session.get(SysTelegramUser, telegram_id)
 
         if not orm:
             return None
 
-        return TelegramUser(
+        if orm.bot_blocked_at is not None:
+            # Ditandai broadcast karena memblokir bot; pesan masuk = sudah dibuka lagi
+            orm.bot_blocked_at = None
+            await self.session.commit()
+
+        user = TelegramUser(
             id=orm.id,
             first_name=orm.first_name,
             username=orm.username,
@@ -25,6 +41,9 @@ class SqlTelegramUserRepo(TelegramUserRepo):
             # is_active=orm.is_active,
             # last_interaction_at=orm.last_interaction_at,
         )
+        if self.state_store:
+            await self.state_store.cache(user)
+        return user
 
     async def upsert(self, user: TelegramUser) -> TelegramUser:
         # GANTI: Logic 'or' one-liner susah di async, pecah jadi if/else
@@ -46,9 +65,17 @@ class SqlTelegramUserRepo(TelegramUserRepo):
         await self.session.flush()
         await self.session.commit()
 
+        if self.state_store:
+            await self.state_store.saved(user)
+
         return user
 
     async def update_state(self, telegram_id: int, state: str, temp_data: dict) -> None:
+        if self.state_store:
+            # Write-behind: tidak ada UPDATE/commit di sini, flush dibatch oleh store
+            await self.state_store.set_state(telegram_id, ConversationState(state, temp_data or {}))
+            return
+
         # GANTI: self.s.query(...).update(...) TIDAK BISA DI ASYNC
         # Gunakan 'update' statement dari sqlalchemy core
         stmt = (
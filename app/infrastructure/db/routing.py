@@ -0,0 +1,85 @@
+"""
+Routing query read-only ke replica Postgres (opsional, DATABASE_REPLICA_URL).
+
+Query dialihkan ke primary kalau:
+- user baru saja menulis (read-your-writes, REPLICA_READ_YOUR_WRITES_S), atau
+- lag replica melebihi REPLICA_MAX_LAG_S / replica tidak bisa dihubungi.
+
+Lag diukur paling sering sekali per REPLICA_LAG_CHECK_S lewat satu query ke
+replica, hasilnya dipakai bersama semua request. Catatan tulis user disimpan
+per proses (LRU), cukup karena replica hanya tertinggal hitungan detik.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+# Replica yang sudah me-replay semua WAL yang diterima dianggap tidak lag,
+# walau transaksi terakhir di primary sudah lama (primary sedang sepi)
+_LAG_SQL = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+class ReplicaRouter:
+    def __init__(self, engine: AsyncEngine, max_lag: float, read_your_writes: float,
+                 lag_check_interval: float, max_users: int = 100_000):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.read_your_writes = read_your_writes
+        self.lag_check_interval = lag_check_interval
+        self.max_users = max_users
+
+        self._writes: OrderedDict[int, float] = OrderedDict()
+        self._lag = 0.0
+        self._lag_checked_at = -math.inf
+        self._lag_lock = asyncio.Lock()
+        metrics.REPLICA_LAG.set_function(lambda: self._lag)
+
+    def mark_write(self, user_id: int) -> None:
+        self._writes[user_id] = time.monotonic()
+        self._writes.move_to_end(user_id)
+        if len(self._writes) > self.max_users:
+            self._writes.popitem(last=False)
+
+    async def lag(self) -> float:
+        if time.monotonic() - self._lag_checked_at >= self.lag_check_interval:
+            async with self._lag_lock:
+                # Cek ulang: request lain mungkin sudah mengukur selama menunggu lock
+                if time.monotonic() - self._lag_checked_at >= self.lag_check_interval:
+                    self._lag = await self._measure_lag()
+                    self._lag_checked_at = time.monotonic()
+        return self._lag
+
+    async def _measure_lag(self) -> float:
+        try:
+            async with self.engine.connect() as conn:
+                result = await asyncio.wait_for(conn.execute(text(_LAG_SQL)), self.max_lag)
+                return float(result.scalar() or 0)
+        except Exception as e:
+            logger.warning("Cek lag replica gagal, baca dari primary: %s", e)
+            return math.inf
+
+    async def use_replica(self, user_id: int) -> bool:
+        written_at = self._writes.get(user_id)
+        if written_at is not None and time.monotonic() - written_at < self.read_your_writes:
+            metrics.DB_READ_ROUTES.labels("primary_own_write").inc()
+            return False
+
+        if await self.lag() > self.max_lag:
+            metrics.DB_READ_ROUTES.labels("primary_lag").inc()
+            return False
+
+        metrics.DB_READ_ROUTES.labels("replica").inc()
+        return True
@@ -1,47 +1,85 @@
-import google.generativeai as genai
 import json
 import logging
+import time
+from typing import Optional
+
+from app.application.dtos.extraction import ExtractedTransactions, llm_response_schema
+from app.core import metrics
 from app.domain.llm.ports import LLMPort
 from app.core.settings import settings
 
 logger = logging.getLogger(__name__)
+# Satu baris per call LLM (user, token, latency), bahan capacity planning
+usage_logger = logging.getLogger("app.infrastructure.llm.usage")
+
+# Naikkan versi setiap prompt/schema berubah, supaya token & kualitas bisa dibandingkan
+PROMPT_VERSION = "tx-v2"
+SYSTEM_PROMPT = (
+    "Extract every money transaction in the user's message (Indonesian or English). "
+    "A wallet mentioned once at the end (e.g. '... pake gopay') applies to all items. "
+    "Return an empty list if there is no transaction."
+)
 
 class GeminiLLM(LLMPort):
-    def __init__(self, model_name="gemini-2.5-flash"):
+    def __init__(self, model_name: str | None = None, max_retries: int | None = None):
+        # Import di sini: google.generativeai berat (~0.7s), jangan dibayar saat import app
+        import google.generativeai as genai
+
         genai.configure(api_key=settings.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel(model_name)
-
-    async def parse_transaction(self, text: str) -> dict:
-        system_prompt = """
-        You are a financial assistant. Extract transaction details from the user text.
-        Return ONLY valid JSON with these keys:
-        - amount (number)
-        - category (string, short category name. e.g. "Food", "Transport")
-        - wallet_name (string. The SOURCE wallet. e.g. "BCA", "Cash". Default "BCA")
-        - target_wallet_name (string. ONLY for TRANSFER. The DESTINATION wallet. e.g. "Gopay", "Bibit")
-        - description (string, what did they buy? or "Transfer to Gopay")
-        - transaction_type (string. "EXPENSE", "INCOME", or "TRANSFER")
-
-        Example 1 (Expense): "Makan 15rb pake gopay"
-        Output: {"amount": 15000, "category": "Food", "wallet_name": "Gopay", "transaction_type": "EXPENSE", "description": "Makan"}
-
-        Example 2 (Transfer): "Transfer 50rb dari BCA ke Gopay"
-        Output: {"amount": 50000, "category": "Transfer", "wallet_name": "BCA", "target_wallet_name": "Gopay", "transaction_type": "TRANSFER", "description": "Topup Gopay"}
-        """
-
-        full_prompt = f"{system_prompt}\n\nUser Text: {text}"
-
-        try:
-            response = await self.model.generate_content_async(full_prompt)
-            raw_text = response.text
-
-            cleaned_text = raw_text.replace("```json", "").replace("```", "").strip()
-
-            return json.loads(cleaned_text)
-
-        except json.JSONDecodeError:
-            logger.error(f"Gagal parse JSON dari Gemini: {raw_text}")
-            return {"error": "Gagal membaca format data dari AI"}
-        except Exception as e:
-            logger.error(f"Gemini Error: {e}")
-            raise e
+        # Output dikunci ke schema JSON: tidak ada fence ```json atau teks bebas lagi
+        self.model = genai.GenerativeModel(
+            model_name or settings.LLM_MODEL,
+            system_instruction=SYSTEM_PROMPT,
+            generation_config={
+                "response_mime_type": "application/json",
+                "response_schema": llm_response_schema(),
+                "temperature": 0,
+            },
+        )
+        self.max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+
+    async def parse_transaction(self, text: str, user_id: Optional[int] = None) -> dict:
+        for attempt in range(1, self.max_retries + 2):
+            started = time.perf_counter()
+            try:
+                response = await self.model.generate_content_async(text)
+            except Exception as e:
+                metrics.LLM_CALLS.labels("error").inc()
+                logger.error(f"Gemini Error: {e}")
+                raise e
+            self._record_usage(response, time.perf_counter() - started, user_id, attempt)
+
+            try:
+                data = json.loads(response.text)
+                if not data["transactions"]:
+                    metrics.LLM_CALLS.labels("empty").inc()
+                    return {"error": "Tidak ada transaksi di pesan"}
+                ExtractedTransactions.from_llm(data)
+            except (ValueError, KeyError, TypeError) as e:  # termasuk JSONDecodeError & ValidationError
+                # Jarang dengan schema, tapi bisa (output terpotong, diblok safety): coba lagi
+                metrics.LLM_CALLS.labels("invalid").inc()
+                logger.warning("Output LLM tidak valid (percobaan %s): %s", attempt, e)
+                continue
+
+            metrics.LLM_CALLS.labels("ok").inc()
+            return data
+
+        return {"error": "Gagal membaca format data dari AI"}
+
+    @staticmethod
+    def _record_usage(response, latency: float, user_id: Optional[int], attempt: int) -> None:
+        usage = response.usage_metadata
+        prompt_tokens = usage.prompt_token_count if usage else 0
+        completion_tokens = usage.candidates_token_count if usage else 0
+
+        metrics.LLM_CALL_LATENCY.observe(latency)
+        metrics.LLM_TOKENS.labels("prompt", PROMPT_VERSION).inc(prompt_tokens)
+        metrics.LLM_TOKENS.labels("completion", PROMPT_VERSION).inc(completion_tokens)
+        usage_logger.info("LLM call", extra={
+            "user_id": user_id,
+            "prompt_version": PROMPT_VERSION,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency_ms": round(latency * 1000, 1),
+            "attempt": attempt,
+        })
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, replace
+from typing import Optional
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import metrics
+from app.core.settings import settings
+from app.domain.telegram.entities import ConversationState, TelegramUser
+from app.infrastructure.db.models import SysTelegramUser
+
+logger = logging.getLogger(__name__)
+
+_user = SysTelegramUser.__table__
+
+# User yang mengirim pesan sudah tidak memblokir bot. Hampir selalu tidak ada
+# baris yang cocok (lookup PK saja, tanpa tulis)
+_UNBLOCK_STMT = update(_user).where(
+    _user.c.id.in_(bindparam("ids", expanding=True)),
+    _user.c.bot_blocked_at.is_not(None)
+).values(bot_blocked_at=None)
+
+class WriteBehindStateStore(ABC):
+    """
+    Basis store baris user: TelegramUser di-cache, jadi update dari user yang
+    sama dilayani dari memori tanpa query. Tulisan yang tidak perlu langsung
+    sampai ke DB ditunda lalu di-flush ke sys_telegram_user dalam satu batch +
+    satu commit:
+      - set_state (current_state/temp_data, per user nilai terakhir menang).
+        Belum ada alur percakapan yang memakainya; saat ini state user selalu
+        IDLE dan store praktis hanya cache baca
+      - touch: user yang terbaca dari cache menghapus tanda bot_blocked_at
+        (pesan masuk = bot sudah tidak diblokir)
+
+    Entry cache kadaluarsa STATE_TTL_S setelah terakhir ditulis; setelah itu
+    baris dibaca ulang dari DB. Perubahan is_active dari proses lain terlihat
+    paling lambat selama itu.
+
+    Flush jalan tiap `flush_interval` detik (batas lag), lebih awal kalau
+    antrian mencapai `max_pending`, dan sekali lagi saat aclose().
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        ttl: float | None = None,
+        flush_interval: float | None = None,
+        max_pending: int | None = None
+    ):
+        self.session_factory = session_factory
+        self.ttl = ttl or settings.STATE_TTL_S
+        self.flush_interval = flush_interval or settings.STATE_FLUSH_INTERVAL_S
+        self.max_pending = max_pending or settings.STATE_FLUSH_MAX_PENDING
+        self._dirty: dict[int, ConversationState] = {}
+        self._touched: set[int] = set()
+        self._flush_now = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        metrics.STATE_PENDING_WRITES.set_function(lambda: len(self._dirty))
+
+    # --- cache backend (diimplementasi subclass) ---
+    @abstractmethod
+    async def _cache_get(self, telegram_id: int) -> Optional[TelegramUser]:
+        ...
+
+    @abstractmethod
+    async def _cache_set(self, user: TelegramUser) -> None:
+        ...
+
+    async def _cache_sweep(self) -> None:
+        """Buang entry kadaluarsa (opsional, backend dengan TTL bawaan tidak perlu)"""
+
+    # --- API ---
+    async def get(self, telegram_id: int) -> Optional[TelegramUser]:
+        """User dari cache, None kalau belum ada/kadaluarsa (baca dari DB lalu cache())"""
+        user = await self._cache_get(telegram_id)
+        if user is not None:
+            self._apply_pending(user)
+        return user
+
+    async def cache(self, user: TelegramUser) -> None:
+        """Simpan user hasil baca DB. State yang belum di-flush lebih baru, ditimpakan ke `user`"""
+        self._apply_pending(user)
+        await self._cache_set(user)
+
+    async def saved(self, user: TelegramUser) -> None:
+        """User baru saja ditulis utuh ke DB (upsert): tulisan state lama tidak perlu di-flush"""
+        self._dirty.pop(user.id, None)
+        await self._cache_set(user)
+
+    async def set_state(self, telegram_id: int, state: ConversationState) -> None:
+        self._dirty[telegram_id] = state
+        if len(self._dirty) >= self.max_pending:
+            self._flush_now.set()
+        user = await self._cache_get(telegram_id)
+        if user is not None:
+            self._apply_pending(user)
+            await self._cache_set(user)
+
+    def touch(self, telegram_id: int) -> None:
+        """User mengirim pesan (dilayani dari cache): bot_blocked_at dihapus di flush berikutnya"""
+        self._touched.add(telegram_id)
+        if len(self._touched) >= self.max_pending:
+            self._flush_now.set()
+
+    def _apply_pending(self, user: TelegramUser) -> None:
+        # Yang belum di-flush selalu menang atas cache/DB
+        pending = self._dirty.get(user.id)
+        if pending is not None:
+            user.current_state, user.temp_data = pending.state, pending.temp_data
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._dirty and not self._touched:
+                return 0
+            pending, self._dirty = self._dirty, {}
+            touched, self._touched = self._touched, set()
+
+            rows = [
+                {"id": telegram_id, "current_state": s.state, "temp_data": s.temp_data}
+                for telegram_id, s in pending.items()
+            ]
+            try:
+                with metrics.STATE_FLUSH_LATENCY.time():
+                    async with self.session_factory() as session:
+                        # Bulk UPDATE by primary key: satu statement executemany, satu commit
+                        if rows:
+                            await session.execute(update(SysTelegramUser), rows)
+                        if touched:
+                            await session.execute(_UNBLOCK_STMT, {"ids": list(touched)})
+                        await session.commit()
+            except Exception:
+                # Kembalikan ke antrian tanpa menimpa perubahan yang lebih baru
+                for telegram_id, s in pending.items():
+                    self._dirty.setdefault(telegram_id, s)
+                self._touched |= touched
+                raise
+
+            metrics.STATE_FLUSHED_WRITES.inc(len(rows))
+            return len(rows)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            try:
+                await self.flush()
+                await self._cache_sweep()
+            except Exception:
+                logger.exception("Flush store user gagal, dicoba lagi di interval berikutnya")
+
+
+class InMemoryStateStore(WriteBehindStateStore):
+    """Cache di memori proses. Cocok untuk satu proses web (default)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cache: dict[int, tuple[float, TelegramUser]] = {}
+
+    async def _cache_get(self, telegram_id: int) -> Optional[TelegramUser]:
+        entry = self._cache.get(telegram_id)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._cache[telegram_id]
+            return None
+        # Salinan: perubahan pemanggil tidak ikut ke cache tanpa lewat store
+        return replace(user)
+
+    async def _cache_set(self, user: TelegramUser) -> None:
+        self._cache[user.id] = (time.monotonic() + self.ttl, replace(user))
+
+    async def _cache_sweep(self) -> None:
+        now = time.monotonic()
+        expired = [k for k, (expires_at, _) in self._cache.items() if expires_at < now]
+        for telegram_id in expired:
+            del self._cache[telegram_id]
+
+
+class RedisStateStore(WriteBehindStateStore):
+    """
+    Cache di Redis (atau server kompatibel) dengan TTL bawaan, supaya user &
+    state terbaca konsisten dari beberapa proses web. Antrian flush tetap per
+    proses.
+    """
+
+    def __init__(self, *args, url: str | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Import di sini: redis extra opsional, hanya dibutuhkan kalau STATE_STORE=redis
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("STATE_STORE=redis butuh extra `redis` (uv sync --extra redis)") from e
+
+        self.redis = redis.from_url(url or settings.STATE_REDIS_URL)
+
+    @staticmethod
+    def _key(telegram_id: int) -> str:
+        return f"fm:state:{telegram_id}"
+
+    async def _cache_get(self, telegram_id: int) -> Optional[TelegramUser]:
+        raw = await self.redis.get(self._key(telegram_id))
+        if raw is None:
+            return None
+        return TelegramUser(**json.loads(raw))
+
+    async def _cache_set(self, user: TelegramUser) -> None:
+        await self.redis.set(self._key(user.id), json.dumps(asdict(user)), ex=int(self.ttl))
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        await self.redis.aclose()
+
+
+def create_state_store(session_factory: async_sessionmaker[AsyncSession]) -> WriteBehindStateStore:
+    if settings.STATE_STORE == "redis":
+        return RedisStateStore(session_factory)
+    return InMemoryStateStore(session_factory)
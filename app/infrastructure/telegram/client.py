@@ -2,58 +2,89 @@ import logging
 import httpx
 import time
 from app.core.settings import settings
+from app.core import metrics
+from app.domain.telegram.entities import Delivery
+
+# Error 400 yang berarti chat tidak bisa dikirimi lagi (user hapus akun / belum pernah /start)
+_GONE_CHAT_ERRORS = ("chat not found", "user is deactivated")
 
 class TelegramClient:
     def __init__(self, bot_token: str | None = None):
         self.bot_token = bot_token or settings.TELEGRAM_TOKEN
 
-        self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
+        self.base_url = f"{settings.TELEGRAM_API_BASE}/bot{self.bot_token}"
         self.timeout = httpx.Timeout(10.0, connect=5.0)
         self.logger = logging.getLogger(__name__)
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Satu AsyncClient dipakai bersama supaya koneksi (TLS) ke Bot API di-reuse
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self._client
+
+    async def start(self) -> None:
+        """Buka koneksi ke Bot API lebih awal (dipanggil saat startup)"""
+        result = await self.post("/getMe", {})
+        if not result.get("ok"):
+            self.logger.warning(f"Warm-up Telegram gagal: {result.get('error', result)}")
 
-    async def post(self, path: str, json: dict) -> dict:
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def post(self, path: str, json: dict, files: dict | None = None) -> dict:
         request_id = f"req_{int(time.time())}"
-        self.logger.info(f"[{request_id}] Starting POST request to {path}")
-        self.logger.debug(f"[{request_id}] Request payload: {json}")
+        self.logger.debug("[%s] Starting POST request to %s", request_id, path)
+        self.logger.debug("[%s] Request payload: %s", request_id, json)
 
         start_time = time.time()
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                resp = await client.post(f"{self.base_url}{path}", json=json)
+            if files:
+                # Upload file: multipart, field lain ikut sebagai form data
+                resp = await self.client.post(
+                    f"{self.base_url}{path}", data={k: str(v) for k, v in json.items()}, files=files
+                )
+            else:
+                resp = await self.client.post(f"{self.base_url}{path}", json=json)
 
-                try:
-                    response_data = resp.json()
-                except Exception:
-                    response_data = {"raw": resp.text}
+            try:
+                response_data = resp.json()
+            except Exception:
+                response_data = {"raw": resp.text}
 
-                duration = time.time() - start_time
+            duration = time.time() - start_time
 
-                self.logger.info(
-                    f"[{request_id}] Telegram API response received in {duration:.2f}s"
-                    f" - Status: {resp.status_code}"
-                )
-                self.logger.debug(f"[{request_id}] Full response: {response_data}")
-                return response_data
+            self.logger.info(
+                "[%s] Telegram API response received in %.2fs - Status: %s",
+                request_id, duration, resp.status_code
+            )
+            self.logger.debug("[%s] Full response: %s", request_id, response_data)
+            return response_data
 
         except httpx.TimeoutException as e:
             duration = time.time() - start_time
             self.logger.error(
-                f"[{request_id}] Timeout after {duration:.2f}s during POST {path}: {str(e)}"
+                "[%s] Timeout after %.2fs during POST %s: %s", request_id, duration, path, e
             )
             return {"ok": False, "error": "Request timed out"}
 
         except Exception as e:
             duration = time.time() - start_time
             self.logger.error(
-                f"[{request_id}] Error after {duration:.2f}s during POST {path}: {str(e)}"
+                "[%s] Error after %.2fs during POST %s: %s", request_id, duration, path, e
             )
             return {"ok": False, "error": str(e)}
 
+        finally:
+            metrics.TELEGRAM_LATENCY.labels(path.lstrip("/")).observe(time.time() - start_time)
+
     async def send_message(self, chat_id: int, text: str,
                            parse_mode: str = None, reply_markup=None) -> bool:
         msg_id = f"msg_{int(time.time())}"
-        self.logger.info(f"[{msg_id}] Preparing message for chat_id: {chat_id}")
-        self.logger.debug(f"[{msg_id}] Message content: {text}")
+        self.logger.debug("[%s] Preparing message for chat_id: %s (%d chars)", msg_id, chat_id, len(text))
 
         data = {"chat_id": chat_id, "text": text}
         if parse_mode:
@@ -65,13 +96,85 @@ class TelegramClient:
 
         if not result or not result.get("ok"):
             self.logger.error(
-                f"[{msg_id}] Failed to send message:"
-                f" {result.get('error', 'Unknown error') if result else 'No response'}"
+                "[%s] Failed to send message: %s",
+                msg_id, result.get("error", "Unknown error") if result else "No response"
             )
             return False
         else:
             self.logger.info(
-                f"[{msg_id}] Message delivered successfully:"
-                f" message_id={result.get('result', {}).get('message_id')}"
+                "[%s] Message delivered successfully: message_id=%s",
+                msg_id, result.get("result", {}).get("message_id")
             )
             return True
+
+    async def send_chat_action(self, chat_id: int, action: str = "typing") -> bool:
+        """Indikator "sedang mengetik" (hilang sendiri setelah ~5 detik atau saat pesan terkirim)"""
+        result = await self.post("/sendChatAction", {"chat_id": chat_id, "action": action})
+        return bool(result.get("ok"))
+
+    async def send_tracked_message(self, chat_id: int, text: str, parse_mode: str | None = None) -> int | None:
+        """Seperti send_message, tapi return message_id (untuk di-edit nanti), None kalau gagal"""
+        data = {"chat_id": chat_id, "text": text}
+        if parse_mode:
+            data["parse_mode"] = parse_mode
+        result = await self.post("/sendMessage", data)
+        if not result.get("ok"):
+            self.logger.error("Failed to send message: %s", result.get("error") or result.get("description"))
+            return None
+        return result.get("result", {}).get("message_id")
+
+    async def edit_message_text(self, chat_id: int, message_id: int, text: str,
+                                parse_mode: str | None = None) -> bool:
+        data = {"chat_id": chat_id, "message_id": message_id, "text": text}
+        if parse_mode:
+            data["parse_mode"] = parse_mode
+        result = await self.post("/editMessageText", data)
+        if not result.get("ok"):
+            self.logger.error("Failed to edit message: %s", result.get("error") or result.get("description"))
+            return False
+        return True
+
+    async def deliver_message(self, chat_id: int, text: str, parse_mode: str | None = None) -> Delivery:
+        """
+        Seperti send_message, tapi hasilnya dibedakan untuk pengirim massal:
+        429 (retry_after), user memblokir bot (403), dan error sementara.
+        """
+        data = {"chat_id": chat_id, "text": text}
+        if parse_mode:
+            data["parse_mode"] = parse_mode
+
+        result = await self.post("/sendMessage", data)
+        if result.get("ok"):
+            return Delivery(ok=True)
+
+        code = result.get("error_code")
+        error = result.get("description") or result.get("error") or "Unknown error"
+        if code == 429:
+            retry_after = (result.get("parameters") or {}).get("retry_after", 1)
+            return Delivery(ok=False, retry_after=float(retry_after), error=error)
+        if code == 403 or (code == 400 and any(e in error.lower() for e in _GONE_CHAT_ERRORS)):
+            return Delivery(ok=False, blocked=True, error=error)
+        # Tanpa error_code = timeout / error jaringan (lihat post)
+        return Delivery(ok=False, retryable=code is None or code >= 500, error=error)
+
+    async def send_photo(self, chat_id: int, photo: bytes | str, caption: str | None = None) -> str | None:
+        """
+        Kirim foto: bytes di-upload, str dianggap file_id yang sudah ada di
+        server Telegram (tanpa upload ulang). Return file_id ukuran terbesar.
+        """
+        data = {"chat_id": chat_id}
+        if caption:
+            data["caption"] = caption
+
+        if isinstance(photo, bytes):
+            result = await self.post("/sendPhoto", data, files={"photo": ("chart.png", photo, "image/png")})
+        else:
+            result = await self.post("/sendPhoto", {**data, "photo": photo})
+
+        if not result or not result.get("ok"):
+            self.logger.error(
+                "Failed to send photo: %s", result.get("error", "Unknown error") if result else "No response"
+            )
+            return None
+        sizes = result.get("result", {}).get("photo") or []
+        return sizes[-1].get("file_id") if sizes else None
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+router = APIRouter(tags=["monitoring"])
+
+@router.get("/ready")
+async def ready(request: Request):
+    # True setelah warm-up di lifespan berhasil (dicoba ulang di background), False lagi saat shutdown
+    if getattr(request.app.state, "ready", False):
+        return {"status": "ready"}
+    return JSONResponse(status_code=503, content={"status": "not_ready"})
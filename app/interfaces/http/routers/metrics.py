@@ -0,0 +1,8 @@
+from fastapi import APIRouter, Response
+from app.core import metrics
+
+router = APIRouter(tags=["monitoring"])
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
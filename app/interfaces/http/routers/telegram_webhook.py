@@ -1,11 +1,101 @@
-from fastapi import APIRouter, BackgroundTasks, Depends
+import time
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from app.presentation.schemas.telegram import Update, WebhookResponse
-from app.core.di import get_handle_update
+from functools import partial
+from app.application.usecases.telegram import admission_intent, cacheable_intent, classify_intent
+from app.core.di import (
+    get_admission, get_handle_update, get_rate_limiter, get_reply_cache, get_telegram_client
+)
+from app.core import metrics
+from app.core.admission import Decision
+from app.infrastructure.db.base import get_db, get_read_db
+from app.core.rate_limit import Verdict
+from app.core.profiling import profile_update
 
 router = APIRouter(tags=["telegram"])
 
+# Response selalu sama, jadi di-encode sekali saja
+_ACK_BODY = WebhookResponse(status="success", message="Update processed").model_dump_json().encode()
+_SLOW_DOWN_TEXT = "🐢 Pelan-pelan ya, pesanmu terlalu cepat. Tunggu sebentar lalu coba lagi."
+_DEFERRED_TEXT = "⏳ Lagi ramai nih, transaksimu diproses sebentar lagi ya."
+_BUSY_TEXT = "🙏 Server lagi sibuk banget. Coba kirim lagi beberapa menit lagi ya."
+_CACHED_PREFIX = "⏳ Server lagi sibuk, ini data beberapa saat lalu:\n\n"
+
+async def _send_slow_down(notifier, chat_id: int) -> None:
+    metrics.RATE_LIMIT_NOTICES.inc()
+    await notifier.send_message(chat_id, _SLOW_DOWN_TEXT)
+
+async def _run_update(uc, update: Update, raw: bytes, received_at: float) -> None:
+    metrics.UPDATES_IN_FLIGHT.inc()
+    try:
+        async with profile_update(update.update_id):
+            await uc.execute(update, raw=raw, received_at=received_at)
+    finally:
+        metrics.UPDATES_IN_FLIGHT.dec()
+        metrics.UPDATE_LATENCY.observe(time.perf_counter() - received_at)
+
+async def _run_admitted(admission, uc, update: Update, raw: bytes, received_at: float) -> None:
+    started = time.perf_counter()
+    try:
+        await _run_update(uc, update, raw, received_at)
+    finally:
+        admission.release(time.perf_counter() - started)
+
+async def _run_deferred(uc, sessions, update: Update, raw: bytes, received_at: float) -> None:
+    # Session request sudah ditutup saat job jalan; tutup lagi setelahnya supaya
+    # koneksi yang dibuka ulang job tidak tertahan
+    try:
+        await _run_update(uc, update, raw, received_at)
+    finally:
+        for session in sessions:
+            if session is not None:
+                await session.close()
+
 @router.post("/webhook", response_model=WebhookResponse)
-async def telegram_webhook(update: Update, background_tasks: BackgroundTasks,
-                           uc = Depends(get_handle_update)):
-    background_tasks.add_task(uc.execute, update)
-    return WebhookResponse(status="success", message="Update processed")
+async def telegram_webhook(request: Request, background_tasks: BackgroundTasks,
+                           uc = Depends(get_handle_update),
+                           session = Depends(get_db),
+                           read_session = Depends(get_read_db)):
+    received_at = time.perf_counter()
+    raw = await request.body()
+
+    # Parse + validasi langsung dari bytes (parser JSON pydantic-core), hanya
+    # field yang ada di schema Update; field Telegram lainnya diabaikan
+    try:
+        update = Update.model_validate_json(raw)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+
+    if not update.message:
+        background_tasks.add_task(_run_update, uc, update, raw, received_at)
+        return Response(content=_ACK_BODY, media_type="application/json")
+
+    # Rate limit & admission control sebelum update dijadwalkan: yang ditolak
+    # tidak menyentuh DB/LLM. Singleton dipanggil langsung (bukan Depends):
+    # dependency sync jalan di threadpool
+    chat_id = update.message.chat.id
+    text = update.message.text or ""
+    intent = classify_intent(text)
+    verdict = get_rate_limiter().hit(chat_id, intent)
+    if verdict is not Verdict.ALLOW:
+        if verdict is Verdict.NOTIFY:
+            background_tasks.add_task(_send_slow_down, get_telegram_client(), chat_id)
+        return Response(content=_ACK_BODY, media_type="application/json")
+
+    admission = get_admission()
+    cache_intent = cacheable_intent(text, intent)
+    cached = get_reply_cache().get(chat_id, cache_intent) if cache_intent else None
+    decision = admission.admit(admission_intent(text, intent), cached=cached is not None)
+
+    if decision is Decision.ADMIT:
+        background_tasks.add_task(_run_admitted, admission, uc, update, raw, received_at)
+    elif decision is Decision.CACHED:
+        background_tasks.add_task(get_telegram_client().send_message, chat_id, _CACHED_PREFIX + cached)
+    elif decision is Decision.DEFER:
+        admission.defer(partial(_run_deferred, uc, (session, read_session), update, raw, received_at))
+        background_tasks.add_task(get_telegram_client().send_message, chat_id, _DEFERRED_TEXT)
+    else:
+        background_tasks.add_task(get_telegram_client().send_message, chat_id, _BUSY_TEXT)
+    return Response(content=_ACK_BODY, media_type="application/json")
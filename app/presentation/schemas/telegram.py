@@ -4,6 +4,7 @@ from typing import Optional
 class Chat(BaseModel):
     id: int
     first_name: Optional[str] = None
+    username: Optional[str] = None
 
 class Message(BaseModel):
     message_id: int
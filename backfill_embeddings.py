@@ -0,0 +1,37 @@
+"""
+Konversi embedding transaksi lama (embedding_data, JSONB) ke kolom embedding
+(float32 terpak, migration c2f6a9d4e817). Jalankan sekali setelah upgrade:
+
+    python backfill_embeddings.py
+    python backfill_embeddings.py --after-id 5000000   # lanjut dari id tertentu
+
+Aman dihentikan & diulang: tiap batch (EMBEDDING_BACKFILL_BATCH baris) commit
+sendiri dan baris yang sudah dikonversi dilewati.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.core.di import get_embedding_backfill_job, shutdown
+from app.core.logging import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+async def main(args) -> int:
+    job = get_embedding_backfill_job()
+    if args.batch_size:
+        job.batch_size = args.batch_size
+    try:
+        converted = await job.run_once(args.after_id)
+        print(f"Embedding dikonversi: {converted} transaksi")
+        return 0
+    finally:
+        await shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill embedding JSONB -> float32")
+    parser.add_argument("--after-id", type=int, default=0, help="mulai dari transaksi id > ini")
+    parser.add_argument("--batch-size", type=int, help="default EMBEDDING_BACKFILL_BATCH")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,16 @@
+"""
+Aplikasi `main:app` dengan LLM diganti FakeLLM, untuk dijalankan uvicorn
+oleh harness benchmark. Telegram diarahkan lewat env TELEGRAM_API_BASE.
+"""
+import os
+
+from app.core.di import get_llm_client
+from benchmarks.fakes import FakeLLM
+from main import app
+
+_fake_llm = FakeLLM(
+    latency=float(os.getenv("FAKE_LLM_LATENCY_MS", "800")) / 1000,
+    jitter=float(os.getenv("FAKE_LLM_JITTER", "0.2")),
+)
+
+app.dependency_overrides[get_llm_client] = lambda: _fake_llm
@@ -0,0 +1,182 @@
+"""
+Broadcast ke N user dengan Bot API palsu yang meniru batas global Telegram
+(maks. --limit pesan per 1 detik terakhir, lebih dari itu 429 + retry_after).
+
+Mode:
+  naive    : loop send_message satu per satu (cara tanpa mesin broadcast)
+  unpaced  : BroadcastJob dengan concurrency tinggi tanpa batas laju
+  paced    : BroadcastJob dengan setting default (BROADCAST_RATE_PER_S, ...)
+  resume   : paced, job dibunuh di tengah lalu dilanjutkan dari checkpoint;
+             dicatat berapa pesan terkirim dua kali
+
+Repo in-memory, jadi tidak menyentuh sys_telegram_user. Setiap user ke-20
+memblokir bot (403).
+
+Contoh:
+    python -m benchmarks.broadcast_bench --users 1000 --latency 0.08 --json broadcast.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections import Counter, deque
+
+from app.application.services.broadcast import BroadcastJob
+from app.core.settings import settings
+from app.domain.telegram.entities import Broadcast, Delivery
+
+BLOCKED_EVERY = 20
+
+
+class FakeBotApi:
+    """sendMessage dengan latency tetap dan batas global sliding window 1 detik"""
+
+    def __init__(self, latency: float, limit: int, retry_after: float):
+        self.latency = latency
+        self.limit = limit
+        self.retry_after = retry_after
+        self.window: deque[float] = deque()
+        self.delivered: Counter[int] = Counter()
+        self.too_many = 0
+
+    async def deliver_message(self, chat_id: int, text: str, parse_mode: str | None = None) -> Delivery:
+        await asyncio.sleep(self.latency / 2)
+        now = time.monotonic()
+        while self.window and now - self.window[0] >= 1.0:
+            self.window.popleft()
+        if len(self.window) >= self.limit:
+            self.too_many += 1
+            await asyncio.sleep(self.latency / 2)
+            return Delivery(ok=False, retry_after=self.retry_after, error="Too Many Requests")
+        self.window.append(now)
+        await asyncio.sleep(self.latency / 2)
+        if chat_id % BLOCKED_EVERY == 0:
+            return Delivery(ok=False, blocked=True, error="Forbidden: bot was blocked by the user")
+        self.delivered[chat_id] += 1
+        return Delivery(ok=True)
+
+    async def send_message(self, chat_id: int, text: str, parse_mode: str = None) -> bool:
+        return (await self.deliver_message(chat_id, text, parse_mode)).ok
+
+
+class MemoryBroadcastRepo:
+    def __init__(self, user_ids: list[int]):
+        self.active = sorted(user_ids)
+        self.broadcasts: dict[int, Broadcast] = {}
+
+    async def create(self, text: str, parse_mode: str | None = None) -> Broadcast:
+        broadcast = Broadcast(id=len(self.broadcasts) + 1, text=text, parse_mode=parse_mode)
+        self.broadcasts[broadcast.id] = broadcast
+        return Broadcast(**{f: getattr(broadcast, f) for f in broadcast.__slots__})
+
+    async def get(self, broadcast_id: int) -> Broadcast | None:
+        saved = self.broadcasts.get(broadcast_id)
+        # Salinan: state di memori job yang dibunuh tidak ikut tersimpan
+        return Broadcast(**{f: getattr(saved, f) for f in saved.__slots__}) if saved else None
+
+    async def list_recipients(self, after_id: int | None, limit: int) -> list[int]:
+        return [uid for uid in self.active if after_id is None or uid > after_id][:limit]
+
+    async def count_recipients(self, after_id: int | None) -> int:
+        return len(await self.list_recipients(after_id, len(self.active)))
+
+    async def save_progress(self, broadcast: Broadcast, blocked_user_ids: list[int]) -> None:
+        blocked = set(blocked_user_ids)
+        self.active = [uid for uid in self.active if uid not in blocked]
+        self.broadcasts[broadcast.id] = Broadcast(**{f: getattr(broadcast, f) for f in broadcast.__slots__})
+
+
+def _scope(repo):
+    class _Scope:
+        async def __aenter__(self):
+            return repo
+
+        async def __aexit__(self, *exc):
+            return False
+    return _Scope
+
+
+def _result(mode: str, api: FakeBotApi, users: int, elapsed: float, **extra) -> dict:
+    sent = sum(api.delivered.values())
+    return {
+        "mode": mode, "users": users,
+        "elapsed_s": round(elapsed, 2),
+        "messages_per_s": round(users / elapsed, 1),
+        "delivered": sent,
+        "duplicates": sum(n - 1 for n in api.delivered.values() if n > 1),
+        "retry_after_429": api.too_many,
+        "hours_per_100k_users": round(100_000 / (users / elapsed) / 3600, 2),
+        **extra,
+    }
+
+
+async def bench_naive(args) -> dict:
+    api = FakeBotApi(args.latency, args.limit, args.retry_after)
+    started = time.monotonic()
+    for uid in range(1, args.users + 1):
+        await api.send_message(uid, "Pengumuman")
+    return _result("naive", api, args.users, time.monotonic() - started)
+
+
+async def bench_job(args, mode: str, **job_kwargs) -> dict:
+    api = FakeBotApi(args.latency, args.limit, args.retry_after)
+    repo = MemoryBroadcastRepo(list(range(1, args.users + 1)))
+    job = BroadcastJob(_scope(repo), api, progress_interval=args.progress_interval, **job_kwargs)
+    broadcast = await job.create("Pengumuman")
+    started = time.monotonic()
+
+    killed_at = None
+    if mode == "resume":
+        run = asyncio.create_task(job.run(broadcast.id))
+        while sum(api.delivered.values()) < args.users // 2:
+            await asyncio.sleep(0.05)
+        run.cancel()  # "crash": state di memori hilang, hanya checkpoint yang tersisa
+        await asyncio.gather(run, return_exceptions=True)
+        killed_at = repo.broadcasts[broadcast.id].last_user_id
+    result = await job.run(broadcast.id)
+    return _result(mode, api, args.users, time.monotonic() - started,
+                   rate=job.rate, concurrency=job.concurrency,
+                   blocked=result.blocked, failed=result.failed,
+                   checkpoint_at_kill=killed_at, inactive_after=args.users - len(repo.active))
+
+
+async def run(args) -> list[dict]:
+    results = [await bench_naive(args)]
+    print(json.dumps(results[-1]))
+    modes = [
+        ("unpaced", {"rate": 10_000, "concurrency": 50}),
+        ("paced", {}),
+        ("resume", {}),
+    ]
+    for mode, kwargs in modes:
+        results.append(await bench_job(args, mode, **kwargs))
+        print(json.dumps(results[-1]))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark broadcast pengumuman")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.08, help="RTT sendMessage (detik)")
+    parser.add_argument("--limit", type=int, default=30, help="batas global pesan per detik")
+    parser.add_argument("--retry-after", type=float, default=3.0)
+    parser.add_argument("--progress-interval", type=float, default=5.0)
+    parser.add_argument("--json", help="tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    results = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": {
+                "rate": settings.BROADCAST_RATE_PER_S,
+                "concurrency": settings.BROADCAST_CONCURRENCY,
+                "page_size": settings.BROADCAST_PAGE_SIZE,
+            }, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
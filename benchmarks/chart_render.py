@@ -0,0 +1,193 @@
+"""
+Throughput render grafik pengeluaran per core.
+
+1. Baseline: render langsung di event loop (1 core), sekalian ukur berapa
+   lama loop tertahan per render.
+2. ProcessChartRenderer dengan 1..N worker: render per detik total dan per
+   worker, plus lag event loop selama pool bekerja.
+3. Jalur cache: ChartService dengan repo & notifier palsu, versi ledger
+   sama (file_id dipakai ulang) vs versi naik setiap request (render ulang).
+
+Contoh:
+    python -m benchmarks.chart_render --renders 200 --workers 1,2,4
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+from app.application.services.chart_service import ChartCache, ChartService
+from app.infrastructure.charts.renderer import ProcessChartRenderer, render_spending_chart
+
+CATEGORIES = ["Food", "Transport", "Groceries", "Utilities", "Entertainment", "Health",
+              "Education", "Shopping", "Other", "Coffee"]
+
+
+def synthetic_items(rng: random.Random) -> list[tuple[str, float]]:
+    names = rng.sample(CATEGORIES, rng.randint(3, len(CATEGORIES)))
+    return [(name, round(rng.uniform(20_000, 2_000_000), -3)) for name in names]
+
+
+class LoopLag:
+    """Ukur keterlambatan tick event loop (seberapa lama loop diblok)"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(time.perf_counter() - started - self.interval)
+
+    def __enter__(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples) or [0.0]
+        return {
+            "loop_lag_p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 1),
+            "loop_lag_max_ms": round(ordered[-1] * 1000, 1),
+        }
+
+
+async def bench_inline(jobs: list) -> dict:
+    render_spending_chart(*jobs[0])  # import matplotlib di luar pengukuran
+    durations = []
+    with LoopLag() as lag:
+        started = time.perf_counter()
+        for kind, title, items in jobs:
+            t0 = time.perf_counter()
+            render_spending_chart(kind, title, items)
+            durations.append(time.perf_counter() - t0)
+            await asyncio.sleep(0)
+        elapsed = time.perf_counter() - started
+    return {
+        "mode": "inline", "workers": 1,
+        "renders_per_s": round(len(jobs) / elapsed, 1),
+        "renders_per_s_per_worker": round(len(jobs) / elapsed, 1),
+        "render_p50_ms": round(statistics.median(durations) * 1000, 1),
+        **lag.summary(),
+    }
+
+
+async def bench_pool(jobs: list, workers: int) -> dict:
+    renderer = ProcessChartRenderer(workers=workers, timeout=120)
+    try:
+        # Pemanasan: semua worker lahir & import matplotlib sebelum diukur
+        await asyncio.gather(*(renderer.render(*jobs[0]) for _ in range(workers * 2)))
+        with LoopLag() as lag:
+            started = time.perf_counter()
+            sizes = await asyncio.gather(*(renderer.render(*job) for job in jobs))
+            elapsed = time.perf_counter() - started
+    finally:
+        renderer.shutdown()
+    rate = len(jobs) / elapsed
+    return {
+        "mode": "process_pool", "workers": workers,
+        "renders_per_s": round(rate, 1),
+        "renders_per_s_per_worker": round(rate / workers, 1),
+        "png_kb_mean": round(statistics.fmean(len(png) for png in sizes) / 1024, 1),
+        **lag.summary(),
+    }
+
+
+class _FakeRepo:
+    def __init__(self, items):
+        self.items = items
+        self.version = 1
+
+    async def get_ledger_version(self, user_id: int) -> int:
+        return self.version
+
+    async def get_monthly_spending(self, user_id: int, period) -> list[tuple[str, float]]:
+        return self.items
+
+
+class _FakeNotifier:
+    def __init__(self):
+        self.uploads = 0
+        self.reused = 0
+
+    async def send_photo(self, chat_id: int, photo, caption=None):
+        if isinstance(photo, bytes):
+            self.uploads += 1
+            return f"file-{self.uploads}"
+        self.reused += 1
+        return photo
+
+    async def send_message(self, chat_id: int, text: str, parse_mode: str = "Markdown") -> bool:
+        return True
+
+
+async def bench_service(items, requests: int, workers: int, bump_every_request: bool) -> dict:
+    renderer = ProcessChartRenderer(workers=workers, timeout=120)
+    repo, notifier = _FakeRepo(items), _FakeNotifier()
+    service = ChartService(repo, renderer, ChartCache(max_entries=100), notifier)
+    try:
+        await service.send_spending_chart(1, 1)  # render pertama + spawn pool
+        durations = []
+        for _ in range(requests):
+            if bump_every_request:
+                repo.version += 1
+            t0 = time.perf_counter()
+            await service.send_spending_chart(1, 1)
+            durations.append(time.perf_counter() - t0)
+    finally:
+        renderer.shutdown()
+    return {
+        "mode": "service_new_version" if bump_every_request else "service_same_version",
+        "requests": requests,
+        "p50_ms": round(statistics.median(durations) * 1000, 3),
+        "uploads": notifier.uploads,
+        "file_id_reuses": notifier.reused,
+    }
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    jobs = [
+        (rng.choice(("pie", "bar")), "Pengeluaran Oktober 2026", synthetic_items(rng))
+        for _ in range(args.renders)
+    ]
+    results = [await bench_inline(jobs[: max(10, args.renders // 4)])]
+    print(json.dumps(results[-1]))
+    for workers in (int(w) for w in args.workers.split(",")):
+        results.append(await bench_pool(jobs, workers))
+        print(json.dumps(results[-1]))
+
+    items = synthetic_items(rng)
+    for bump in (False, True):
+        results.append(await bench_service(items, args.service_requests, 1, bump))
+        print(json.dumps(results[-1]))
+    return {"cpu_count": os.cpu_count(), "renders": args.renders, "results": results}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark render grafik")
+    parser.add_argument("--renders", type=int, default=200)
+    parser.add_argument("--workers", default=",".join(str(w) for w in sorted({1, 2, os.cpu_count() or 1})))
+    parser.add_argument("--service-requests", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Embedding transaksi: JSONB list float (embedding_data) vs float32 terpak
+(embedding, bytea) + numpy.frombuffer.
+
+Untuk N transaksi user bench dengan embedding --dim dimensi:
+  - ukuran per baris: tersimpan (pg_column_size, setelah kompresi TOAST) & mentah
+  - load semua embedding user: JSONB -> list float -> numpy vs
+    FinanceRepo.get_transaction_embeddings (bytea -> frombuffer, tanpa salin)
+  - riwayat (select entity TrsTransaction, --history-limit baris): kolom
+    embedding ikut dibaca (model lama) vs deferred
+  - throughput EmbeddingBackfillJob (baris/detik)
+
+Baris bench ditulis langsung dengan SQL (tanpa counter budget/ledger) dan
+dihapus di akhir.
+
+Contoh:
+    python -m benchmarks.embedding_bench --rows 2000 --dim 768 --json embedding.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
+
+import numpy as np
+from sqlalchemy import bindparam, desc, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import undefer
+
+from app.application.services.embedding_backfill import EmbeddingBackfillJob
+from app.core.settings import settings
+from app.infrastructure.db.models import TrsTransaction
+from app.infrastructure.db.repositories.finance import FinanceRepo
+from benchmarks.repo_bench import StatementCapture, _git_commit
+
+BENCH_USER = 920_100_000
+BENCH_DESCRIPTION = "embedding-bench"
+
+
+def _ms(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+    }
+
+
+async def seed(session_factory, rows: int, dim: int, seed: int) -> None:
+    rng = random.Random(seed)
+    async with session_factory() as session:
+        repo = FinanceRepo(session)
+        await session.execute(text(
+            "INSERT INTO sys_telegram_user (id, first_name, is_active, current_state) "
+            "VALUES (:id, 'bench', true, 'IDLE') ON CONFLICT (id) DO NOTHING"
+        ), {"id": BENCH_USER})
+        wallets, _ = await repo.create_accounts(BENCH_USER, ["Dompet"], [])
+        await session.execute(text(
+            "INSERT INTO trs_transaction (owner_telegram_user_id, wallet_id, type, amount, "
+            "description, trx_date, embedding_data) "
+            "VALUES (:user_id, :wallet_id, 'expense', 10000, :description, :trx_date, "
+            "CAST(:embedding AS jsonb))"
+        ), [{
+            "user_id": BENCH_USER, "wallet_id": wallets[0].id, "description": BENCH_DESCRIPTION,
+            "trx_date": date.today(),
+            # Nilai seperti keluaran model embedding: float64 dengan 17 digit signifikan
+            "embedding": json.dumps([rng.gauss(0, 0.05) for _ in range(dim)]),
+        } for _ in range(rows)])
+        await session.commit()
+
+
+async def storage(session_factory, column: str, raw: str) -> dict:
+    """pg_column_size = setelah kompresi TOAST; raw = ukuran sebelum kompresi"""
+    async with session_factory() as session:
+        row = (await session.execute(text(
+            f"SELECT avg(pg_column_size({column})), avg(octet_length({raw})) "
+            f"FROM trs_transaction WHERE owner_telegram_user_id = :user_id AND {column} IS NOT NULL"
+        ), {"user_id": BENCH_USER})).one()
+    return {"stored_bytes_per_row": round(float(row[0] or 0)), "raw_bytes_per_row": round(float(row[1] or 0))}
+
+
+async def load_legacy(session_factory, iterations: int) -> dict:
+    stmt = select(TrsTransaction.id, TrsTransaction.embedding_data).where(
+        TrsTransaction.owner_telegram_user_id == bindparam("user_id"),
+        TrsTransaction.embedding_data.is_not(None)
+    )
+    samples = []
+    for _ in range(iterations):
+        async with session_factory() as session:
+            await session.connection()
+            started = time.perf_counter()
+            rows = await session.execute(stmt, {"user_id": BENCH_USER})
+            vectors = {id: np.asarray(values, dtype=np.float32) for id, values in rows}
+            samples.append(time.perf_counter() - started)
+    return {"rows": len(vectors), **_ms(samples)}
+
+
+async def load_packed(session_factory, iterations: int) -> dict:
+    samples = []
+    for _ in range(iterations):
+        async with session_factory() as session:
+            await session.connection()
+            started = time.perf_counter()
+            vectors = await FinanceRepo(session).get_transaction_embeddings(BENCH_USER)
+            samples.append(time.perf_counter() - started)
+    return {"rows": len(vectors), **_ms(samples)}
+
+
+async def history(session_factory, capture: StatementCapture, limit: int,
+                  iterations: int, eager_embedding: bool) -> dict:
+    stmt = select(TrsTransaction).where(
+        TrsTransaction.owner_telegram_user_id == BENCH_USER
+    ).order_by(desc(TrsTransaction.trx_date), desc(TrsTransaction.id)).limit(limit)
+    if eager_embedding:
+        # Perilaku model sebelum kolom embedding di-defer
+        stmt = stmt.options(undefer(TrsTransaction.embedding_data), undefer(TrsTransaction.embedding))
+
+    samples = []
+    for _ in range(iterations):
+        async with session_factory() as session:
+            await session.connection()
+            capture.statements.clear()
+            capture.enabled = True
+            started = time.perf_counter()
+            trxs = (await session.execute(stmt)).scalars().all()
+            samples.append(time.perf_counter() - started)
+            capture.enabled = False
+    sql = capture.statements[0][0]
+    return {"rows": len(trxs), "selects_embedding": "embedding" in sql, **_ms(samples)}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark embedding JSONB vs float32")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--history-limit", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BACKFILL_BATCH)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    engine = create_async_engine(settings.database_url)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    capture = StatementCapture(engine.sync_engine)
+
+    @asynccontextmanager
+    async def repo_scope():
+        async with session_factory() as session:
+            yield FinanceRepo(session)
+
+    report = {"meta": {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "rows": args.rows, "dim": args.dim,
+    }, "results": {}}
+    results = report["results"]
+    try:
+        await seed(session_factory, args.rows, args.dim, args.seed)
+        results["jsonb"] = {
+            "storage": await storage(session_factory, "embedding_data", "embedding_data::text"),
+            "load_all": await load_legacy(session_factory, args.iterations),
+            "history_eager": await history(session_factory, capture, args.history_limit,
+                                           args.iterations, eager_embedding=True),
+        }
+        print(json.dumps({"jsonb": results["jsonb"]}))
+
+        started = time.perf_counter()
+        # Baris non-bench yang masih punya embedding_data (mis. JSON null lama) ikut dikonversi
+        converted = await EmbeddingBackfillJob(repo_scope, args.batch_size).run_once()
+        elapsed = time.perf_counter() - started
+        results["backfill"] = {"rows": converted, "elapsed_s": round(elapsed, 2),
+                               "rows_per_s": round(converted / elapsed)}
+        print(json.dumps({"backfill": results["backfill"]}))
+
+        results["float32"] = {
+            "storage": await storage(session_factory, "embedding", "embedding"),
+            "load_all": await load_packed(session_factory, args.iterations),
+            "history_eager": await history(session_factory, capture, args.history_limit,
+                                           args.iterations, eager_embedding=True),
+            "history_deferred": await history(session_factory, capture, args.history_limit,
+                                              args.iterations, eager_embedding=False),
+        }
+        print(json.dumps({"float32": results["float32"]}))
+    finally:
+        async with session_factory() as session:
+            await session.execute(text(
+                "DELETE FROM trs_transaction WHERE owner_telegram_user_id = :user_id AND description = :description"
+            ), {"user_id": BENCH_USER, "description": BENCH_DESCRIPTION})
+            await session.commit()
+        await engine.dispose()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
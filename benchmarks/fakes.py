@@ -0,0 +1,197 @@
+"""
+Pengganti lokal untuk Gemini dan Telegram Bot API, supaya benchmark
+bisa jalan tanpa network.
+"""
+import asyncio
+import random
+import re
+import time
+from collections import defaultdict, deque
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.application.usecases.feedback import PLACEHOLDER_TEXT
+from app.domain.llm.ports import LLMPort
+
+WALLETS = ["BCA", "Gopay", "OVO", "Cash", "Mandiri"]
+EXPENSES = [
+    ("makan siang", "Food"), ("kopi", "Food"), ("parkir", "Transport"),
+    ("bensin", "Transport"), ("listrik", "Utilities"), ("pulsa", "Utilities"),
+    ("nonton", "Entertainment"), ("belanja bulanan", "Groceries"),
+]
+INCOMES = [("gaji", "Salary"), ("bonus", "Salary"), ("jual barang", "Other")]
+
+_AMOUNT = re.compile(r"(\d+)\s*(rb|jt)?")
+
+
+# =========================================================
+# FAKE LLM
+# =========================================================
+class FakeLLM(LLMPort):
+    """
+    LLM palsu dengan latency yang bisa diatur. Teks dari `synthetic_text`
+    diparse dengan regex sederhana, jadi hasilnya tetap realistis untuk DB.
+    """
+
+    def __init__(self, latency: float = 0.8, jitter: float = 0.2):
+        self.latency = latency
+        self.jitter = jitter
+
+    async def parse_transaction(self, text: str, user_id: int | None = None) -> dict:
+        await asyncio.sleep(max(0.0, random.gauss(self.latency, self.latency * self.jitter)))
+
+        # "makan 20rb, parkir 5rb pake gopay": wallet di akhir berlaku untuk semua item
+        text_lower = text.lower()
+        wallet = next((w for w in WALLETS if w.lower() in text_lower), "BCA")
+        items = [self._parse_one(part.strip(), wallet) for part in text_lower.split(",")]
+        if any(item is None for item in items):
+            return {"error": "Tidak ada nominal"}
+        return {"transactions": items}
+
+    def _parse_one(self, text_lower: str, wallet: str) -> dict | None:
+        match = _AMOUNT.search(text_lower)
+        if not match:
+            return None
+
+        amount = float(match.group(1))
+        if match.group(2) == "rb":
+            amount *= 1_000
+        elif match.group(2) == "jt":
+            amount *= 1_000_000
+
+        if text_lower.startswith("transfer"):
+            target = next((w for w in WALLETS if w != wallet and w.lower() in text_lower), "Gopay")
+            return {
+                "amount": amount, "category": "Transfer", "wallet_name": wallet,
+                "target_wallet_name": target, "transaction_type": "TRANSFER",
+                "description": f"Topup {target}",
+            }
+
+        for desc, category in INCOMES:
+            if text_lower.startswith(desc):
+                return {
+                    "amount": amount, "category": category, "wallet_name": wallet,
+                    "transaction_type": "INCOME", "description": desc.title(),
+                }
+
+        desc, category = next(
+            ((d, c) for d, c in EXPENSES if text_lower.startswith(d)), ("lain-lain", "Other")
+        )
+        return {
+            "amount": amount, "category": category, "wallet_name": wallet,
+            "transaction_type": "EXPENSE", "description": desc.title(),
+        }
+
+
+# =========================================================
+# SYNTHETIC UPDATES
+# =========================================================
+def synthetic_text(rng: random.Random, mix: dict[str, float]) -> str:
+    kind = rng.choices(list(mix), weights=list(mix.values()))[0]
+
+    if kind == "saldo":
+        return rng.choice(["saldo", "/saldo", "cek saldo dong", "sisa berapa duitku"])
+    if kind == "riwayat":
+        return rng.choice(["/riwayat", "riwayat", "5 terakhir", "history"])
+    if kind == "income":
+        desc, _ = rng.choice(INCOMES)
+        return f"{desc} {rng.randint(1, 15)}jt masuk {rng.choice(WALLETS)}"
+    if kind == "multi":
+        parts = [f"{d} {rng.randint(5, 300)}rb" for d, _ in rng.sample(EXPENSES, rng.randint(2, 4))]
+        return f"{', '.join(parts)} pake {rng.choice(WALLETS)}"
+    if kind == "transfer":
+        src, dst = rng.sample(WALLETS, 2)
+        return f"transfer {rng.randint(10, 500)}rb dari {src} ke {dst}"
+
+    desc, _ = rng.choice(EXPENSES)
+    return f"{desc} {rng.randint(5, 300)}rb pake {rng.choice(WALLETS)}"
+
+
+def synthetic_update(update_id: int, chat_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "chat": {"id": chat_id, "first_name": f"Load{chat_id}", "type": "private"},
+            "date": int(time.time()),
+            "text": text,
+        },
+    }
+
+
+# =========================================================
+# STUB TELEGRAM BOT API
+# =========================================================
+class TelegramStub:
+    """
+    Server Bot API palsu. Setiap `sendMessage`/`sendPhoto`/`editMessageText`
+    dicocokkan FIFO dengan update yang dikirim ke chat yang sama untuk
+    menghitung latency balasan final. `sendChatAction` dan pesan placeholder
+    hanya dicatat sebagai feedback pertama (balasan langsung juga dihitung
+    sebagai feedback pertama).
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.pending: dict[int, deque] = defaultdict(deque)
+        self.latencies: list[float] = []
+        self.first_feedback: list[float] = []
+        # (chat_id, teks, latency atau None kalau tidak ada update yang menunggu)
+        self.replies: list[tuple[int, str, float | None]] = []
+        self.calls: dict[str, int] = defaultdict(int)
+        self._message_id = 0
+        self.app = Starlette(routes=[
+            Route("/bot{token}/{method}", self._handle, methods=["POST"]),
+        ])
+
+    def expect_reply(self, chat_id: int, sent_at: float) -> None:
+        # [waktu kirim update, feedback pertama sudah tercatat]
+        self.pending[chat_id].append([sent_at, False])
+
+    def _feedback(self, chat_id: int, final: bool) -> float | None:
+        queue = self.pending.get(chat_id)
+        if not queue:
+            return None
+        now = time.perf_counter()
+        # Update yang lebih baru di chat yang sama bisa dapat typing lebih dulu
+        entry = queue[0] if final else next((e for e in queue if not e[1]), None)
+        if entry is not None and not entry[1]:
+            entry[1] = True
+            self.first_feedback.append(now - entry[0])
+        if final:
+            queue.popleft()
+            self.latencies.append(now - entry[0])
+            return now - entry[0]
+        return None
+
+    async def _handle(self, request: Request) -> JSONResponse:
+        method = request.path_params["method"]
+        self.calls[method] += 1
+        if request.headers.get("content-type", "").startswith("multipart/"):
+            payload = dict(await request.form())
+        else:
+            payload = await request.json()
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        self._message_id += 1
+        result = {"message_id": self._message_id}
+        text = payload.get("text")
+        if method == "sendPhoto":
+            # Upload baru dapat file_id baru; kiriman ulang via file_id memakai yang sama
+            photo = payload["photo"]
+            file_id = photo if isinstance(photo, str) else f"photo-{self._message_id}"
+            result["photo"] = [{"file_id": file_id, "width": 600, "height": 450}]
+            text = f"[photo {file_id}]"
+
+        if method == "sendChatAction" or (method == "sendMessage" and text == PLACEHOLDER_TEXT):
+            self._feedback(int(payload["chat_id"]), final=False)
+        elif method in ("sendMessage", "sendPhoto", "editMessageText"):
+            chat_id = int(payload["chat_id"])
+            self.replies.append((chat_id, text, self._feedback(chat_id, final=True)))
+
+        return JSONResponse({"ok": True, "result": result})
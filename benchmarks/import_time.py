@@ -0,0 +1,72 @@
+"""
+Benchmark waktu import `main` (startup budget), dijalankan di CI.
+
+Setiap run memakai interpreter baru dengan `-X importtime`, lalu median
+total dibandingkan dengan budget. Modul paling mahal ikut dicetak supaya
+regresi (misal import berat yang tidak lazy lagi) langsung kelihatan.
+
+Contoh:
+    python -m benchmarks.import_time --runs 5 --budget-ms 1500
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+def measure(module: str) -> tuple[float, dict[str, int]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    cumulative: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cum, name = line[len("import time:"):].split("|")
+            cumulative[name.strip()] = int(cum)
+        except ValueError:
+            continue  # baris header
+    return cumulative.get(module, 0) / 1000, cumulative
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark waktu import aplikasi")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, help="gagal (exit 1) jika median melebihi ini")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", help="tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    totals = []
+    last: dict[str, int] = {}
+    for _ in range(args.runs):
+        total_ms, last = measure(args.module)
+        totals.append(total_ms)
+
+    result = {
+        "module": args.module,
+        "runs_ms": [round(t, 1) for t in totals],
+        "median_ms": round(statistics.median(totals), 1),
+        "budget_ms": args.budget_ms,
+        "top_modules_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(last.items(), key=lambda kv: kv[1], reverse=True)[1:args.top + 1]
+        },
+    }
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.budget_ms is not None and result["median_ms"] > args.budget_ms:
+        print(f"Import {args.module} {result['median_ms']}ms melebihi budget {args.budget_ms}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
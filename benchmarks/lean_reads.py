@@ -0,0 +1,168 @@
+"""
+Fast path baca FinanceRepo (statement Core + entity slotted) vs jalur ORM.
+
+Pasangan baseline ORM (bentuk sebelum fast path, didefinisikan di benchmark)
+vs method FinanceRepo yang dipakai TransactionService:
+  wallets ORM (select MstWallet)                     vs list_wallets
+  recent ORM (repo_bench.recent_transactions_orm)    vs list_recent_transactions
+  search ORM (select entity + joinedload)            vs search_transactions
+
+Per call dicatat:
+  - wall p50/p95 (termasuk round trip DB)
+  - CPU proses Python (time.process_time), jadi kerja Postgres tidak ikut
+  - alokasi yang tertahan selama hasil dipegang pemanggil: byte (tracemalloc)
+    dan jumlah objek yang dilacak GC (entity, state ORM, Row, ...). Peak
+    sementara tidak dipakai: didominasi buffer baca asyncpg (~256KB) di
+    kedua jalur
+
+Session baru per call seperti per update di webhook, jadi identity map ORM
+tidak membantu call berikutnya. Checkout koneksi & BEGIN (sama untuk kedua
+jalur) terjadi sebelum pengukuran.
+
+Contoh:
+    python -m benchmarks.lean_reads --iterations 500 --json lean_reads.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload
+
+from app.core.settings import settings
+from app.infrastructure.db.models import MstWallet, TrsTransaction
+from app.infrastructure.db.repositories.finance import _SEARCH_CONFIG, FinanceRepo
+from benchmarks.repo_bench import _git_commit, recent_transactions_orm, sample_targets
+
+SEARCH_TERMS = ["listrik"]
+
+
+async def _wallets_orm(repo: FinanceRepo, user_id: int):
+    stmt = select(MstWallet).where(
+        MstWallet.owner_telegram_user_id == user_id,
+        MstWallet.is_active == True
+    ).order_by(MstWallet.name)
+    return list((await repo.session.execute(stmt)).scalars().all())
+
+
+async def _search_orm(repo: FinanceRepo, user_id: int):
+    # Bentuk sebelum fast path: entity ORM penuh + joinedload wallet & category
+    query = func.to_tsquery(_SEARCH_CONFIG, " & ".join(f"{t}:*" for t in SEARCH_TERMS))
+    stmt = select(TrsTransaction).options(
+        joinedload(TrsTransaction.wallet),
+        joinedload(TrsTransaction.category)
+    ).where(
+        TrsTransaction.owner_telegram_user_id == user_id,
+        TrsTransaction.search_vector.op("@@")(query)
+    ).order_by(desc(TrsTransaction.trx_date), desc(TrsTransaction.id)).limit(6)
+    return list((await repo.session.execute(stmt)).scalars().unique().all())
+
+
+PAIRS = {
+    "wallets": (
+        _wallets_orm,
+        lambda repo, uid: repo.list_wallets(uid),
+    ),
+    "recent_transactions": (
+        lambda repo, uid: recent_transactions_orm(repo, uid, limit=5),
+        lambda repo, uid: repo.list_recent_transactions(uid, limit=5),
+    ),
+    "search": (
+        _search_orm,
+        lambda repo, uid: repo.search_transactions(uid, SEARCH_TERMS, limit=6),
+    ),
+}
+
+
+async def measure(session_factory, call, users: list[int], iterations: int) -> dict:
+    # Pemanasan: cache compile SQLAlchemy & prepared statement asyncpg terisi
+    for uid in users[:10]:
+        async with session_factory() as session:
+            await call(FinanceRepo(session), uid)
+
+    held_bytes, held_objects = [], []
+    tracemalloc.start()
+    try:
+        for i in range(iterations):
+            uid = users[i % len(users)]
+            async with session_factory() as session:
+                repo = FinanceRepo(session)
+                # Checkout koneksi + BEGIN sama untuk kedua jalur, di luar pengukuran
+                await session.connection()
+                gc.collect()
+                objects = len(gc.get_objects())
+                base, _ = tracemalloc.get_traced_memory()
+                result = await call(repo, uid)
+                current, _ = tracemalloc.get_traced_memory()
+                held_bytes.append(current - base)
+                held_objects.append(len(gc.get_objects()) - objects - 1)  # -1: list hasil get_objects
+                del result
+    finally:
+        tracemalloc.stop()
+
+    # Wall & CPU diukur tanpa tracemalloc (tracing memperlambat alokasi)
+    walls, cpus = [], []
+    for i in range(iterations):
+        uid = users[i % len(users)]
+        async with session_factory() as session:
+            repo = FinanceRepo(session)
+            await session.connection()
+            cpu0, wall0 = time.process_time(), time.perf_counter()
+            await call(repo, uid)
+            walls.append(time.perf_counter() - wall0)
+            cpus.append(time.process_time() - cpu0)
+
+    ordered = sorted(walls)
+    return {
+        "wall_p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "wall_p95_ms": round(ordered[int(len(ordered) * 0.95)] * 1000, 3),
+        "cpu_us_per_call": round(statistics.fmean(cpus) * 1e6, 1),
+        "held_kb": round(statistics.median(held_bytes) / 1024, 1),
+        "held_gc_objects": int(statistics.median(held_objects)),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark fast path baca FinanceRepo")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--sample-users", type=int, default=50)
+    parser.add_argument("--users", type=int, default=10000, help="jumlah user sintetis yang ada")
+    parser.add_argument("--pairs", default=",".join(PAIRS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    engine = create_async_engine(settings.database_url)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    report = {"meta": {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "iterations": args.iterations,
+    }, "results": []}
+    try:
+        targets = await sample_targets(session_factory, random.Random(args.seed), args.users, args.sample_users)
+        users = [uid for uid, _ in targets]
+        for name in args.pairs.split(","):
+            for mode, call in zip(("orm", "lean"), PAIRS[name]):
+                result = {"pair": name, "mode": mode, **await measure(session_factory, call, users, args.iterations)}
+                report["results"].append(result)
+                print(f"  {name:<20} {mode:<5} p50={result['wall_p50_ms']:.3f}ms "
+                      f"cpu={result['cpu_us_per_call']:.0f}us held={result['held_kb']:.1f}KB "
+                      f"objects={result['held_gc_objects']}")
+    finally:
+        await engine.dispose()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
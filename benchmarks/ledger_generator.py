@@ -0,0 +1,180 @@
+"""
+Generator ledger sintetis: N user x M wallet x K transaksi per wallet.
+
+Semua baris dibuat di sisi server dengan `generate_series` (INSERT ... SELECT),
+jadi puluhan juta baris tidak perlu lewat Python. User sintetis memakai
+rentang id mulai SYNTHETIC_USER_BASE supaya mudah dihapus lagi.
+
+Contoh:
+    python -m benchmarks.ledger_generator --users 10000 --wallets 3 --transactions 300 --reset
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.settings import settings
+
+SYNTHETIC_USER_BASE = 8_000_000_000
+EXPENSE_CATEGORIES = 5
+DESCRIPTIONS = [
+    "Makan siang", "Kopi susu", "Parkir mall", "Bensin motor", "Bayar listrik PLN",
+    "Pulsa dan kuota", "Belanja bulanan", "Nonton bioskop", "Bayar kos", "Ojek online",
+]
+
+_RESET_SQL = [
+    "DELETE FROM trs_transaction WHERE owner_telegram_user_id >= :base",
+    "DELETE FROM mst_recurring WHERE owner_telegram_user_id >= :base",
+    "DELETE FROM trs_balance_checkpoint WHERE owner_telegram_user_id >= :base",
+    "DELETE FROM trs_monthly_spend WHERE owner_telegram_user_id >= :base",
+    "DELETE FROM mst_budget WHERE owner_telegram_user_id >= :base",
+]
+_RESET_MASTER_SQL = [
+    "DELETE FROM mst_category WHERE owner_telegram_user_id >= :base",
+    "DELETE FROM mst_wallet WHERE owner_telegram_user_id >= :base",
+    "DELETE FROM sys_telegram_user WHERE id >= :base",
+]
+
+_USERS_SQL = """
+INSERT INTO sys_telegram_user (id, first_name, username, is_active, current_state, temp_data)
+SELECT u, 'Synthetic ' || u, NULL, true, 'IDLE', '{}'::jsonb
+FROM generate_series(CAST(:first_id AS bigint), CAST(:last_id AS bigint)) u
+"""
+
+_WALLETS_SQL = """
+INSERT INTO mst_wallet (owner_telegram_user_id, name, type, initial_balance, is_active)
+SELECT u, 'Wallet' || w, 'general', (random() * 1000000)::numeric(18, 2), true
+FROM generate_series(CAST(:first_id AS bigint), CAST(:last_id AS bigint)) u
+CROSS JOIN generate_series(1, CAST(:wallets AS int)) w
+"""
+
+_CATEGORIES_SQL = """
+INSERT INTO mst_category (owner_telegram_user_id, name, type, is_active)
+SELECT u, c.name, c.type, true
+FROM generate_series(CAST(:first_id AS bigint), CAST(:last_id AS bigint)) u
+CROSS JOIN (
+    SELECT 'Cat' || i AS name, 'expense' AS type
+    FROM generate_series(0, CAST(:expense_categories AS int) - 1) i
+    UNION ALL SELECT 'Salary', 'income'
+) c
+"""
+
+# Transfer sengaja tidak dibuat: 1 dari 10 income, sisanya expense
+_TRANSACTIONS_SQL = """
+WITH r AS (
+    SELECT w.owner_telegram_user_id AS uid, w.id AS wid, g,
+           CASE WHEN g % 10 = 0 THEN 'income' ELSE 'expense' END AS t,
+           current_date - (random() * CAST(:days AS int))::int AS d
+    FROM mst_wallet w
+    CROSS JOIN generate_series(1, CAST(:transactions AS int)) g
+    WHERE w.owner_telegram_user_id BETWEEN :first_id AND :last_id
+)
+INSERT INTO trs_transaction (
+    owner_telegram_user_id, wallet_id, category_id, target_wallet_id,
+    trx_date, type, amount, description, created_at
+)
+SELECT r.uid, r.wid, c.id, NULL, r.d, r.t,
+       (1000 + random() * 500000)::numeric(18, 2),
+       (CAST(:descriptions AS text[]))[1 + r.g % CAST(:n_descriptions AS int)] || ' #' || r.g,
+       r.d + (random() * interval '1 day')
+FROM r
+JOIN mst_category c
+  ON c.owner_telegram_user_id = r.uid
+ AND c.type = r.t
+ AND c.name = CASE WHEN r.t = 'income' THEN 'Salary'
+                   ELSE 'Cat' || (r.g % CAST(:expense_categories AS int)) END
+"""
+
+
+# Kolom FK ke wallet/category di tabel transaksi & rule tidak di-index, jadi cek
+# FK saat hapus master = seq scan per baris. Index sementara hanya selama reset.
+_RESET_INDEXES = {
+    "tmp_reset_trx_wallet": "trs_transaction (wallet_id)",
+    "tmp_reset_trx_target": "trs_transaction (target_wallet_id)",
+    "tmp_reset_trx_category": "trs_transaction (category_id)",
+    "tmp_reset_rec_wallet": "mst_recurring (wallet_id)",
+    "tmp_reset_rec_category": "mst_recurring (category_id)",
+    "tmp_reset_spend_category": "trs_monthly_spend (category_id)",
+    "tmp_reset_budget_category": "mst_budget (category_id)",
+}
+
+
+async def reset(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        for stmt in _RESET_SQL:
+            await conn.execute(text(stmt), {"base": SYNTHETIC_USER_BASE})
+        for name, target in _RESET_INDEXES.items():
+            await conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {target}"))
+        for stmt in _RESET_MASTER_SQL:
+            await conn.execute(text(stmt), {"base": SYNTHETIC_USER_BASE})
+        for name in _RESET_INDEXES:
+            await conn.execute(text(f"DROP INDEX {name}"))
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM trs_transaction, mst_recurring"))
+
+
+async def generate(engine: AsyncEngine, users: int, wallets: int, transactions: int,
+                   batch_users: int = 1000, days: int = 730) -> int:
+    """Bulk-load ledger sintetis, return jumlah transaksi yang dibuat"""
+    total = 0
+    started = time.perf_counter()
+
+    for lo in range(1, users + 1, batch_users):
+        hi = min(users, lo + batch_users - 1)
+        params = {"first_id": SYNTHETIC_USER_BASE + lo, "last_id": SYNTHETIC_USER_BASE + hi}
+
+        # Satu transaksi DB per batch user, supaya progress bisa dilanjut
+        async with engine.begin() as conn:
+            await conn.execute(text("SET LOCAL synchronous_commit = off"))
+            await conn.execute(text(_USERS_SQL), params)
+            await conn.execute(text(_WALLETS_SQL), {**params, "wallets": wallets})
+            await conn.execute(
+                text(_CATEGORIES_SQL), {**params, "expense_categories": EXPENSE_CATEGORIES}
+            )
+            result = await conn.execute(text(_TRANSACTIONS_SQL), {
+                **params,
+                "transactions": transactions,
+                "days": days,
+                "descriptions": DESCRIPTIONS,
+                "n_descriptions": len(DESCRIPTIONS),
+                "expense_categories": EXPENSE_CATEGORIES,
+            })
+            total += result.rowcount
+
+        rate = total / (time.perf_counter() - started)
+        print(f"  user {hi}/{users}: {total:,} transaksi ({rate:,.0f} baris/s)")
+
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE sys_telegram_user, mst_wallet, mst_category, trs_transaction"))
+
+    return total
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate ledger sintetis")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--wallets", type=int, default=3)
+    parser.add_argument("--transactions", type=int, default=100, help="transaksi per wallet")
+    parser.add_argument("--batch-users", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=730, help="rentang tanggal transaksi")
+    parser.add_argument("--reset", action="store_true", help="hapus data sintetis lama dulu")
+    args = parser.parse_args()
+
+    engine = create_async_engine(settings.database_url)
+    try:
+        if args.reset:
+            await reset(engine)
+        total = await generate(
+            engine, args.users, args.wallets, args.transactions, args.batch_users, args.days
+        )
+        print(f"Selesai: {total:,} transaksi")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
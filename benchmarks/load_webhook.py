@@ -0,0 +1,196 @@
+"""
+Load test end-to-end untuk endpoint /webhook.
+
+Aplikasi dijalankan di subprocess uvicorn dengan FakeLLM, Telegram diganti
+stub lokal, dan database memakai DATABASE_URL (Postgres lokal yang sudah
+di-migrate). Latency diukur dari update dikirim sampai balasan final
+(`sendMessage`/`editMessageText`) diterima stub; first_feedback sampai
+feedback pertama (typing, placeholder, atau balasan itu sendiri).
+
+Contoh:
+    python -m benchmarks.load_webhook --rate 50 --duration 30 --users 500 \\
+        --json bench_output.json --max-p95-ms 2500
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+
+import httpx
+import uvicorn
+
+from benchmarks.fakes import TelegramStub, synthetic_text, synthetic_update
+
+DEFAULT_MIX = "expense=0.55,multi=0.1,saldo=0.15,riwayat=0.1,transfer=0.05,income=0.05"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def parse_mix(raw: str) -> dict[str, float]:
+    mix = {}
+    for part in raw.split(","):
+        name, weight = part.split("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+async def scrape_metric(client: httpx.AsyncClient, name: str) -> float:
+    resp = await client.get("/metrics")
+    match = re.search(rf"^{name} (\S+)$", resp.text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+async def start_stub(stub: TelegramStub, port: int) -> tuple[uvicorn.Server, asyncio.Task]:
+    server = uvicorn.Server(uvicorn.Config(stub.app, host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    return server, task
+
+
+def start_app(args) -> subprocess.Popen:
+    env = dict(os.environ)
+    env["TELEGRAM_API_BASE"] = f"http://127.0.0.1:{args.stub_port}"
+    env["FAKE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.app_under_test:app",
+         "--host", "127.0.0.1", "--port", str(args.app_port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Aplikasi tidak siap dalam batas waktu")
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    stub = TelegramStub(latency=args.telegram_latency_ms / 1000)
+    stub_server, stub_task = await start_stub(stub, args.stub_port)
+    app_proc = start_app(args)
+
+    errors = 0
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{args.app_port}",
+            limits=httpx.Limits(max_connections=args.max_connections),
+            timeout=30.0,
+        ) as client:
+            await wait_ready(client)
+            queries_sum = await scrape_metric(client, "fm_update_queries_sum")
+            queries_count = await scrape_metric(client, "fm_update_queries_count")
+
+            async def fire(update: dict) -> None:
+                nonlocal errors
+                stub.expect_reply(update["message"]["chat"]["id"], time.perf_counter())
+                try:
+                    resp = await client.post("/webhook", json=update)
+                    if resp.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+
+            # Open-loop: jadwal kirim tetap, tidak menunggu balasan sebelumnya
+            total = int(args.rate * args.duration)
+            base_chat_id = 900_000_000
+            tasks = []
+            started = time.perf_counter()
+            for i in range(total):
+                delay = started + i / args.rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                chat_id = base_chat_id + rng.randrange(args.users)
+                update = synthetic_update(args.first_update_id + i, chat_id, synthetic_text(rng, mix))
+                tasks.append(asyncio.create_task(fire(update)))
+            await asyncio.gather(*tasks)
+
+            drain_deadline = time.perf_counter() + args.drain_timeout
+            while len(stub.latencies) < total - errors and time.perf_counter() < drain_deadline:
+                await asyncio.sleep(0.1)
+            elapsed = time.perf_counter() - started
+
+            queries_sum = await scrape_metric(client, "fm_update_queries_sum") - queries_sum
+            queries_count = await scrape_metric(client, "fm_update_queries_count") - queries_count
+    finally:
+        app_proc.terminate()
+        app_proc.wait(timeout=10)
+        stub_server.should_exit = True
+        await stub_task
+
+    latencies = stub.latencies
+    return {
+        "sent": total,
+        "replied": len(latencies),
+        "http_errors": errors,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        # typing / placeholder / balasan langsung, mana yang lebih dulu
+        "first_feedback_p50_ms": round(percentile(stub.first_feedback, 50) * 1000, 1),
+        "first_feedback_p95_ms": round(percentile(stub.first_feedback, 95) * 1000, 1),
+        "queries_per_update": round(queries_sum / queries_count, 2) if queries_count else 0.0,
+        "telegram_calls": dict(stub.calls),
+        "config": {
+            "rate": args.rate, "duration": args.duration, "users": args.users,
+            "mix": mix, "llm_latency_ms": args.llm_latency_ms,
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test end-to-end /webhook")
+    parser.add_argument("--rate", type=float, default=20.0, help="update per detik")
+    parser.add_argument("--duration", type=float, default=30.0, help="detik")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--telegram-latency-ms", type=float, default=30.0)
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--stub-port", type=int, default=8766)
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--drain-timeout", type=float, default=60.0)
+    parser.add_argument("--first-update-id", type=int, default=int(time.time()))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="tulis hasil ke file JSON")
+    parser.add_argument("--max-p95-ms", type=float, help="gagal (exit 1) jika p95 melebihi ini")
+    parser.add_argument("--max-queries-per-update", type=float, help="gagal jika rata-rata query melebihi ini")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+    failed = result["replied"] < result["sent"]
+    if args.max_p95_ms is not None and result["p95_ms"] > args.max_p95_ms:
+        failed = True
+    if args.max_queries_per_update is not None and result["queries_per_update"] > args.max_queries_per_update:
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
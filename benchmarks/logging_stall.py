@@ -0,0 +1,134 @@
+"""
+Benchmark stall event loop akibat logging.
+
+Beberapa coroutine mensimulasikan pola log per update (1 log update + 2 log
+Telegram), sementara satu task "ticker" mengukur seberapa telat event loop
+bangun dari sleep. Sink bisa dibuat lambat (--write-delay-ms) untuk meniru
+stdout yang tertahan (pipe penuh, log driver docker).
+
+Mode:
+    basic  - logging.basicConfig + f-string eager (pola lama)
+    queue  - setup_logging(): queue handler + writer thread JSON (pesan dirender
+             di pemanggil, JSON & write di thread writer)
+
+Contoh:
+    python -m benchmarks.logging_stall --mode basic --write-delay-ms 0.2
+    python -m benchmarks.logging_stall --mode queue --write-delay-ms 0.2
+"""
+import argparse
+import asyncio
+import io
+import json
+import logging
+import statistics
+import time
+
+from app.core.logging import setup_logging, shutdown_logging
+
+SAMPLE_UPDATE = {
+    "update_id": 123456789,
+    "message": {
+        "message_id": 42,
+        "chat": {"id": 987654321, "first_name": "Budi"},
+        "text": "makan siang 25rb pake gopay",
+    },
+}
+
+
+class SlowSink(io.TextIOBase):
+    """Stream yang memblok sebentar di setiap write"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lines = 0
+
+    def write(self, s: str) -> int:
+        if self.delay:
+            time.sleep(self.delay)
+        self.lines += 1
+        return len(s)
+
+    def flush(self) -> None:
+        pass
+
+
+async def producer_basic(logger, tg_logger, stop: asyncio.Event) -> int:
+    n = 0
+    while not stop.is_set():
+        logger.info(f"Update diterima: {dict(SAMPLE_UPDATE)}")
+        tg_logger.info(f"[req_{n}] Starting POST request to /sendMessage")
+        tg_logger.info(f"[req_{n}] Telegram API response received in {0.12:.2f}s - Status: {200}")
+        n += 1
+        await asyncio.sleep(0)
+    return n
+
+
+async def producer_queue(logger, tg_logger, stop: asyncio.Event) -> int:
+    n = 0
+    while not stop.is_set():
+        logger.info("Update diterima", extra={"update_id": 123456789, "chat_id": 987654321})
+        tg_logger.debug("[%s] Starting POST request to %s", n, "/sendMessage")
+        tg_logger.info("[%s] Telegram API response received in %.2fs - Status: %s", n, 0.12, 200)
+        n += 1
+        await asyncio.sleep(0)
+    return n
+
+
+async def ticker(interval: float, lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def run(args) -> dict:
+    sink = SlowSink(args.write_delay_ms / 1000)
+    if args.mode == "basic":
+        logging.basicConfig(level=logging.INFO, stream=sink, force=True,
+                            format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+        producer = producer_basic
+    else:
+        setup_logging(logging.INFO, stream=sink)
+        producer = producer_queue
+
+    logger = logging.getLogger("app.application.usecases.telegram")
+    tg_logger = logging.getLogger("app.infrastructure.telegram.client")
+
+    stop = asyncio.Event()
+    lags: list[float] = []
+    tick = asyncio.create_task(ticker(args.tick_ms / 1000, lags, stop))
+    producers = [asyncio.create_task(producer(logger, tg_logger, stop)) for _ in range(args.producers)]
+
+    await asyncio.sleep(args.duration)
+    stop.set()
+    updates = sum(await asyncio.gather(*producers))
+    await tick
+
+    if args.mode == "queue":
+        shutdown_logging()
+
+    lags.sort()
+    return {
+        "mode": args.mode,
+        "updates_logged": updates,
+        "updates_per_s": round(updates / args.duration),
+        "lines_written": sink.lines,
+        "loop_lag_p50_ms": round(statistics.median(lags) * 1000, 3),
+        "loop_lag_p99_ms": round(lags[int(len(lags) * 0.99)] * 1000, 3),
+        "loop_lag_max_ms": round(lags[-1] * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark stall event loop karena logging")
+    parser.add_argument("--mode", choices=["basic", "queue"], default="queue")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--producers", type=int, default=20)
+    parser.add_argument("--tick-ms", type=float, default=5.0)
+    parser.add_argument("--write-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Uji overload admission control dengan adapter palsu yang lambat.
+
+Sama seperti load_webhook, aplikasi jalan di subprocess uvicorn dengan
+FakeLLM (di sini sengaja lambat) dan stub Telegram, tapi ambang admission
+control dibuat kecil supaya degradasi terpicu. Dua kelompok chat:
+
+- chat "read" mengirim saldo/riwayat. Fase pemanasan (beban rendah) mengisi
+  cache balasan, saat overload balasan harus tetap cepat dari cache.
+- chat "transaksi" mengirim transaksi via LLM yang sebagian akan ditunda.
+
+Gagal (exit 1) kalau ada update yang tidak pernah dibalas, in-flight melewati
+batas keras, atau p95 balasan read melebihi --max-read-p95-ms.
+
+Contoh:
+    python -m benchmarks.overload --rate 30 --duration 10 --llm-latency-ms 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.fakes import TelegramStub, synthetic_text, synthetic_update
+from benchmarks.load_webhook import percentile, start_stub, wait_ready
+
+READ_MIX = {"saldo": 0.5, "riwayat": 0.5}
+TRANSACTION_MIX = {"expense": 0.7, "multi": 0.1, "income": 0.1, "transfer": 0.1}
+DEFERRED_TEXT = "diproses sebentar lagi"
+BUSY_TEXT = "Server lagi sibuk banget"
+CACHED_TEXT = "data beberapa saat lalu"
+BASE_CHAT_ID = 910_000_000
+
+
+def start_app(args) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "TELEGRAM_API_BASE": f"http://127.0.0.1:{args.stub_port}",
+        "FAKE_LLM_LATENCY_MS": str(args.llm_latency_ms),
+        "ADMISSION_SOFT_IN_FLIGHT": str(args.soft_in_flight),
+        "ADMISSION_MAX_IN_FLIGHT": str(args.max_in_flight),
+        "ADMISSION_DEFER_CONCURRENCY": str(args.defer_concurrency),
+        "ADMISSION_QUEUE_SIZE": str(args.queue_size),
+        # Default pool (5 + 10) = batas keras default; in-flight tidak boleh menunggu koneksi
+        "DB_POOL_SIZE": "5",
+        "DB_MAX_OVERFLOW": str(max(0, args.max_in_flight - 5)),
+        # Rate limit per chat dimatikan: yang diuji admission control global
+        "RATE_LIMITS": "{}",
+    })
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.app_under_test:app",
+         "--host", "127.0.0.1", "--port", str(args.app_port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def scrape(client: httpx.AsyncClient, sample: str) -> float:
+    resp = await client.get("/metrics")
+    match = re.search(rf"^{re.escape(sample)} (\S+)$", resp.text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    stub = TelegramStub()
+    stub_server, stub_task = await start_stub(stub, args.stub_port)
+    app_proc = start_app(args)
+
+    read_chats = [BASE_CHAT_ID + i for i in range(args.read_users)]
+    trx_chats = [BASE_CHAT_ID + args.read_users + i for i in range(args.users)]
+    update_id = args.first_update_id
+    sent = 0
+    errors = 0
+
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{args.app_port}",
+            limits=httpx.Limits(max_connections=args.max_connections),
+            timeout=30.0,
+        ) as client:
+            await wait_ready(client)
+
+            async def fire(chat_id: int, text: str) -> None:
+                nonlocal update_id, sent, errors
+                update_id += 1
+                sent += 1
+                stub.expect_reply(chat_id, time.perf_counter())
+                try:
+                    resp = await client.post("/webhook", json=synthetic_update(update_id, chat_id, text))
+                    if resp.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+
+            # Pemanasan: beban rendah, semua read diproses normal dan masuk cache
+            # (per kelompok kecil, supaya tidak memicu admission control sendiri)
+            chunk = max(1, args.soft_in_flight // 2)
+            for text in ("/saldo", "/riwayat"):
+                for i in range(0, len(read_chats), chunk):
+                    await asyncio.gather(*(fire(chat_id, text) for chat_id in read_chats[i:i + chunk]))
+                    while len(stub.replies) < sent:
+                        await asyncio.sleep(0.05)
+            warm_replies = len(stub.replies)
+
+            # Overload: open-loop, transaksi lambat menumpuk
+            max_in_flight = 0
+            stop = asyncio.Event()
+
+            async def watch() -> None:
+                nonlocal max_in_flight
+                while not stop.is_set():
+                    value = await scrape(client, "fm_admission_in_flight")
+                    max_in_flight = max(max_in_flight, int(value))
+                    await asyncio.sleep(0.1)
+
+            watcher = asyncio.create_task(watch())
+            total = int(args.rate * args.duration)
+            tasks = []
+            started = time.perf_counter()
+            for i in range(total):
+                delay = started + i / args.rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if rng.random() < args.read_fraction:
+                    chat_id, text = rng.choice(read_chats), synthetic_text(rng, READ_MIX)
+                else:
+                    chat_id, text = rng.choice(trx_chats), synthetic_text(rng, TRANSACTION_MIX)
+                tasks.append(asyncio.create_task(fire(chat_id, text)))
+            await asyncio.gather(*tasks)
+
+            # Setiap update butuh satu balasan akhir; yang ditunda dapat satu balasan tambahan
+            def expected() -> int:
+                deferred = sum(DEFERRED_TEXT in text for _, text, _ in stub.replies)
+                return sent - errors + deferred
+
+            drain_deadline = time.perf_counter() + args.drain_timeout
+            while len(stub.replies) < expected() and time.perf_counter() < drain_deadline:
+                await asyncio.sleep(0.1)
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await watcher
+
+            decisions = {
+                name: int(await scrape(client, f'fm_admission_decisions_total{{decision="{name}"}}'))
+                for name in ("admit", "cached", "defer", "reject")
+            }
+    finally:
+        app_proc.terminate()
+        # Shutdown app menunggu antrian tertunda habis (maks 10 detik)
+        app_proc.wait(timeout=30)
+        stub_server.should_exit = True
+        await stub_task
+
+    overload_replies = stub.replies[warm_replies:]
+    read_set = set(read_chats)
+    read_latencies = [lat for chat_id, _, lat in overload_replies if chat_id in read_set and lat is not None]
+    trx_latencies = [lat for chat_id, _, lat in overload_replies if chat_id not in read_set and lat is not None]
+    return {
+        "sent": sent,
+        "http_errors": errors,
+        "replies": len(stub.replies),
+        "missing_replies": max(0, expected() - len(stub.replies)),
+        "elapsed_s": round(elapsed, 2),
+        "decisions": decisions,
+        "replies_by_kind": {
+            "cached": sum(CACHED_TEXT in text for _, text, _ in overload_replies),
+            "deferred_notice": sum(DEFERRED_TEXT in text for _, text, _ in overload_replies),
+            "busy": sum(BUSY_TEXT in text for _, text, _ in overload_replies),
+        },
+        "max_in_flight": max_in_flight,
+        "read_p50_ms": round(percentile(read_latencies, 50) * 1000, 1),
+        "read_p95_ms": round(percentile(read_latencies, 95) * 1000, 1),
+        "transaction_first_reply_p95_ms": round(percentile(trx_latencies, 95) * 1000, 1),
+        "config": {
+            "rate": args.rate, "duration": args.duration, "llm_latency_ms": args.llm_latency_ms,
+            "soft_in_flight": args.soft_in_flight, "max_in_flight": args.max_in_flight,
+            "defer_concurrency": args.defer_concurrency, "queue_size": args.queue_size,
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Uji overload admission control")
+    parser.add_argument("--rate", type=float, default=30.0, help="update per detik")
+    parser.add_argument("--duration", type=float, default=10.0, help="detik")
+    parser.add_argument("--users", type=int, default=300, help="chat yang mengirim transaksi")
+    parser.add_argument("--read-users", type=int, default=50, help="chat yang mengirim saldo/riwayat")
+    parser.add_argument("--read-fraction", type=float, default=0.3)
+    parser.add_argument("--llm-latency-ms", type=float, default=2000.0)
+    parser.add_argument("--soft-in-flight", type=int, default=10)
+    parser.add_argument("--max-in-flight", type=int, default=15)
+    parser.add_argument("--defer-concurrency", type=int, default=8)
+    parser.add_argument("--queue-size", type=int, default=1000)
+    parser.add_argument("--app-port", type=int, default=8767)
+    parser.add_argument("--stub-port", type=int, default=8768)
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--drain-timeout", type=float, default=180.0)
+    parser.add_argument("--first-update-id", type=int, default=int(time.time()))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-read-p95-ms", type=float, default=500.0)
+    parser.add_argument("--json", help="tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+    failed = result["missing_replies"] > 0 or result["http_errors"] > 0
+    if result["max_in_flight"] > args.max_in_flight:
+        failed = True
+    if result["read_p95_ms"] > args.max_read_p95_ms:
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
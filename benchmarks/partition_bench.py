@@ -0,0 +1,204 @@
+"""
+Bandingkan trs_transaction terpartisi (bulanan) vs tabel biasa.
+
+Salinan tidak terpartisi dibuat di schema `bench_unpartitioned` dengan nama
+tabel yang sama (trs_transaction) dan index seperti sebelum migrasi partisi.
+FinanceRepo yang sama lalu dijalankan dua kali: sekali dengan search_path
+default (tabel terpartisi di public), sekali dengan search_path
+`bench_unpartitioned, public`, jadi query-nya identik dan tabel lain (wallet,
+checkpoint) tetap dipakai bersama.
+
+Selain latency per method, dicatat juga jumlah tabel/partisi yang benar-benar
+di-scan (dari EXPLAIN ANALYZE), ukuran index, dan durasi VACUUM setelah
+baris bulan berjalan di-update (unit autovacuum: partisi bulan ini vs seluruh
+tabel, termasuk scan semua index-nya).
+
+Contoh:
+    python -m benchmarks.ledger_generator --users 10000 --wallets 3 --transactions 100 --reset
+    python -m benchmarks.partition_bench --iterations 300 --json partition_bench.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.application.services.balance_checkpoints import BalanceCheckpointJob
+from app.core.settings import settings
+from app.infrastructure.db.repositories.finance import FinanceRepo
+from benchmarks.repo_bench import METHODS, StatementCapture, _git_commit, bench_method, sample_targets
+
+BASELINE_SCHEMA = "bench_unpartitioned"
+
+# Index sama seperti trs_transaction sebelum migrasi partisi
+_BASELINE_SQL = [
+    f"DROP SCHEMA IF EXISTS {BASELINE_SCHEMA} CASCADE",
+    f"CREATE SCHEMA {BASELINE_SCHEMA}",
+    f"CREATE TABLE {BASELINE_SCHEMA}.trs_transaction "
+    f"(LIKE public.trs_transaction INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+    f"INSERT INTO {BASELINE_SCHEMA}.trs_transaction SELECT * FROM public.trs_transaction",
+    f"ALTER TABLE {BASELINE_SCHEMA}.trs_transaction ADD PRIMARY KEY (id)",
+    f"CREATE INDEX ON {BASELINE_SCHEMA}.trs_transaction (owner_telegram_user_id, trx_date)",
+    f"CREATE INDEX ON {BASELINE_SCHEMA}.trs_transaction (owner_telegram_user_id)",
+]
+
+_SIZE_SQL = """
+SELECT count(*) AS tables,
+       sum(pg_table_size(c.oid)) AS table_bytes,
+       sum(pg_indexes_size(c.oid)) AS index_bytes
+FROM pg_class c
+WHERE c.relkind = 'r'
+  AND (c.oid = CAST(:rel AS regclass)
+       OR c.oid IN (SELECT relid FROM pg_partition_tree(CAST(:rel AS regclass))))
+"""
+
+
+async def build_baseline(engine: AsyncEngine) -> float:
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        for stmt in _BASELINE_SQL:
+            await conn.execute(text(stmt))
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(f"VACUUM ANALYZE {BASELINE_SCHEMA}.trs_transaction"))
+    return time.perf_counter() - started
+
+
+async def _vacuum(engine: AsyncEngine, rel: str) -> float:
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        started = time.perf_counter()
+        await conn.execute(text(f"VACUUM {rel}"))
+        return time.perf_counter() - started
+
+
+async def table_stats(engine: AsyncEngine, rel: str, hot_rel: str) -> dict:
+    """
+    Ukuran tabel & index, lalu update semua baris bulan berjalan dan ukur
+    VACUUM pada `hot_rel` (tabel yang akan dikerjakan autovacuum).
+    """
+    async with engine.connect() as conn:
+        row = (await conn.execute(text(_SIZE_SQL), {"rel": rel})).one()
+        rows = (await conn.execute(text(f"SELECT count(*) FROM {rel}"))).scalar()
+
+    await _vacuum(engine, rel)
+    async with engine.begin() as conn:
+        churned = (await conn.execute(text(
+            f"UPDATE {rel} SET description = description "
+            f"WHERE trx_date >= date_trunc('month', current_date)::date"
+        ))).rowcount
+    vacuum_s = await _vacuum(engine, hot_rel)
+
+    return {
+        "rows": rows,
+        "leaf_tables": row.tables,
+        "table_mb": round(float(row.table_bytes or 0) / 2**20, 1),
+        "index_mb": round(float(row.index_bytes or 0) / 2**20, 1),
+        "churned_rows": churned,
+        "vacuum_rel": hot_rel,
+        "vacuum_after_churn_s": round(vacuum_s, 3),
+    }
+
+
+def scanned_relations(explain: list[dict]) -> int:
+    """Jumlah scan tabel/partisi trs_transaction yang benar-benar dieksekusi"""
+    count = 0
+
+    def walk(node: dict) -> None:
+        nonlocal count
+        if node.get("Relation Name", "").startswith("trs_transaction") and node.get("Actual Loops", 0) > 0:
+            count += 1
+        for child in node.get("Plans", []):
+            walk(child)
+
+    for item in explain:
+        for plan in item["plan"]:
+            walk(plan["Plan"])
+    return count
+
+
+async def run_layout(engine: AsyncEngine, name: str, methods: list[str], targets, iterations: int) -> list[dict]:
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    capture = StatementCapture(engine.sync_engine)
+    results = []
+    for method in methods:
+        result = await bench_method(session_factory, capture, method, METHODS[method], targets, iterations)
+        result["layout"] = name
+        result["scanned_relations"] = scanned_relations(result["explain"])
+        results.append(result)
+        print(f"  {name:<13} {method:<26} p50={result['p50_ms']:.3f}ms p95={result['p95_ms']:.3f}ms "
+              f"scan={result['scanned_relations']}")
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark trs_transaction terpartisi vs tidak")
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--sample-users", type=int, default=50)
+    parser.add_argument("--users", type=int, default=1000, help="jumlah user sintetis yang ada")
+    parser.add_argument("--methods", default="get_wallet_balance,get_balance_as_of,list_recent_transactions")
+    parser.add_argument("--keep", action="store_true", help="jangan hapus schema baseline setelah selesai")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    partitioned = create_async_engine(settings.database_url)
+    unpartitioned = create_async_engine(
+        settings.database_url,
+        connect_args={"server_settings": {"search_path": f"{BASELINE_SCHEMA}, public"}},
+    )
+    session_factory = async_sessionmaker(partitioned, class_=AsyncSession, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def repo_scope():
+        async with session_factory() as session:
+            yield FinanceRepo(session)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "iterations": args.iterations,
+        },
+    }
+    try:
+        print("Checkpoint saldo...")
+        await BalanceCheckpointJob(repo_scope).run_once()
+        print("Salin ke tabel tidak terpartisi...")
+        report["meta"]["baseline_build_s"] = round(await build_baseline(partitioned), 2)
+
+        current = date.today()
+        hot_partition = f"public.trs_transaction_y{current.year}m{current.month:02d}"
+        baseline = f"{BASELINE_SCHEMA}.trs_transaction"
+        report["tables"] = {
+            "partitioned": await table_stats(partitioned, "public.trs_transaction", hot_partition),
+            "unpartitioned": await table_stats(partitioned, baseline, baseline),
+        }
+        print(json.dumps(report["tables"], indent=2))
+
+        rng = random.Random(args.seed)
+        targets = await sample_targets(session_factory, rng, args.users, args.sample_users)
+        methods = args.methods.split(",")
+        report["results"] = (
+            await run_layout(unpartitioned, "unpartitioned", methods, targets, args.iterations)
+            + await run_layout(partitioned, "partitioned", methods, targets, args.iterations)
+        )
+    finally:
+        if not args.keep:
+            async with partitioned.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {BASELINE_SCHEMA} CASCADE"))
+        await partitioned.dispose()
+        await unpartitioned.dispose()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
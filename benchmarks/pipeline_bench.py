@@ -0,0 +1,211 @@
+"""
+Wall-clock per pesan transaksi: TransactionService.process_natural_language
+(LLM || prefetch wallet/category/budget, resolusi di memori, satu statement
+tulis) vs alur sekuensial lama (LLM dulu, lalu lookup wallet & category per
+item, tulis, lalu query budget).
+
+LLM palsu dengan latency tetap (tanpa jitter), jadi selisih wall-clock =
+kerja DB yang tidak lagi menunggu di belakang LLM. Dicatat juga waktu setelah
+LLM selesai (wall - latency LLM) dan jumlah statement SQL per pesan, total
+dan yang baru jalan setelah LLM selesai (round trip di jalur kritis; dengan
+DB lintas jaringan tiap round trip menambah RTT).
+
+User bench (BENCH_USER_BASE + i) dibuat kalau belum ada dan datanya dibiarkan
+(seperti load_webhook): pesan pertama membuat wallet & category, berikutnya
+memakai yang sudah ada.
+
+Contoh:
+    python -m benchmarks.pipeline_bench --messages 200 --llm-latency-ms 800 --json pipeline.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.application.dtos.extraction import ExtractedTransactions
+from app.application.services.transaction_service import TransactionService
+from app.core.settings import settings
+from app.domain.finance import rules
+from app.infrastructure.db.repositories.finance import FinanceRepo
+from benchmarks.fakes import FakeLLM, synthetic_text
+from benchmarks.repo_bench import StatementCapture, _git_commit
+
+BENCH_USER_BASE = 920_000_000
+MIX = {"expense": 0.6, "multi": 0.2, "transfer": 0.1, "income": 0.1}
+
+
+class SequentialTransactionService(TransactionService):
+    """Alur sebelum pipeline: semua query DB menunggu LLM selesai"""
+
+    async def process_natural_language(self, user_id: int, text: str) -> str:
+        raw_data = await self.llm.parse_transaction(text, user_id=user_id)
+        if "error" in raw_data:
+            return "llm_error"
+        items = ExtractedTransactions.from_llm(raw_data).transactions
+        for data in items:
+            rules.validate_transaction_amount(data.amount)
+
+        cache: dict = {}
+        resolved = [await self._resolve_accounts(user_id, data, cache) for data in items]
+        await self.repo.create_transactions(user_id, [
+            {
+                "wallet_id": wallet.id,
+                "target_wallet_id": target_wallet.id if target_wallet else None,
+                "category_id": category.id if category else None,
+                "amount": data.amount,
+                "type": data.transaction_type.lower(),
+                "description": data.description,
+            }
+            for data, (wallet, target_wallet, category) in zip(items, resolved)
+        ])
+
+        spent: dict[int, float] = {}
+        for data, (_, _, category) in zip(items, resolved):
+            if data.transaction_type == "EXPENSE" and category:
+                spent[category.id] = spent.get(category.id, 0) + data.amount
+        if spent:
+            # Budget dibaca setelah commit (counter sudah termasuk pesan ini)
+            period = rules.month_start(date.today())
+            after = [b for b in await self.repo.get_budgets(user_id, period) if b.category_id in spent]
+            for b in after:
+                b.spent -= spent[b.category_id]
+            self._budget_alerts(after, spent)
+        return "ok"
+
+    async def _resolve_accounts(self, user_id: int, data, cache: dict):
+        """Resolver lama: lookup ilike per nama, akun baru dibuat (dan di-commit) satu per satu"""
+        wallet = await self._get_or_create_wallet(user_id, data.wallet_name, cache)
+        target_wallet = None
+        if data.transaction_type == "TRANSFER" and data.target_wallet_name:
+            target_wallet = await self._get_or_create_wallet(user_id, data.target_wallet_name, cache)
+
+        category = None
+        if data.category:
+            cat_type = data.transaction_type.lower()
+            key = ("category", data.category.lower(), cat_type)
+            category = cache.get(key)
+            if not category:
+                category = await self.repo.get_category_by_name(user_id, data.category, cat_type)
+                if not category:
+                    category = await self.repo.create_category(user_id, data.category, cat_type)
+                cache[key] = category
+        return wallet, target_wallet, category
+
+    async def _get_or_create_wallet(self, user_id: int, raw_name: str, cache: dict):
+        clean_name = rules.normalize_wallet_name(raw_name)
+        key = ("wallet", clean_name.lower())
+        if key not in cache:
+            wallet = await self.repo.get_wallet_by_name(user_id, clean_name)
+            if not wallet:
+                wallet = await self.repo.create_wallet(user_id, clean_name)
+            cache[key] = wallet
+        return cache[key]
+
+
+class _MarkedLLM:
+    """Catat berapa statement SQL sudah jalan saat LLM selesai"""
+
+    def __init__(self, llm: FakeLLM, capture: StatementCapture):
+        self.llm = llm
+        self.latency = llm.latency
+        self.capture = capture
+        self.statements_at_done = 0
+
+    async def parse_transaction(self, text: str, user_id: int | None = None) -> dict:
+        result = await self.llm.parse_transaction(text, user_id=user_id)
+        self.statements_at_done = len(self.capture.statements)
+        return result
+
+
+async def ensure_users(session_factory, count: int) -> list[int]:
+    ids = [BENCH_USER_BASE + i for i in range(count)]
+    async with session_factory() as session:
+        await session.execute(text(
+            "INSERT INTO sys_telegram_user (id, first_name, is_active, current_state) "
+            "SELECT id, 'bench', true, 'IDLE' FROM unnest(CAST(:ids AS bigint[])) AS id "
+            "ON CONFLICT (id) DO NOTHING"
+        ), {"ids": ids})
+        await session.commit()
+    return ids
+
+
+async def measure(session_factory, capture: StatementCapture, service_cls, llm, texts, users) -> dict:
+    walls, statements, after_llm = [], [], []
+    llm = _MarkedLLM(llm, capture)
+    for i, message in enumerate(texts):
+        user_id = users[i % len(users)]
+        async with session_factory() as session:
+            service = service_cls(llm=llm, repo=FinanceRepo(session))
+            # Checkout koneksi (di webhook sudah terjadi saat baca user) di luar pengukuran
+            await session.connection()
+            capture.statements.clear()
+            capture.enabled = True
+            started = time.perf_counter()
+            await service.process_natural_language(user_id, message)
+            walls.append(time.perf_counter() - started)
+            capture.enabled = False
+            statements.append(len(capture.statements))
+            after_llm.append(len(capture.statements) - llm.statements_at_done)
+
+    ordered = sorted(walls)
+    return {
+        "messages": len(walls),
+        "wall_p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+        "wall_p95_ms": round(ordered[int(len(ordered) * 0.95)] * 1000, 1),
+        "wall_mean_ms": round(statistics.fmean(walls) * 1000, 1),
+        "after_llm_mean_ms": round((statistics.fmean(walls) - llm.latency) * 1000, 1),
+        "statements_per_message": round(statistics.fmean(statements), 2),
+        # Round trip yang masih menunggu di belakang LLM (belum termasuk COMMIT)
+        "statements_after_llm": round(statistics.fmean(after_llm), 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark pipeline LLM || prefetch DB")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    engine = create_async_engine(settings.database_url)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    capture = StatementCapture(engine.sync_engine)
+    llm = FakeLLM(latency=args.llm_latency_ms / 1000, jitter=0.0)
+    rng = random.Random(args.seed)
+    texts = [synthetic_text(rng, MIX) for _ in range(args.messages)]
+
+    report = {"meta": {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "llm_latency_ms": args.llm_latency_ms,
+        "mix": MIX,
+    }, "results": []}
+    try:
+        users = await ensure_users(session_factory, args.users)
+        # Pemanasan: wallet & category user bench sudah ada, cache compile terisi
+        for mode_cls in (SequentialTransactionService, TransactionService):
+            await measure(session_factory, capture, mode_cls, FakeLLM(latency=0, jitter=0),
+                          texts[: args.users], users)
+
+        for mode, service_cls in (("sequential", SequentialTransactionService), ("pipelined", TransactionService)):
+            result = {"mode": mode, **await measure(session_factory, capture, service_cls, llm, texts, users)}
+            report["results"].append(result)
+            print(json.dumps(result))
+    finally:
+        await engine.dispose()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
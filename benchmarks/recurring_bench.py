@@ -0,0 +1,172 @@
+"""
+Benchmark scheduler transaksi rutin.
+
+Membuat N rule sintetis (campuran harian/mingguan/bulanan) yang jatuh tempo
+0..--lag-days hari lalu (mensimulasikan catch-up setelah downtime), lalu
+menjalankan beberapa worker RecurringScheduler paralel sampai semua rule
+selesai. Tiap batch = satu statement (klaim SKIP LOCKED + bulk insert).
+
+Contoh (~1 juta rule):
+    python -m benchmarks.recurring_bench --users 10000 --wallets 2 --rules-per-wallet 50 \\
+        --workers 4 --batch-size 1000 --json bench_output.json
+"""
+import argparse
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.application.services.recurring_scheduler import RecurringScheduler
+from app.core.settings import settings
+from app.infrastructure.db.repositories.finance import FinanceRepo, _RUN_DUE_RECURRING_SQL
+from benchmarks.ledger_generator import SYNTHETIC_USER_BASE, generate, reset
+from benchmarks.repo_bench import _summary
+
+_RULES_SQL = """
+INSERT INTO mst_recurring (
+    owner_telegram_user_id, wallet_id, category_id, type, amount, description,
+    frequency, start_date, next_run, run_count, is_active
+)
+SELECT w.owner_telegram_user_id, w.id, c.id, 'expense', (10000 + random() * 500000)::numeric(18, 2),
+       'Langganan #' || g,
+       CASE WHEN g % 10 = 0 THEN 'daily' WHEN g % 10 < 3 THEN 'weekly' ELSE 'monthly' END,
+       s.d, s.d, 0, true
+FROM mst_wallet w
+JOIN mst_category c
+  ON c.owner_telegram_user_id = w.owner_telegram_user_id AND c.name = 'Cat0' AND c.type = 'expense'
+CROSS JOIN generate_series(1, CAST(:per_wallet AS int)) g
+-- `g * 0` membuat subquery berkorelasi, supaya random() dihitung per baris
+CROSS JOIN LATERAL (SELECT current_date - (random() * CAST(:lag_days AS int) + g * 0)::int AS d) s
+WHERE w.owner_telegram_user_id > CAST(:base AS bigint)
+"""
+
+
+class CountingNotifier:
+    """Pengganti Telegram: hanya menghitung pesan (latency network tidak diukur di sini)"""
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send_message(self, chat_id: int, text: str, parse_mode: str = None) -> bool:
+        self.sent += 1
+        return True
+
+
+class TimedScheduler(RecurringScheduler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batch_seconds: list[float] = []
+
+    async def run_batch(self, today):
+        started = time.perf_counter()
+        runs = await super().run_batch(today)
+        if runs:
+            self.batch_seconds.append(time.perf_counter() - started)
+        return runs
+
+
+async def seed(engine, users: int, wallets: int, per_wallet: int, lag_days: int) -> int:
+    await reset(engine)
+    await generate(engine, users, wallets, 0)
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.execute(text("SET LOCAL synchronous_commit = off"))
+        result = await conn.execute(text(_RULES_SQL), {
+            "per_wallet": per_wallet, "lag_days": lag_days, "base": SYNTHETIC_USER_BASE,
+        })
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE mst_recurring"))
+    print(f"  {result.rowcount:,} rule dibuat dalam {time.perf_counter() - started:.1f}s")
+    return result.rowcount
+
+
+async def explain_batch(session_factory, batch_size: int, max_catchup: int) -> str:
+    async with session_factory() as session:
+        result = await session.execute(
+            text("EXPLAIN (ANALYZE, BUFFERS) " + _RUN_DUE_RECURRING_SQL),
+            {"today": date.today(), "batch_size": batch_size, "max_catchup": max_catchup},
+        )
+        plan = "\n".join(row[0] for row in result)
+        await session.rollback()
+    return plan
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark scheduler transaksi rutin")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--wallets", type=int, default=2)
+    parser.add_argument("--rules-per-wallet", type=int, default=50)
+    parser.add_argument("--lag-days", type=int, default=3, help="rentang keterlambatan (downtime)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--max-catchup", type=int, default=366)
+    parser.add_argument("--no-seed", action="store_true", help="pakai rule sintetis yang sudah ada")
+    parser.add_argument("--explain", action="store_true", help="cetak EXPLAIN ANALYZE satu batch")
+    parser.add_argument("--json", help="tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    engine = create_async_engine(settings.database_url, pool_size=args.workers)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def repo_scope():
+        async with session_factory() as session:
+            yield FinanceRepo(session)
+
+    try:
+        if not args.no_seed:
+            print("Seed rule sintetis...")
+            await seed(engine, args.users, args.wallets, args.rules_per_wallet, args.lag_days)
+
+        if args.explain:
+            print(await explain_batch(session_factory, args.batch_size, args.max_catchup))
+
+        async with engine.connect() as conn:
+            due = (await conn.execute(text(
+                "SELECT count(*) FROM mst_recurring WHERE is_active AND next_run <= current_date"
+            ))).scalar()
+
+        notifier = CountingNotifier()
+        schedulers = [
+            TimedScheduler(repo_scope, notifier, batch_size=args.batch_size, max_catchup=args.max_catchup)
+            for _ in range(args.workers)
+        ]
+        started = time.perf_counter()
+        created = await asyncio.gather(*(s.run_once() for s in schedulers))
+        elapsed = time.perf_counter() - started
+
+        async with engine.connect() as conn:
+            remaining = (await conn.execute(text(
+                "SELECT count(*) FROM mst_recurring WHERE is_active AND next_run <= current_date"
+            ))).scalar()
+            expected = (await conn.execute(text(
+                "SELECT coalesce(sum(run_count), 0) FROM mst_recurring WHERE owner_telegram_user_id > :base"
+            ), {"base": SYNTHETIC_USER_BASE})).scalar()
+    finally:
+        await engine.dispose()
+
+    batches = [b for s in schedulers for b in s.batch_seconds]
+    report = {
+        "due_rules": due,
+        "transactions": sum(created),
+        "expected_transactions": int(expected),
+        "remaining_due": remaining,
+        "notifications": notifier.sent,
+        "elapsed_s": round(elapsed, 2),
+        "rules_per_s": round(due / elapsed, 1) if elapsed else 0.0,
+        "transactions_per_s": round(sum(created) / elapsed, 1) if elapsed else 0.0,
+        "batches": _summary(batches) if batches else {},
+        "config": vars(args),
+    }
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,264 @@
+"""
+Micro-benchmark FinanceRepo di beberapa ukuran data sintetis.
+
+Untuk setiap ukuran (users x wallets x transaksi per wallet) data sintetis
+di-reset dan di-generate ulang, lalu tiap method diukur latency-nya dan
+statement SQL-nya di-EXPLAIN (ANALYZE, BUFFERS). Hasil ditulis ke JSON
+supaya bisa dibandingkan antar run.
+
+Contoh:
+    python -m benchmarks.repo_bench --sizes 1000x3x10,1000x3x100,1000x3x1000 \\
+        --json bench_output.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import desc, event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload
+
+from app.application.services.balance_checkpoints import BalanceCheckpointJob
+from app.core.settings import settings
+from app.domain.finance.rules import add_months
+from app.infrastructure.db.models import TrsTransaction
+from app.infrastructure.db.repositories.finance import RECENT_TRANSACTIONS_MONTHS, FinanceRepo
+from benchmarks.ledger_generator import SYNTHETIC_USER_BASE, generate, reset
+
+
+def parse_sizes(raw: str) -> list[tuple[int, int, int]]:
+    sizes = []
+    for part in raw.split(","):
+        users, wallets, transactions = (int(x) for x in part.lower().split("x"))
+        sizes.append((users, wallets, transactions))
+    return sizes
+
+
+class StatementCapture:
+    """Rekam statement + parameter yang dieksekusi engine, untuk di-EXPLAIN"""
+
+    def __init__(self, sync_engine):
+        self.enabled = False
+        self.statements: list[tuple[str, tuple]] = []
+        event.listen(sync_engine, "before_cursor_execute", self._before)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        if self.enabled and not executemany:
+            self.statements.append((statement, parameters))
+
+
+def _summary(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "iterations": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+async def explain(session_factory, statements: list[tuple[str, tuple]]) -> list[dict]:
+    plans = []
+    async with session_factory() as session:
+        conn = await session.connection()
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")):
+                continue
+            # EXPLAIN ANALYZE benar-benar mengeksekusi statement, jadi di-rollback
+            result = await conn.exec_driver_sql(
+                "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters
+            )
+            plan = result.scalar()
+            plans.append({
+                "statement": " ".join(statement.split()),
+                "plan": json.loads(plan) if isinstance(plan, str) else plan,
+            })
+        await session.rollback()
+    return plans
+
+
+async def bench_method(session_factory, capture: StatementCapture, name: str,
+                       call, targets: list[tuple[int, int]], iterations: int) -> dict:
+    samples = []
+    async with session_factory() as session:
+        repo = FinanceRepo(session)
+        for i in range(iterations):
+            user_id, wallet_id = targets[i % len(targets)]
+            start = time.perf_counter()
+            await call(repo, user_id, wallet_id)
+            samples.append(time.perf_counter() - start)
+
+    # Satu eksekusi lagi dengan capture aktif untuk EXPLAIN
+    capture.statements = []
+    capture.enabled = True
+    async with session_factory() as session:
+        await call(FinanceRepo(session), *targets[0])
+        await session.rollback()
+    capture.enabled = False
+
+    return {"method": name, **_summary(samples),
+            "explain": await explain(session_factory, capture.statements)}
+
+
+async def sample_targets(session_factory, rng: random.Random, users: int, count: int) -> list[tuple[int, int]]:
+    """Pilih user sintetis acak beserta satu wallet miliknya (di luar pengukuran)"""
+    user_ids = [SYNTHETIC_USER_BASE + rng.randint(1, users) for _ in range(count)]
+    async with session_factory() as session:
+        rows = (await session.execute(
+            text(
+                "SELECT DISTINCT ON (owner_telegram_user_id) owner_telegram_user_id, id "
+                "FROM mst_wallet WHERE owner_telegram_user_id = ANY(:ids) "
+                "ORDER BY owner_telegram_user_id, id"
+            ),
+            {"ids": user_ids},
+        )).all()
+    return [(row[0], row[1]) for row in rows]
+
+
+async def _get_wallet_balance(repo: FinanceRepo, user_id: int, wallet_id: int):
+    return await repo.get_wallet_balance(wallet_id, user_id)
+
+
+async def _get_balance_as_of(repo: FinanceRepo, user_id: int, wallet_id: int):
+    return await repo.get_balance_as_of(wallet_id, user_id, date.today() - timedelta(days=45))
+
+
+async def recent_transactions_orm(repo: FinanceRepo, user_id: int, limit: int = 5) -> list[TrsTransaction]:
+    """
+    Baseline ORM untuk list_recent_transactions (bentuk sebelum fast path):
+    entity penuh + joinedload, jendela bulan yang sama
+    """
+    stmt = select(TrsTransaction).options(
+        joinedload(TrsTransaction.wallet),
+        joinedload(TrsTransaction.category),
+        joinedload(TrsTransaction.target_wallet)
+    ).where(
+        TrsTransaction.owner_telegram_user_id == user_id
+    ).order_by(
+        desc(TrsTransaction.trx_date), desc(TrsTransaction.created_at), desc(TrsTransaction.id)
+    ).limit(limit)
+    since = add_months(date.today(), -RECENT_TRANSACTIONS_MONTHS + 1)
+    trxs = list((await repo.session.execute(stmt.where(TrsTransaction.trx_date >= since))).scalars().unique().all())
+    if len(trxs) < limit:
+        trxs = list((await repo.session.execute(stmt)).scalars().unique().all())
+    return trxs
+
+
+async def _get_recent_transactions(repo: FinanceRepo, user_id: int, wallet_id: int):
+    return await recent_transactions_orm(repo, user_id, limit=5)
+
+
+async def _list_recent_transactions(repo: FinanceRepo, user_id: int, wallet_id: int):
+    return await repo.list_recent_transactions(user_id, limit=5)
+
+
+async def _list_wallets(repo: FinanceRepo, user_id: int, wallet_id: int):
+    return await repo.list_wallets(user_id)
+
+
+async def _get_wallet_by_name(repo: FinanceRepo, user_id: int, wallet_id: int):
+    return await repo.get_wallet_by_name(user_id, "wallet1")
+
+
+async def _create_transaction(repo: FinanceRepo, user_id: int, wallet_id: int):
+    return await repo.create_transaction(
+        user_id=user_id, wallet_id=wallet_id, amount=15000, type="expense",
+        description="Benchmark insert",
+    )
+
+
+METHODS = {
+    "get_wallet_balance": _get_wallet_balance,
+    "get_balance_as_of": _get_balance_as_of,
+    "get_recent_transactions": _get_recent_transactions,
+    "list_recent_transactions": _list_recent_transactions,
+    "list_wallets": _list_wallets,
+    "get_wallet_by_name": _get_wallet_by_name,
+    "create_transaction": _create_transaction,
+}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark FinanceRepo")
+    parser.add_argument("--sizes", default="1000x3x10,1000x3x100,1000x3x1000",
+                        help="daftar users x wallets x transaksi per wallet")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--sample-users", type=int, default=50)
+    parser.add_argument("--methods", default=",".join(METHODS))
+    parser.add_argument("--no-generate", action="store_true",
+                        help="pakai data sintetis yang sudah ada (ukuran pertama saja)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    engine = create_async_engine(settings.database_url)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    capture = StatementCapture(engine.sync_engine)
+
+    @asynccontextmanager
+    async def repo_scope():
+        async with session_factory() as session:
+            yield FinanceRepo(session)
+    sizes = parse_sizes(args.sizes)
+    if args.no_generate:
+        sizes = sizes[:1]
+
+    async with engine.connect() as conn:
+        server_version = (await conn.execute(text("SHOW server_version"))).scalar()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "postgres": server_version,
+            "iterations": args.iterations,
+        },
+        "results": [],
+    }
+
+    try:
+        for users, wallets, transactions in sizes:
+            if not args.no_generate:
+                print(f"Generate {users}x{wallets}x{transactions}...")
+                await reset(engine)
+                await generate(engine, users, wallets, transactions)
+                await BalanceCheckpointJob(repo_scope).run_once()
+
+            async with engine.connect() as conn:
+                rows = (await conn.execute(text("SELECT count(*) FROM trs_transaction"))).scalar()
+
+            targets = await sample_targets(session_factory, rng, users, args.sample_users)
+            for name in args.methods.split(","):
+                result = await bench_method(
+                    session_factory, capture, name, METHODS[name], targets, args.iterations
+                )
+                result["size"] = {"users": users, "wallets": wallets,
+                                  "transactions_per_wallet": transactions, "table_rows": rows}
+                report["results"].append(result)
+                print(f"  {name:<26} rows={rows:>12,} p50={result['p50_ms']:.3f}ms "
+                      f"p95={result['p95_ms']:.3f}ms")
+    finally:
+        await engine.dispose()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
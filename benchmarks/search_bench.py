@@ -0,0 +1,144 @@
+"""
+Pencarian deskripsi transaksi per user: full-text (FinanceRepo.search_transactions)
+vs ILIKE '%kata%'.
+
+Kedua query dibatasi owner yang sama dan mengambil 6 baris (1 halaman + 1).
+Untuk tiap kata dicatat latency, node scan & index yang dipakai, heap fetch,
+dan buffer yang dibaca (dari EXPLAIN ANALYZE). Data dari ledger_generator:
+10 deskripsi berulang + nomor urut, jadi 'listrik' cocok ~10% baris user,
+nomor urut hanya beberapa baris.
+
+Jalankan sebelum & sesudah migrasi e3f19b6a7c40 (INCLUDE di idx_trx_owner_date)
+untuk melihat efek index-only scan.
+
+Contoh:
+    python -m benchmarks.ledger_generator --users 10000 --wallets 3 --transactions 334 --reset
+    python -m benchmarks.search_bench --users 10000 --json search_bench.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+from datetime import datetime, timezone
+
+from sqlalchemy import desc, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload
+
+from app.core.settings import settings
+from app.domain.finance.rules import parse_search_query
+from app.infrastructure.db.models import TrsTransaction
+from app.infrastructure.db.repositories.finance import FinanceRepo
+from benchmarks.repo_bench import StatementCapture, _git_commit, bench_method, sample_targets
+
+PAGE = 6
+
+# Index partisi dinamai otomatis: trs_transaction_y2026m10_<kolom>_idx
+_PARTITION_PREFIX = re.compile(r"^trs_transaction_(?:y\d{4}m\d{2}|default)_")
+
+# (nama kasus, teks seperti diketik user)
+QUERIES = [
+    ("common_word", "kapan terakhir bayar listrik?"),
+    ("two_words", "cari kopi susu"),
+    ("prefix", "cari bens"),
+    ("rare_number", "cari 123"),
+    ("no_match", "cari sepatu"),
+]
+
+_INDEX_SIZE_SQL = """
+SELECT count(*), sum(pg_relation_size(relid))
+FROM pg_partition_tree('idx_trx_owner_date') WHERE isleaf
+"""
+
+
+def _fts_call(terms: list[str]):
+    async def call(repo: FinanceRepo, user_id: int, wallet_id: int):
+        return await repo.search_transactions(user_id, terms, limit=PAGE)
+    return call
+
+
+def _ilike_call(terms: list[str]):
+    # Versi naif: query ORM yang sama dengan search_transactions, deskripsi
+    # dicocokkan ILIKE per kata (semua harus cocok) dan diurut tanggal
+    def statement(user_id: int):
+        return select(TrsTransaction).options(
+            joinedload(TrsTransaction.wallet),
+            joinedload(TrsTransaction.category)
+        ).where(
+            TrsTransaction.owner_telegram_user_id == user_id,
+            *(TrsTransaction.description.ilike(f"%{term}%") for term in terms)
+        ).order_by(desc(TrsTransaction.trx_date), desc(TrsTransaction.id)).limit(PAGE)
+
+    async def call(repo: FinanceRepo, user_id: int, wallet_id: int):
+        result = await repo.session.execute(statement(user_id))
+        return list(result.scalars().unique().all())
+    return call
+
+
+def plan_summary(explain: list[dict]) -> dict:
+    """Index yang dipakai, node scan, heap fetch, dan total shared buffer"""
+    indexes, scans = set(), set()
+    buffers = heap_fetches = 0
+    for item in explain:
+        for plan in item["plan"]:
+            root = plan["Plan"]
+            buffers += root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                if node.get("Relation Name", "").startswith("trs_transaction") or "Index Name" in node:
+                    scans.add(node["Node Type"])
+                if "Index Name" in node:
+                    indexes.add(_PARTITION_PREFIX.sub("", node["Index Name"]))
+                heap_fetches += node.get("Heap Fetches", 0)
+                stack.extend(node.get("Plans", []))
+    return {"scan_nodes": sorted(scans), "indexes": sorted(indexes),
+            "heap_fetches": heap_fetches, "shared_buffers": buffers}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark pencarian deskripsi transaksi")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--sample-users", type=int, default=50)
+    parser.add_argument("--users", type=int, default=10000, help="jumlah user sintetis yang ada")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    engine = create_async_engine(settings.database_url)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    capture = StatementCapture(engine.sync_engine)
+
+    report = {"meta": {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "iterations": args.iterations,
+    }, "results": []}
+    try:
+        async with engine.connect() as conn:
+            report["meta"]["table_rows"] = (await conn.execute(text("SELECT count(*) FROM trs_transaction"))).scalar()
+            partitions, size = (await conn.execute(text(_INDEX_SIZE_SQL))).one()
+            report["meta"]["owner_date_index"] = {"partitions": partitions, "mb": round(float(size or 0) / 2**20, 1)}
+        print(json.dumps(report["meta"]))
+
+        targets = await sample_targets(session_factory, random.Random(args.seed), args.users, args.sample_users)
+        for case, query in QUERIES:
+            terms, _ = parse_search_query(query)
+            for mode, call in (("ilike", _ilike_call(terms)), ("fts", _fts_call(terms))):
+                result = await bench_method(session_factory, capture, mode, call, targets, args.iterations)
+                result.update(case=case, terms=terms, **plan_summary(result["explain"]))
+                report["results"].append(result)
+                print(f"  {case:<12} {mode:<6} p50={result['p50_ms']:.3f}ms p95={result['p95_ms']:.3f}ms "
+                      f"scan={','.join(result['scan_nodes'])} index={','.join(result['indexes']) or '-'} "
+                      f"heap_fetches={result['heap_fetches']} buffers={result['shared_buffers']}")
+    finally:
+        await engine.dispose()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
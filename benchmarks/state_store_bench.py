@@ -0,0 +1,139 @@
+"""
+Tulis state user lewat SqlTelegramUserRepo.update_state: tanpa store (UPDATE +
+commit per langkah, user dibaca dari DB tiap update) vs InMemoryStateStore
+(user dari cache, state write-behind di-flush per batch).
+
+Setiap langkah = satu update masuk: get(user) lalu update_state(...), session
+baru per langkah seperti di webhook. Dicatat wall per langkah, jumlah query
+SQL per langkah, dan jumlah baris & flush yang akhirnya ditulis. Di akhir
+dicek state di DB sama dengan langkah terakhir tiap user.
+
+User bench (BENCH_USER_BASE + i) dibuat kalau belum ada; state-nya
+dikembalikan ke IDLE di akhir.
+
+Contoh:
+    python -m benchmarks.state_store_bench --users 200 --steps 1000 --json state_store.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.settings import settings
+from app.infrastructure.db.repositories.telegram import SqlTelegramUserRepo
+from app.infrastructure.state.store import InMemoryStateStore
+from benchmarks.repo_bench import StatementCapture, _git_commit
+
+BENCH_USER_BASE = 920_000_000
+
+
+async def ensure_users(session_factory, count: int) -> list[int]:
+    ids = [BENCH_USER_BASE + i for i in range(count)]
+    async with session_factory() as session:
+        await session.execute(text(
+            "INSERT INTO sys_telegram_user (id, first_name, is_active, current_state) "
+            "SELECT id, 'bench', true, 'IDLE' FROM unnest(CAST(:ids AS bigint[])) AS id "
+            "ON CONFLICT (id) DO NOTHING"
+        ), {"ids": ids})
+        await session.commit()
+    return ids
+
+
+async def reset_state(session_factory, users: list[int]) -> None:
+    async with session_factory() as session:
+        await session.execute(text(
+            "UPDATE sys_telegram_user SET current_state = 'IDLE', temp_data = '{}' "
+            "WHERE id = ANY(CAST(:ids AS bigint[]))"
+        ), {"ids": users})
+        await session.commit()
+
+
+async def measure(session_factory, capture: StatementCapture, steps: list[tuple[int, dict]],
+                  store: InMemoryStateStore | None) -> dict:
+    walls, queries = [], []
+    for user_id, temp_data in steps:
+        async with session_factory() as session:
+            repo = SqlTelegramUserRepo(session, state_store=store)
+            capture.statements.clear()
+            capture.enabled = True
+            started = time.perf_counter()
+            await repo.get(user_id)
+            await repo.update_state(user_id, "WAITING_INPUT", temp_data)
+            walls.append(time.perf_counter() - started)
+            capture.enabled = False
+            queries.append(len(capture.statements))
+
+    flushed = flush_ms = 0.0
+    if store is not None:
+        started = time.perf_counter()
+        flushed = await store.flush()
+        flush_ms = (time.perf_counter() - started) * 1000
+
+    ordered = sorted(walls)
+    return {
+        "steps": len(walls),
+        "total_ms": round(sum(walls) * 1000, 1),
+        "step_p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "step_p95_ms": round(ordered[int(len(ordered) * 0.95)] * 1000, 3),
+        "queries_per_step": round(statistics.fmean(queries), 2),
+        "flushed_rows": flushed,
+        "flush_ms": round(flush_ms, 1),
+    }
+
+
+async def check(session_factory, steps: list[tuple[int, dict]]) -> bool:
+    last = {user_id: temp_data for user_id, temp_data in steps}
+    async with session_factory() as session:
+        rows = await session.execute(text(
+            "SELECT id, current_state, temp_data FROM sys_telegram_user WHERE id = ANY(CAST(:ids AS bigint[]))"
+        ), {"ids": list(last)})
+        return all(state == "WAITING_INPUT" and data == last[uid] for uid, state, data in rows)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark write-behind state store")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    engine = create_async_engine(settings.database_url)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    capture = StatementCapture(engine.sync_engine)
+    rng = random.Random(args.seed)
+
+    report = {"meta": {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "users": args.users,
+    }, "results": []}
+    users = await ensure_users(session_factory, args.users)
+    try:
+        for mode in ("per_step_commit", "write_behind"):
+            await reset_state(session_factory, users)
+            steps = [(rng.choice(users), {"step": i, "wallet": rng.choice(["BCA", "Dana", "Tunai"])})
+                     for i in range(args.steps)]
+            # Flush hanya di akhir (bukan loop background) supaya jumlah batch terlihat
+            store = InMemoryStateStore(session_factory) if mode == "write_behind" else None
+            result = {"mode": mode, **await measure(session_factory, capture, steps, store)}
+            result["db_matches_last_step"] = await check(session_factory, steps)
+            report["results"].append(result)
+            print(json.dumps(result))
+    finally:
+        await reset_state(session_factory, users)
+        await engine.dispose()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+"""
+Benchmark requests/s per core untuk endpoint /webhook saja.
+
+Use case diganti no-op (tanpa DB/LLM/Telegram) dan app dipanggil langsung
+lewat interface ASGI di satu proses (tanpa HTTP client), jadi yang terukur
+hanya decoding body, validasi, DI, encoding response, dan background task.
+Dibandingkan dengan handler lama (`update: Update` sebagai body param +
+response_model) yang memakai background task yang sama.
+
+Contoh:
+    python -m benchmarks.webhook_decode --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi import BackgroundTasks, Depends, FastAPI
+
+from app.core.di import get_handle_update, get_rate_limiter
+from app.interfaces.http.routers.telegram_webhook import router as telegram_router, _run_update
+from app.presentation.schemas.telegram import Update, WebhookResponse
+
+# Payload Telegram asli membawa jauh lebih banyak field daripada yang dipakai
+PAYLOAD = json.dumps({
+    "update_id": 123456789,
+    "message": {
+        "message_id": 4242,
+        "from": {"id": 987654321, "is_bot": False, "first_name": "Budi",
+                 "username": "budi", "language_code": "id"},
+        "chat": {"id": 987654321, "first_name": "Budi", "username": "budi", "type": "private"},
+        "date": 1760000000,
+        "text": "makan siang 25rb pake gopay",
+        "entities": [{"offset": 0, "length": 5, "type": "bold"}],
+    },
+}).encode()
+
+
+class NoopUseCase:
+    async def execute(self, update, raw=None) -> None:
+        return None
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(telegram_router)
+
+    # Handler lama, untuk pembanding
+    @app.post("/webhook-legacy", response_model=WebhookResponse)
+    async def legacy_webhook(update: Update, background_tasks: BackgroundTasks,
+                             uc=Depends(get_handle_update)):
+        background_tasks.add_task(_run_update, uc, update, b"", time.perf_counter())
+        return WebhookResponse(status="success", message="Update processed")
+
+    async def noop_handle_update():
+        return NoopUseCase()
+
+    app.dependency_overrides[get_handle_update] = noop_handle_update
+    # Semua request dari chat yang sama: rate limit dimatikan supaya yang terukur tetap jalur normal
+    get_rate_limiter().limits = {}
+    return app
+
+
+async def call(app: FastAPI, path: str) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "server": ("bench", 80), "client": ("127.0.0.1", 1),
+        "headers": [(b"content-type", b"application/json"),
+                    (b"content-length", str(len(PAYLOAD)).encode())],
+    }
+    sent = False
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": PAYLOAD, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def bench(app: FastAPI, path: str, requests: int) -> float:
+    for _ in range(500):  # warm-up
+        await call(app, path)
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        assert await call(app, path) == 200
+    return requests / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark decoding /webhook")
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    app = build_app()
+    legacy = await bench(app, "/webhook-legacy", args.requests)
+    fast = await bench(app, "/webhook", args.requests)
+
+    print(json.dumps({
+        "requests": args.requests,
+        "legacy_rps": round(legacy),
+        "fast_path_rps": round(fast),
+        "speedup": round(fast / legacy, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""
+Kirim pengumuman (maintenance, fitur baru) ke semua user aktif.
+
+    python broadcast.py --file pengumuman.md --parse-mode Markdown
+    python broadcast.py --text "Bot maintenance jam 22.00"
+    python broadcast.py --resume 3     # lanjutkan broadcast yang terputus
+
+Progress (pesan/detik, ETA) di-log setiap BROADCAST_PROGRESS_INTERVAL_S.
+Checkpoint ditulis per halaman user: setelah crash, jalankan --resume dengan
+id yang sama. User yang memblokir bot dilewati sampai dia mengirim pesan lagi.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.core.di import get_broadcast_job, get_telegram_client, shutdown
+from app.core.logging import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+async def main(args) -> int:
+    job = get_broadcast_job()
+    if args.rate:
+        job.rate = args.rate
+    if args.concurrency:
+        job.concurrency = args.concurrency
+    try:
+        await get_telegram_client().start()
+        if args.resume:
+            broadcast_id = args.resume
+        else:
+            text = args.text
+            if args.file:
+                with open(args.file, encoding="utf-8") as f:
+                    text = f.read()
+            broadcast = await job.create(text.strip(), args.parse_mode)
+            broadcast_id = broadcast.id
+            logger.info("Broadcast %d dibuat, lanjutkan dengan --resume %d kalau terputus",
+                        broadcast_id, broadcast_id)
+
+        broadcast = await job.run(broadcast_id)
+        print(f"Broadcast {broadcast.id}: terkirim {broadcast.sent}, "
+              f"blokir {broadcast.blocked}, gagal {broadcast.failed}")
+        return 0
+    finally:
+        await shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Broadcast pengumuman ke semua user")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--text")
+    source.add_argument("--file", help="isi pesan dari file")
+    source.add_argument("--resume", type=int, metavar="ID", help="lanjutkan broadcast yang terputus")
+    parser.add_argument("--parse-mode", choices=("Markdown", "MarkdownV2", "HTML"))
+    parser.add_argument("--rate", type=float, help="pesan per detik (default BROADCAST_RATE_PER_S)")
+    parser.add_argument("--concurrency", type=int)
+    sys.exit(asyncio.run(main(parser.parse_args())))
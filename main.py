@@ -1,16 +1,71 @@
+import asyncio
+import contextlib
+import logging
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.interfaces.http.routers.telegram_webhook import router as telegram_router
+from app.interfaces.http.routers.metrics import router as metrics_router
+from app.interfaces.http.routers.health import router as health_router
+from app.core.di import warm_up, shutdown, get_recurring_scheduler
+from app.core.settings import settings
 
 from app.core.logging import setup_logging
 
 setup_logging()
+logger = logging.getLogger(__name__)
+
+async def _warm_up_until_ready(app: FastAPI) -> None:
+    # DB/Telegram belum bisa dihubungi saat deploy: proses tetap hidup, /ready
+    # 503 sampai warm-up berhasil, dicoba ulang dengan backoff
+    started = time.perf_counter()
+    delay = 1.0
+    while True:
+        try:
+            await warm_up(app.dependency_overrides)
+        except Exception:
+            logger.exception(f"Warm-up gagal, dicoba lagi dalam {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.WARM_UP_RETRY_MAX_S)
+            continue
+        app.state.ready = True
+        logger.info(f"Warm-up selesai dalam {time.perf_counter() - started:.2f}s")
+        return
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm-up jalan di background: port langsung dibuka, load balancer menunggu
+    # /ready sebelum mengirim traffic
+    app.state.ready = False
+    warm_up_task = asyncio.create_task(_warm_up_until_ready(app))
+
+    # Scheduler transaksi rutin opsional jalan di proses web (default: worker.py)
+    scheduler_task = None
+    if settings.RECURRING_INTERVAL_S > 0:
+        scheduler_task = asyncio.create_task(
+            get_recurring_scheduler().run_forever(settings.RECURRING_INTERVAL_S)
+        )
+
+    yield
+
+    app.state.ready = False
+    warm_up_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await warm_up_task
+    if scheduler_task:
+        scheduler_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await scheduler_task
+    await shutdown()
 
 app = FastAPI(
     title="FINANCIAL MANAGEMENT API",
     description="FM API DOCUMENTATION",
     version="0.0.2",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -22,6 +77,8 @@ app.add_middleware(
 )
 
 app.include_router(telegram_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
 
 @app.get("/")
 async def root():
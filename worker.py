@@ -0,0 +1,51 @@
+"""
+Worker job background, dijalankan terpisah dari proses web:
+- transaksi rutin (tiap RECURRING_INTERVAL_S, default 60 detik)
+- checkpoint saldo akhir bulan (tiap CHECKPOINT_INTERVAL_S)
+- partisi bulanan trs_transaction untuk bulan-bulan ke depan (tiap PARTITION_INTERVAL_S)
+
+    python worker.py            # loop terus
+    python worker.py --once     # jalankan semua job sekali lalu keluar (cron)
+
+Beberapa worker boleh jalan bersamaan: klaim rule memakai SKIP LOCKED.
+"""
+import argparse
+import asyncio
+import logging
+
+from app.core.di import (
+    get_checkpoint_job, get_partition_job, get_recurring_scheduler, get_telegram_client, shutdown
+)
+from app.core.logging import setup_logging
+from app.core.settings import settings
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+async def main(once: bool, interval: float):
+    await get_telegram_client().start()
+    scheduler = get_recurring_scheduler()
+    checkpoints = get_checkpoint_job()
+    partitions = get_partition_job()
+    try:
+        if once:
+            # Partisi dulu: transaksi rutin bulan baru langsung masuk partisinya
+            await partitions.run_once()
+            await scheduler.run_once()
+            await checkpoints.run_once()
+        else:
+            logger.info("Worker jalan, interval transaksi rutin %ss", interval)
+            await asyncio.gather(
+                scheduler.run_forever(interval),
+                checkpoints.run_forever(settings.CHECKPOINT_INTERVAL_S),
+                partitions.run_forever(settings.PARTITION_INTERVAL_S),
+            )
+    finally:
+        await shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker job background")
+    parser.add_argument("--once", action="store_true")
+    parser.add_argument("--interval", type=float, default=settings.RECURRING_INTERVAL_S or 60)
+    args = parser.parse_args()
+    asyncio.run(main(args.once, args.interval))